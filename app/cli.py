@@ -0,0 +1,132 @@
+"""命令行入口（无界面，不依赖 PyQt5）。
+
+用法：
+    python -m app.cli batch <目录或.jsonl> [--settings 设置文件] [--template 模板] [--output 输出目录] [--jobs N]
+
+- 目录：每个 .txt/.md 文件视为一条文案；
+- JSONL：每行一个 JSON 对象，读取 content（或 text）字段，可选 title 字段作为备用标题；
+- 每条文案生成一个 ZIP，输出到 --output 或设置中的 zip_output_dir；
+- --jobs 控制并发进程数，默认每个 CPU 核一个。
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, List
+
+from app.core.utils import load_settings
+from app.core.logger import configure_logging
+from app.core.tracing import configure_tracing
+from app.core.parser import configure_tail_filter
+from app.core.sensitive import configure_sensitive_filter
+from app.core.batch import NoteJob, default_jobs, run_batch
+
+DEFAULT_SETTINGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "default_settings.json")
+NOTE_EXTENSIONS = (".txt", ".md")
+
+
+def iter_notes(input_path: str) -> Iterator[NoteJob]:
+    """遍历输入，产出 (来源标识, 文案文本, 备用标题)。
+
+    单个文件无法解码或 JSONL 某行格式错误时，以异常实例代替文案文本产出，
+    由 run_batch 记为该条失败，其余文案继续处理。
+    """
+    if os.path.isdir(input_path):
+        for fname in sorted(os.listdir(input_path)):
+            fpath = os.path.join(input_path, fname)
+            stem, ext = os.path.splitext(fname)
+            if not os.path.isfile(fpath) or ext.lower() not in NOTE_EXTENSIONS:
+                continue
+            try:
+                with open(fpath, "r", encoding="utf-8-sig") as f:
+                    yield fpath, f.read(), stem
+            except (OSError, UnicodeDecodeError) as e:
+                yield fpath, e, stem
+        return
+    if not os.path.isfile(input_path):
+        raise FileNotFoundError(f"输入不存在: {input_path}")
+    with open(input_path, "r", encoding="utf-8-sig") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            source = f"{input_path}:{lineno}"
+            try:
+                obj = json.loads(line)
+            except ValueError as e:
+                yield source, ValueError(f"JSON 解析失败: {e}"), ""
+                continue
+            if isinstance(obj, str):
+                yield source, obj, ""
+                continue
+            if not isinstance(obj, dict):
+                yield source, ValueError("不是 JSON 对象或字符串"), ""
+                continue
+            text = obj.get("content") or obj.get("text") or ""
+            yield source, str(text), str(obj.get("title") or "")
+
+
+def cmd_batch(args: argparse.Namespace) -> int:
+    settings = load_settings(args.settings)
+    if args.template:
+        settings["template_excel_path"] = args.template
+    if args.output:
+        settings["zip_output_dir"] = args.output
+    logger = configure_logging(settings)
+    configure_tracing(settings)
+    configure_tail_filter(settings)
+    # 预先编译（或生成缓存）一次敏感词词典，工作进程直接读取缓存
+    configure_sensitive_filter(settings)
+
+    jobs = args.jobs or default_jobs()
+    logger.info("开始批处理：%s（并发 %d）", args.input, jobs)
+    started = time.perf_counter()
+    failures: List[str] = []
+    seen_zips = set()
+    stage_totals: Dict[str, float] = {}
+    total = 0
+    for res in run_batch(iter_notes(args.input), settings, jobs=jobs):
+        total += 1
+        if res["error"]:
+            failures.append(res["source"])
+            logger.error("处理失败: %s | %s", res["source"], res["error"])
+            continue
+        zip_path = res["zip_path"]
+        if zip_path in seen_zips:
+            logger.warning("标题重复，已覆盖同名压缩包: %s", zip_path)
+        seen_zips.add(zip_path)
+        for stage, sec in res["timings"].items():
+            stage_totals[stage] = stage_totals.get(stage, 0.0) + sec
+        logger.info("已生成ZIP: %s -> %s（%.1f ms）", res["source"], zip_path,
+                    res["timings"].get("total", 0.0) * 1000)
+
+    elapsed = time.perf_counter() - started
+    logger.info("批处理完成：共 %d 条，成功 %d 条，失败 %d 条，耗时 %.2f s（%.1f 条/秒）",
+                total, total - len(failures), len(failures), elapsed, total / elapsed if elapsed > 0 else 0.0)
+    if stage_totals:
+        logger.info("各阶段累计耗时: %s", ", ".join(f"{k}={v:.3f}s" for k, v in stage_totals.items()))
+    return 1 if failures else 0
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="小红书文案转模板工具（命令行）")
+    sub = parser.add_subparsers(dest="command", required=True)
+    batch = sub.add_parser("batch", help="批量处理目录或 JSONL 中的文案，每条生成一个 ZIP")
+    batch.add_argument("input", help="文案目录（.txt/.md）或 JSONL 文件")
+    batch.add_argument("--settings", default=DEFAULT_SETTINGS_PATH, help="设置文件路径")
+    batch.add_argument("--template", help="覆盖设置中的 Excel 模板路径")
+    batch.add_argument("--output", help="覆盖设置中的 ZIP 输出目录")
+    batch.add_argument("--jobs", "-j", type=int, default=0,
+                       help="并发进程数（默认每个 CPU 核一个；1 表示单进程顺序执行）")
+    batch.set_defaults(func=cmd_batch)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
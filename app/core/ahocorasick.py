@@ -0,0 +1,122 @@
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+
+class AhoCorasick:
+    """多模式串匹配自动机（Aho–Corasick）。
+
+    - 构建一次，之后对任意文本的扫描时间与文本长度成线性，与关键词数量无关
+    - 空串不参与构建；重复的模式串只保留一份（编号按首次出现顺序）
+    - 结构仅由 list/dict/int 组成，可经 to_data/from_data 以 JSON 等纯数据格式缓存
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = []
+        self._index: Dict[str, int] = {}
+        # 节点 0 为根；goto 为转移表，fail 为失败指针
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # 以该节点结尾的模式串编号（-1 表示无），以及沿失败链最近的可输出节点
+        self._out: List[int] = [-1]
+        self._out_link: List[int] = [0]
+        for p in patterns:
+            self._add(p)
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def to_data(self) -> Dict[str, Any]:
+        """导出为纯数据（可直接 JSON 序列化），由 from_data 还原。"""
+        return {"patterns": self.patterns, "goto": self._goto, "fail": self._fail,
+                "out": self._out, "out_link": self._out_link}
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> "AhoCorasick":
+        """从 to_data 的结果还原，不重新构建；数据结构不一致（如缓存被改动）时抛出 ValueError。"""
+        try:
+            patterns = [str(p) for p in data["patterns"]]
+            goto = [{str(ch): int(nxt) for ch, nxt in node.items()} for node in data["goto"]]
+            fail = [int(x) for x in data["fail"]]
+            out = [int(x) for x in data["out"]]
+            out_link = [int(x) for x in data["out_link"]]
+        except (KeyError, TypeError, AttributeError, ValueError) as e:
+            raise ValueError(f"自动机数据格式错误: {e}") from e
+        n = len(goto)
+        if (not n or not len(fail) == len(out) == len(out_link) == n
+                or any(len(ch) != 1 or not 0 < nxt < n for node in goto for ch, nxt in node.items())
+                or any(not 0 <= x < n for x in fail) or any(not 0 <= x < n for x in out_link)
+                or any(not -1 <= x < len(patterns) for x in out)):
+            raise ValueError("自动机数据不一致")
+        obj = cls.__new__(cls)
+        obj.patterns = patterns
+        obj._index = {p: i for i, p in enumerate(patterns)}
+        obj._goto, obj._fail, obj._out, obj._out_link = goto, fail, out, out_link
+        return obj
+
+    def pattern_id(self, pattern: str) -> int:
+        """返回模式串编号，不存在时返回 -1。"""
+        return self._index.get(pattern, -1)
+
+    def _add(self, pattern: str) -> None:
+        if not pattern or pattern in self._index:
+            return
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(-1)
+                self._out_link.append(0)
+                self._goto[node][ch] = nxt
+            node = nxt
+        pid = len(self.patterns)
+        self.patterns.append(pattern)
+        self._index[pattern] = pid
+        self._out[node] = pid
+
+    def _build(self) -> None:
+        goto, fail, out, out_link = self._goto, self._fail, self._out, self._out_link
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in goto[node].items():
+                queue.append(nxt)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                cand = goto[f].get(ch, 0)
+                fail[nxt] = cand if cand != nxt else 0
+                out_link[nxt] = fail[nxt] if out[fail[nxt]] >= 0 else out_link[fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """逐个产出 (结束位置, 模式串编号)，结束位置为开区间下标；包含重叠匹配。"""
+        goto, fail, out, out_link = self._goto, self._fail, self._out, self._out_link
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            m = node if out[node] >= 0 else out_link[node]
+            while m:
+                yield i + 1, out[m]
+                m = out_link[m]
+
+    def matched_ids(self, text: str) -> Set[int]:
+        """返回文本中出现过的模式串编号集合。"""
+        return {pid for _, pid in self.iter_matches(text)}
+
+    def prefix_ids(self, text: str) -> List[int]:
+        """返回作为 text 前缀出现的模式串编号（按长度从短到长）。"""
+        goto, out = self._goto, self._out
+        node = 0
+        hits: List[int] = []
+        for ch in text:
+            node = goto[node].get(ch)
+            if node is None:
+                break
+            if out[node] >= 0:
+                hits.append(out[node])
+        return hits
@@ -0,0 +1,94 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from .logger import configure_worker_logging, worker_logging
+from .parser import configure_tail_filter
+from .sensitive import configure_sensitive_filter
+from .pipeline import process_note
+from . import tracing
+
+# 单条任务：(来源标识, 文案文本, 备用标题)；文案文本为异常实例表示该条输入无法读取，直接记为失败
+NoteJob = Tuple[str, Union[str, Exception], str]
+
+# —— 工作进程内的状态（由 _init_worker 初始化） ——
+_WORKER_SETTINGS: Dict = {}
+_IN_POOL = False
+
+
+def default_jobs() -> int:
+    """默认并发数：每个 CPU 核一个工作进程。"""
+    return max(1, os.cpu_count() or 1)
+
+
+def _init_worker(settings: Dict, in_pool: bool = False, log_queue=None) -> None:
+    global _WORKER_SETTINGS, _IN_POOL
+    _WORKER_SETTINGS = settings
+    _IN_POOL = in_pool
+    if in_pool:
+        # 日志监听线程只在主进程运行：工作进程的记录经队列交回主进程写出
+        configure_worker_logging(log_queue, settings.get("log_level", "INFO"))
+    # 尾段过滤与去敏感词配置是模块级全局，需在每个进程内单独应用（词典走磁盘缓存）
+    configure_tail_filter(settings)
+    configure_sensitive_filter(settings)
+    tracing.configure_tracing(settings)
+    if in_pool:
+        # fork 出的工作进程会带上父进程已记录的事件
+        tracing.reset()
+
+
+def _failed(source: str, error: Exception) -> Dict:
+    return {"source": source, "zip_path": None, "timings": {},
+            "error": f"{type(error).__name__}: {error}", "pid": None}
+
+
+def _run_job(job: NoteJob) -> Dict:
+    source, raw, fallback_title = job
+    if isinstance(raw, Exception):
+        return _failed(source, raw)
+    timings: Dict[str, float] = {}
+    result = {"source": source, "zip_path": None, "timings": timings, "error": None, "pid": os.getpid()}
+    if not raw.strip():
+        result["error"] = "空文案"
+        return result
+    try:
+        result["zip_path"] = process_note(raw, _WORKER_SETTINGS, fallback_title=fallback_title,
+                                          timings=timings)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    if _IN_POOL and tracing.TRACE_ENABLED:
+        # 工作进程退出时不会写 trace，事件随结果交回主进程汇总
+        result["trace_events"] = tracing.drain()
+    return result
+
+
+def run_batch(notes: Iterable[NoteJob], settings: Dict, jobs: Optional[int] = None) -> Iterator[Dict]:
+    """并行处理多条文案，按完成顺序逐条产出结果。
+
+    每个结果为字典：source / zip_path / timings（各阶段耗时，秒）/ error / pid。
+    无法读取的输入（文案文本为异常实例）不进入工作进程，直接产出失败结果。
+    jobs<=1 时在当前进程内顺序执行（便于调试）；否则使用进程池，每个进程完整执行一条文案的全流程。
+    """
+    jobs = default_jobs() if not jobs or jobs < 0 else jobs
+    if jobs <= 1:
+        _init_worker(settings)
+        for job in notes:
+            yield _run_job(job)
+        return
+
+    with worker_logging() as log_queue, ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                                            initargs=(settings, True, log_queue)) as ex:
+        futures = {}
+        for job in notes:
+            if isinstance(job[1], Exception):
+                yield _failed(job[0], job[1])
+                continue
+            futures[ex.submit(_run_job, job)] = job[0]
+        for fut in as_completed(futures):
+            try:
+                res = fut.result()
+                tracing.merge(res.pop("trace_events", None))
+                yield res
+            except Exception as e:
+                # 工作进程异常退出等情况
+                yield _failed(futures[fut], e)
@@ -1,5 +1,9 @@
-from typing import Callable, List, Optional, Dict
+from typing import Callable, Iterable, List, Optional, Dict, Set, Tuple
+import copy
+import fnmatch
+import logging
 import threading
+import time
 
 from .utils import load_settings, save_settings
 
@@ -9,6 +13,13 @@ class ConfigManager:
 
     - 使用共享的字典对象，避免各对话框持有不同副本导致覆盖问题
     - 提供 reload/save/update 方法；如有需要可订阅变更事件
+    - 订阅者可只关注部分键（支持 fnmatch 通配，如 "feishu_*"），仅在这些键变化时收到通知
+    - save() 只标记待保存，由后台写线程合并短时间内的多次保存后原子写入；
+      退出前调用 flush() 确保最后的修改落盘
+
+    相关设置：
+    - config_save_debounce：合并窗口秒数（默认 0.5），窗口内无新保存才写入
+    - config_save_max_delay：连续保存时最长推迟秒数（默认 2）
     """
 
     _instance: Optional["ConfigManager"] = None
@@ -21,9 +32,20 @@ class ConfigManager:
             self._ensure_defaults()
         except Exception:
             pass
-        self._subscribers: List[Callable[[Dict], None]] = []
+        # (回调, 关注的键模式；None 表示任意键变化都通知)
+        self._subscribers: List[Tuple[Callable[[Dict], None], Optional[Tuple[str, ...]]]] = []
+        # 上次通知时的设置副本，用于计算变化的键
+        self._baseline: Dict = copy.deepcopy(self.settings)
         # 线程安全：统一通过锁保护 settings 的读写与保存
         self._lock = threading.RLock()
+        # 后台保存状态：_dirty 待写入，_writing 正在写入，由 _save_cond 保护
+        self._save_cond = threading.Condition()
+        self._dirty = False
+        self._writing = False
+        self._flush_requested = False
+        self._first_dirty = 0.0
+        self._last_save = 0.0
+        self._writer: Optional[threading.Thread] = None
 
     @classmethod
     def initialize(cls, settings_path: str) -> "ConfigManager":
@@ -40,17 +62,45 @@ class ConfigManager:
             raise RuntimeError("ConfigManager not initialized. Call initialize(settings_path) first.")
         return cls._instance
 
-    def subscribe(self, cb: Callable[[Dict], None]) -> None:
+    def subscribe(self, cb: Callable[[Dict], None], keys: Optional[Iterable[str]] = None) -> None:
+        """订阅设置变化：cb(settings) 在 save()/reload() 发现有键变化时调用。
+
+        keys 为键名或通配模式列表（如 ["tail_*", "cta_keywords"]），只在匹配的键变化时通知；
+        省略时任意键变化都通知。同一回调重复订阅时以最后一次的 keys 为准。
+        """
         try:
             if not cb:
                 return
+            patterns = tuple(keys) if keys is not None else None
             with self._lock:
-                if cb not in self._subscribers:
-                    self._subscribers.append(cb)
+                self._subscribers = [(f, p) for f, p in self._subscribers if f != cb]
+                self._subscribers.append((cb, patterns))
         except Exception:
             pass
 
+    def unsubscribe(self, cb: Callable[[Dict], None]) -> None:
+        with self._lock:
+            self._subscribers = [(f, p) for f, p in self._subscribers if f != cb]
+
+    def _changed_keys(self) -> Set[str]:
+        """与上次通知时相比发生变化的键（新增、删除或值不同），并更新对比基准。"""
+        with self._lock:
+            current = dict(self.settings)
+            baseline = self._baseline
+            missing = object()
+            changed = {k for k in set(current) | set(baseline)
+                       if current.get(k, missing) != baseline.get(k, missing)}
+            for k in changed:
+                if k in current:
+                    baseline[k] = copy.deepcopy(current[k])
+                else:
+                    baseline.pop(k, None)
+        return changed
+
     def _notify(self) -> None:
+        changed = self._changed_keys()
+        if not changed:
+            return
         # 复制订阅者列表，避免回调中修改列表导致并发问题
         try:
             with self._lock:
@@ -59,14 +109,19 @@ class ConfigManager:
         except Exception:
             subscribers = []
             current_settings = self.settings
-        for cb in subscribers:
+        for cb, patterns in subscribers:
+            if patterns is not None and not any(
+                    fnmatch.fnmatchcase(k, p) for k in changed for p in patterns):
+                continue
             try:
                 cb(current_settings)
             except Exception:
                 # 忽略订阅回调中的异常
-                pass
+                logging.getLogger("xhs_tool").exception("设置变更回调失败")
 
     def reload(self) -> Dict:
+        # 先写入尚未落盘的修改，避免被重新加载的旧内容覆盖
+        self.flush()
         with self._lock:
             self.settings = load_settings(self.settings_path)
             try:
@@ -77,11 +132,68 @@ class ConfigManager:
         return self.settings
 
     def save(self) -> None:
-        # 统一保存入口：加锁、保存并通知
-        with self._lock:
-            save_settings(self.settings_path, self.settings)
+        # 统一保存入口：标记待保存并通知，实际写入由后台线程合并完成
+        with self._save_cond:
+            now = time.monotonic()
+            if not self._dirty:
+                self._first_dirty = now
+            self._dirty = True
+            self._last_save = now
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._writer_loop, name="config-writer", daemon=True)
+                self._writer.start()
+            self._save_cond.notify_all()
         self._notify()
 
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """立即写入尚未落盘的修改并等待完成（程序退出前调用）；超时返回 False。"""
+        with self._save_cond:
+            if not self._dirty and not self._writing:
+                return True
+            self._flush_requested = True
+            self._save_cond.notify_all()
+            return self._save_cond.wait_for(lambda: not self._dirty and not self._writing, timeout)
+
+    def _writer_loop(self) -> None:
+        while True:
+            with self._save_cond:
+                while not self._dirty:
+                    self._save_cond.wait()
+                # 等待保存停歇（或达到最长推迟时间、或被要求立即写入）
+                while not self._flush_requested:
+                    debounce = float(self.settings.get("config_save_debounce", 0.5))
+                    max_delay = float(self.settings.get("config_save_max_delay", 2.0))
+                    deadline = min(self._last_save + debounce, self._first_dirty + max_delay)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._save_cond.wait(remaining)
+                self._dirty = False
+                self._flush_requested = False
+                self._writing = True
+            try:
+                self._write()
+            except RuntimeError:
+                # 序列化时 settings 中的列表/字典恰被其他线程修改：稍后重写一次
+                with self._save_cond:
+                    if not self._dirty:
+                        self._first_dirty = time.monotonic()
+                    self._dirty = True
+                    self._last_save = time.monotonic()
+            except Exception as e:
+                logging.getLogger("xhs_tool").error("保存设置失败: %s", e)
+            finally:
+                with self._save_cond:
+                    self._writing = False
+                    self._save_cond.notify_all()
+
+    def _write(self) -> None:
+        with self._lock:
+            path = self.settings_path
+            # 浅拷贝在 GIL 下一次完成；其他线程可能正在直接修改共享 settings
+            snapshot = dict(self.settings)
+        save_settings(path, snapshot)
+
     def update(self, updated: Dict, save: bool = True) -> None:
         with self._lock:
             try:
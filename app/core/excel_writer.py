@@ -1,8 +1,66 @@
+import io
 import os
+import threading
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional
+from typing import BinaryIO, Dict, List, Tuple, Optional, Union
 from openpyxl import load_workbook
 
+from .tracing import span
+
+
+class _TemplateEntry:
+    """已解析模板的缓存项：解析好的工作簿，以及表头扫描所需的前10行与 max_row。
+
+    工作簿只解析一次并在多次写入间复用：每次写入在 lock 内追加单元格、保存，
+    再删除本次追加的单元格，使工作簿回到模板原样。
+    """
+
+    def __init__(self, key: Tuple, wb):
+        ws = wb.active
+        self.key = key
+        self.wb = wb
+        self.lock = threading.Lock()
+        self.max_row = ws.max_row
+        self.top_rows: List[List] = [[c.value for c in ws[r]] for r in range(1, min(10, ws.max_row) + 1)]
+        # (需要的列名元组) -> (表头行号, 表头值列表)
+        self.headers: Dict[Tuple[str, ...], Tuple[Optional[int], List[Optional[str]]]] = {}
+
+
+_TEMPLATE_CACHE: Dict[str, _TemplateEntry] = {}
+_TEMPLATE_CACHE_LOCK = threading.Lock()
+
+
+def _open_template(template_path: str) -> _TemplateEntry:
+    """按 路径+修改时间+大小 缓存已解析的模板工作簿与表头信息。
+
+    同一模板只从磁盘读取、解析并扫描一次；之后的写入直接复用缓存的工作簿
+    （openpyxl 工作簿的 deepcopy 会丢失样式表，不能用于复制模板）。
+    """
+    abs_path = os.path.abspath(template_path)
+    st = os.stat(abs_path)
+    key = (abs_path, st.st_mtime_ns, st.st_size)
+    with _TEMPLATE_CACHE_LOCK:
+        entry = _TEMPLATE_CACHE.get(abs_path)
+    if entry is not None and entry.key == key:
+        return entry
+    with open(abs_path, "rb") as f:
+        data = f.read()
+    entry = _TemplateEntry(key, load_workbook(io.BytesIO(data)))
+    with _TEMPLATE_CACHE_LOCK:
+        _TEMPLATE_CACHE[abs_path] = entry
+    return entry
+
+
+def clear_template_cache() -> None:
+    with _TEMPLATE_CACHE_LOCK:
+        _TEMPLATE_CACHE.clear()
+
+
+def output_filename(title: str) -> str:
+    """输出文件名：仅标题.xlsx（去除文件名非法字符，同名覆盖）。"""
+    safe_title = "".join(ch for ch in title if ch not in "\\/:*?\"<>|") or "输出"
+    return f"{safe_title}.xlsx"
+
 
 def write_to_template(template_path: str, output_dir: str, title: str,
                       points: List[Tuple[str, str]],
@@ -13,11 +71,26 @@ def write_to_template(template_path: str, output_dir: str, title: str,
     - column_map: { title_column, point_column, content_column }
     返回生成的输出文件路径。
     """
+    os.makedirs(output_dir, exist_ok=True)
+    out_path = os.path.join(output_dir, output_filename(title))
+    render_template(template_path, points, column_map, images, output=out_path)
+    return out_path
+
+
+def render_template(template_path: str,
+                    points: List[Tuple[str, str]],
+                    column_map: Dict[str, str],
+                    images: Optional[List[Optional[str]]] = None,
+                    output: Union[None, str, BinaryIO] = None) -> Optional[bytes]:
+    """与 write_to_template 相同的写入逻辑（不含文件命名），输出目标由调用方决定：
+    - output 为 None：返回 xlsx 字节（可直接写入压缩包，无需落盘）
+    - output 为路径或可写的二进制文件对象：写入其中并返回 None
+    """
     if not os.path.exists(template_path):
         raise FileNotFoundError(f"模板文件不存在: {template_path}")
 
-    wb = load_workbook(template_path)
-    ws = wb.active
+    with span("template_load", path=os.path.basename(template_path)):
+        entry = _open_template(template_path)
 
     # 读取表头行（第一行）以定位列索引
     # 扫描前10行以定位表头行（可能不在第1行）
@@ -31,14 +104,18 @@ def write_to_template(template_path: str, output_dir: str, title: str,
     image_col_name = column_map.get("image_column")
     need_cols = [page_col_name, point_title_col_name, point_content_col_name, extra_text_col_name]
 
-    header_row = None
-    headers: List[Optional[str]] = []
-    for r in range(1, min(10, ws.max_row) + 1):
-        row_vals = [c.value for c in ws[r]]
-        if row_vals and all(col in row_vals for col in need_cols):
-            header_row = r
-            headers = row_vals
-            break
+    header_key = tuple(need_cols)
+    cached_header = entry.headers.get(header_key)
+    if cached_header is None:
+        header_row = None
+        headers: List[Optional[str]] = []
+        for r, row_vals in enumerate(entry.top_rows, 1):
+            if row_vals and all(col in row_vals for col in need_cols):
+                header_row = r
+                headers = row_vals
+                break
+        cached_header = entry.headers[header_key] = (header_row, headers)
+    header_row, headers = cached_header
 
     if header_row is None:
         # 汇总候选行信息以便用户排查
@@ -73,37 +150,53 @@ def write_to_template(template_path: str, output_dir: str, title: str,
         raise ValueError(f"模板缺少必需列: {', '.join(missing)}（表头行: 第{header_row}行）")
 
     # 定位写入起始行（在现有数据之后的下一行）
-    write_row_start = ws.max_row + 1
-
-    # 写入多行：每个分论点一行，包含 页面 / 标题 / 内容
-    numerals = ["一","二","三","四","五","六","七","八","九","十","十一","十二","十三","十四","十五","十六","十七","十八","十九","二十"]
-    for idx, (pt_title, pt_content) in enumerate(points):
-        row = write_row_start + idx
-        num_cn = numerals[idx] if idx < len(numerals) else f"{idx+1}"
-        page_val = f"分论点{num_cn}页面"
-        ws.cell(row=row, column=page_col, value=page_val)
-        ws.cell(row=row, column=point_title_col, value=pt_title)
-        # 直接写入内容，不做任何删改
-        ws.cell(row=row, column=point_content_col, value=pt_content)
-        # 写入文本_3默认内容
-        ws.cell(row=row, column=extra_text_col, value=extra_text_default)
-        # 可选：写入图片文件名（例如 图片_1 列）
+    write_row_start = entry.max_row + 1
+
+    # 复用缓存的工作簿：同一模板的写入串行进行
+    with entry.lock:
+        wb = entry.wb
+        ws = wb.active
+        current_row = ws._current_row
+        # 保存时 openpyxl 会回写列的最大大纲级别与 sheetFormatPr，需一并恢复以保证每次输出与首次写入一致
+        outline = (ws.column_dimensions.max_outline, ws.sheet_format.outlineLevelRow, ws.sheet_format.outlineLevelCol)
         try:
-            if image_col is not None and isinstance(images, list):
-                img_path = images[idx] if idx < len(images) else None
-                # 仅写入不带后缀的文件名，例如 'image001'
-                img_name = None
-                if img_path:
-                    base = os.path.basename(img_path)
-                    img_name = os.path.splitext(base)[0]
-                ws.cell(row=row, column=image_col, value=img_name or "")
-        except Exception:
-            # 图片写入不影响整体流程
-            pass
-
-    # 输出文件名：仅标题.xlsx（同名覆盖）
-    os.makedirs(output_dir, exist_ok=True)
-    safe_title = "".join(ch for ch in title if ch not in "\\/:*?\"<>|") or "输出"
-    out_path = os.path.join(output_dir, f"{safe_title}.xlsx")
-    wb.save(out_path)
-    return out_path
\ No newline at end of file
+            # 写入多行：每个分论点一行，包含 页面 / 标题 / 内容
+            numerals = ["一","二","三","四","五","六","七","八","九","十","十一","十二","十三","十四","十五","十六","十七","十八","十九","二十"]
+            for idx, (pt_title, pt_content) in enumerate(points):
+                row = write_row_start + idx
+                num_cn = numerals[idx] if idx < len(numerals) else f"{idx+1}"
+                page_val = f"分论点{num_cn}页面"
+                ws.cell(row=row, column=page_col, value=page_val)
+                ws.cell(row=row, column=point_title_col, value=pt_title)
+                # 直接写入内容，不做任何删改
+                ws.cell(row=row, column=point_content_col, value=pt_content)
+                # 写入文本_3默认内容
+                ws.cell(row=row, column=extra_text_col, value=extra_text_default)
+                # 可选：写入图片文件名（例如 图片_1 列）
+                try:
+                    if image_col is not None and isinstance(images, list):
+                        img_path = images[idx] if idx < len(images) else None
+                        # 仅写入不带后缀的文件名，例如 'image001'
+                        img_name = None
+                        if img_path:
+                            base = os.path.basename(img_path)
+                            img_name = os.path.splitext(base)[0]
+                        ws.cell(row=row, column=image_col, value=img_name or "")
+                except Exception:
+                    # 图片写入不影响整体流程
+                    pass
+
+            with span("save", rows=len(points)):
+                if output is not None:
+                    wb.save(output)
+                    return None
+                buf = io.BytesIO()
+                wb.save(buf)
+                return buf.getvalue()
+        finally:
+            # 删除本次追加的单元格，缓存的工作簿回到模板原样
+            for key in [k for k in ws._cells if k[0] >= write_row_start]:
+                del ws._cells[key]
+            ws._current_row = current_row
+            (ws.column_dimensions.max_outline, ws.sheet_format.outlineLevelRow,
+             ws.sheet_format.outlineLevelCol) = outline
@@ -1,10 +1,373 @@
 import time
-from typing import Dict, List, Optional, Tuple
-import os
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 import json as _json
 import logging
+import queue
+import random
+import threading
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from .snapshots import write_snapshot
+from .tracing import span
+
+# 可重试的 HTTP 状态码与飞书错误码（限流/暂时不可用），命中时按指数退避重试：
+# - 99991400：应用请求频率超限
+# - 1254290：多维表格请求过于频繁；1254291：写冲突；1254607：数据未就绪
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRYABLE_CODES = {99991400, 1254290, 1254291, 1254607}
+# tenant_access_token 无效或过期：丢弃缓存的 token 后重新获取一次
+TOKEN_INVALID_CODES = {99991663, 99991668}
+
+# 多维表格“修改时间”字段类型
+MODIFIED_TIME_FIELD_TYPE = 1002
+
+_SESSIONS: Dict[int, requests.Session] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+class TableSchema:
+    """多维表格字段元数据快照：字段名->字段ID，以及单选/多选字段的 选项名->选项ID。"""
+
+    def __init__(self, items: List[Dict]):
+        self.fetched_at = time.monotonic()
+        self.fields: Dict[str, str] = {}
+        self.types: Dict[str, int] = {}
+        self.options: Dict[str, Dict[str, str]] = {}
+        for f in items:
+            # 兼容不同结构键名：使用 name/field_name 与 id/field_id
+            name = f.get("name") or f.get("field_name")
+            fid = f.get("id") or f.get("field_id")
+            if not (name and fid):
+                continue
+            self.fields[str(name)] = str(fid)
+            try:
+                self.types[str(name)] = int(f.get("type") or 0)
+            except (TypeError, ValueError):
+                self.types[str(name)] = 0
+            opts: Dict[str, str] = {}
+            for o in (f.get("property") or {}).get("options") or []:
+                if not isinstance(o, dict):
+                    continue
+                oname = o.get("name")
+                oid = o.get("id") or o.get("option_id")
+                if oname and oid:
+                    opts.setdefault(str(oname), str(oid))
+            if opts:
+                self.options[str(fid)] = opts
+
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    def fingerprint(self) -> str:
+        """字段结构指纹（字段名、ID、类型）：变化时增量同步需退回全量扫描。"""
+        return "|".join(f"{n}:{self.fields[n]}:{self.types.get(n, 0)}" for n in sorted(self.fields))
+
+    def modified_time_field(self) -> Optional[str]:
+        """表中的“修改时间”字段（类型 1002），用于按更新时间增量拉取。"""
+        for name, ftype in self.types.items():
+            if ftype == MODIFIED_TIME_FIELD_TYPE:
+                return name
+        return None
+
+
+# 字段元数据缓存：(app_token, table_id) -> TableSchema，进程内所有 FeishuClient 共享
+_SCHEMA_CACHE: Dict[Tuple[str, str], TableSchema] = {}
+_SCHEMA_LOCK = threading.Lock()
+
+
+def clear_schema_cache(app_token: Optional[str] = None, table_id: Optional[str] = None) -> None:
+    """清除字段元数据缓存；不传参数时清空全部。"""
+    with _SCHEMA_LOCK:
+        if app_token is None and table_id is None:
+            _SCHEMA_CACHE.clear()
+        else:
+            _SCHEMA_CACHE.pop((app_token or "", table_id or ""), None)
+
+
+def _modified_ms(value) -> Optional[int]:
+    """把记录的修改时间（毫秒时间戳，可能是数字或数字字符串）规整为 int。"""
+    try:
+        return int(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_text(v) -> str:
+    """把多维表格字段值（文本段列表、选项、对象等）转换为纯文本。"""
+    if v is None:
+        return ""
+    if isinstance(v, list):
+        try:
+            if all(isinstance(x, dict) for x in v):
+                parts: List[str] = []
+                for x in v:
+                    extracted = None
+                    for key in ("text", "value", "content", "name"):
+                        if key in x and isinstance(x[key], (str, int, float)):
+                            extracted = str(x[key])
+                            break
+                    parts.append(extracted if extracted is not None else str(x))
+                return "\n".join(parts)
+        except Exception:
+            pass
+        return "\n".join(str(x) for x in v)
+    if isinstance(v, dict):
+        try:
+            for key in ("text", "value", "content"):
+                if key in v and isinstance(v[key], (str, int, float)):
+                    return str(v[key])
+        except Exception:
+            pass
+        try:
+            return _json.dumps(v, ensure_ascii=False)
+        except Exception:
+            return str(v)
+    return str(v)
+
+
+class _RecordDecoder:
+    """把搜索接口返回的原始记录转换为界面使用的字典。
+
+    字段名/字段ID、标题候选与内容回退字段在构造时按字段映射确定一次，逐条解码时只做字典查找。
+    同时支持按字段名与字段ID读取（API 可能返回 name-keyed 或 id-keyed），优先按字段名。
+    """
+
+    TITLE_CANDIDATES = ("标题", "笔记标题", "标题（人工审核）")
+    CONTENT_FALLBACKS = ("发布内容一键复制", "笔记信息")
+
+    def __init__(self, fields_map: Dict[str, str], status_field_name: str,
+                 content_field_name: str, modified_field_name: Optional[str]):
+        self.status_field_name = status_field_name
+        self.status_field_id = fields_map.get(status_field_name)
+        self.content_field_name = content_field_name
+        self.content_field_id = fields_map.get(content_field_name)
+        self.modified_field_name = modified_field_name
+        # 标题字段：尝试多候选名称
+        self.title_field_id = next((fields_map[c] for c in self.TITLE_CANDIDATES if fields_map.get(c)), None)
+        self.fallbacks = [(name, fields_map.get(name)) for name in self.CONTENT_FALLBACKS]
+        self.logger = logging.getLogger("xhs_tool")
+        self.debug = self.logger.isEnabledFor(logging.DEBUG)
+
+    @staticmethod
+    def _value(fields: Dict, fid: Optional[str], fname: Optional[str]):
+        if fname and fname in fields:
+            return fields[fname]
+        if fid and fid in fields:
+            return fields[fid]
+        return None
+
+    def decode(self, rec: Dict) -> Dict:
+        fields = rec.get("fields", {})
+        if not isinstance(fields, dict):
+            fields = {}
+        content_val = self._value(fields, self.content_field_id, self.content_field_name)
+        status_val = self._value(fields, self.status_field_id, self.status_field_name)
+        title_val = None
+        # 先按候选名称读取标题；未命中再尝试候选ID
+        for cand in self.TITLE_CANDIDATES:
+            if cand in fields:
+                title_val = fields[cand]
+                break
+        if title_val is None and self.title_field_id is not None:
+            title_val = fields.get(self.title_field_id)
+        if self.debug:
+            self.logger.debug(
+                "[FeishuClient] rec_id=%s fields_keys=%s content_raw_type=%s status_raw_type=%s title_raw_type=%s",
+                rec.get("record_id"),
+                list(fields.keys()),
+                type(content_val).__name__,
+                type(status_val).__name__,
+                type(title_val).__name__ if self.title_field_id else None,
+            )
+        content_text = _to_text(content_val)
+        if not content_text:
+            for cand_name, cand_id in self.fallbacks:
+                # 先按字段名尝试，再按字段ID尝试
+                for key, how in ((cand_name, "按名称"), (cand_id, "按ID")):
+                    if key and key in fields:
+                        alt_text = _to_text(fields[key])
+                        if alt_text:
+                            self.logger.info(
+                                "[FeishuClient] 内容为空，回退字段 '%s' 命中（%s），rec_id=%s",
+                                cand_name, how, rec.get("record_id"),
+                            )
+                            content_text = alt_text
+                            break
+                if content_text:
+                    break
+        modified = rec.get("last_modified_time")
+        if not modified and self.modified_field_name:
+            modified = fields.get(self.modified_field_name)
+        return {
+            "record_id": rec.get("record_id"),
+            "title": _to_text(title_val) or rec.get("record_id"),
+            "status": _to_text(status_val),
+            "content": content_text,
+            "updated_time": _modified_ms(modified or rec.get("updated_time")),
+        }
+
+
+def shared_session(pool_size: int = 10) -> requests.Session:
+    """进程内共享的 keep-alive 连接池会话（按连接池大小区分）。
+
+    界面每次操作都会新建 FeishuClient，共享会话才能跨实例复用到 open.feishu.cn 的连接。
+    重试由 FeishuClient._request 负责（需要识别响应体里的飞书错误码），适配器本身不重试。
+    """
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(pool_size)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _SESSIONS[pool_size] = session
+        return session
+
+
+# 开放平台接口根地址；可用设置项 feishu_api_base 覆盖（如 Lark 国际版或本地模拟服务）
+DEFAULT_API_BASE = "https://open.feishu.cn/open-apis"
+AUTH_PATH = "/auth/v3/tenant_access_token/internal"
+# 距过期不足该秒数时后台提前刷新；飞书在剩余有效期少于 30 分钟时才会签发新 token
+TOKEN_REFRESH_AHEAD = 300
+# 距过期不足该秒数时视为已过期，同步重新获取（后台刷新失败时的兜底）
+TOKEN_EXPIRY_MARGIN = 60
+# 后台刷新连续失败该次数后停止后台刷新（之后由调用方在需要时同步获取）
+TOKEN_REFRESH_MAX_FAILURES = 3
+
+
+class TenantTokenProvider:
+    """进程内共享的 tenant_access_token（每组 app_id/app_secret 一个实例，线程安全）。
+
+    - 按接口返回的 expire（秒）计算过期时间，不再假定固定 1 小时
+    - 到期前 TOKEN_REFRESH_AHEAD 秒由后台定时器提前刷新，调用方通常直接拿到有效 token；
+      上个有效期内没有被使用过、或连续失败 TOKEN_REFRESH_MAX_FAILURES 次时停止后台刷新，
+      background_refresh=False 时完全不启动后台刷新
+    - 并发的刷新合并为一次请求：拿到刷新锁的线程请求，其余线程等待后直接使用新 token
+    """
+
+    def __init__(self, app_id: str, app_secret: str, api_base: str = DEFAULT_API_BASE,
+                 background_refresh: bool = True):
+        self.auth_url = api_base + AUTH_PATH
+        self.app_id = app_id
+        self.app_secret = app_secret
+        self.background_refresh = background_refresh
+        self._token = ""
+        self._expires_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._timer_lock = threading.Lock()
+        self._closed = False
+        self._used = False
+        self._failures = 0
+
+    def _valid(self, margin: float) -> bool:
+        return bool(self._token) and time.time() < self._expires_at - margin
+
+    def token(self, request: Callable[..., Dict]) -> str:
+        """返回有效 token；request 为发送请求的函数（FeishuClient._request），仅在需要刷新时调用。"""
+        self._used = True
+        token = self._token
+        if self._valid(TOKEN_EXPIRY_MARGIN):
+            return token
+        return self.refresh(request, force=False)
+
+    def refresh(self, request: Callable[..., Dict], force: bool = True) -> str:
+        with self._refresh_lock:
+            # 等锁期间其他线程已完成刷新
+            if not force and self._valid(TOKEN_EXPIRY_MARGIN):
+                return self._token
+            data = request("POST", self.auth_url, json={"app_id": self.app_id, "app_secret": self.app_secret}, timeout=15)
+            if data.get("code") != 0:
+                raise RuntimeError(f"获取租户 token 失败: {data}")
+            token = data.get("tenant_access_token")
+            if not token:
+                raise RuntimeError("未返回 tenant_access_token")
+            try:
+                expire = float(data.get("expire") or 7200)
+            except (TypeError, ValueError):
+                expire = 7200.0
+            self._token = token
+            self._expires_at = time.time() + expire
+            self._failures = 0
+            self._schedule(request, max(expire - TOKEN_REFRESH_AHEAD, TOKEN_EXPIRY_MARGIN))
+            return token
+
+    def invalidate(self, token: str) -> None:
+        """服务端判定 token 无效时调用；仅当仍是同一个 token 时才丢弃，避免覆盖刚刷新的结果。"""
+        if token and token == self._token:
+            self._expires_at = 0.0
+
+    def close(self) -> None:
+        """停止后台刷新；已获取的 token 仍可使用，过期后由调用方同步重新获取。"""
+        with self._timer_lock:
+            self._closed = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _schedule(self, request: Callable[..., Dict], delay: float) -> None:
+        if not self.background_refresh:
+            return
+        with self._timer_lock:
+            if self._closed:
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(delay, self._background_refresh, (request,))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _background_refresh(self, request: Callable[..., Dict]) -> None:
+        logger = logging.getLogger("xhs_tool")
+        if not self._used:
+            # 整个有效期内无人使用：不再续期，下次使用时同步获取并重新开始后台刷新
+            logger.debug("[FeishuClient] tenant_access_token 未被使用，停止后台刷新: %s", self.app_id)
+            return
+        self._used = False
+        try:
+            self.refresh(request)
+        except Exception as e:
+            # 失败不影响使用：临近过期时调用方会同步重新获取
+            self._failures += 1
+            self._used = True
+            remaining = self._expires_at - TOKEN_EXPIRY_MARGIN - time.time()
+            if self._failures >= TOKEN_REFRESH_MAX_FAILURES or remaining <= 0:
+                logger.warning("[FeishuClient] 后台刷新 tenant_access_token 连续失败 %d 次，停止后台刷新: %s",
+                               self._failures, e)
+                return
+            logger.warning("[FeishuClient] 后台刷新 tenant_access_token 失败: %s", e)
+            self._schedule(request, min(TOKEN_EXPIRY_MARGIN * 2 ** (self._failures - 1), remaining))
+
+
+_TOKEN_PROVIDERS: Dict[Tuple[str, str, str], TenantTokenProvider] = {}
+_TOKEN_PROVIDERS_LOCK = threading.Lock()
+
+
+def token_provider(app_id: str, app_secret: str, api_base: str = DEFAULT_API_BASE,
+                   register: bool = True) -> TenantTokenProvider:
+    """按接口地址与应用凭证返回进程内共享的 token 提供者。
+
+    register=False 时若尚无共享实例，返回一个不登记、不做后台刷新的临时实例（用于测试任意凭证）。
+    """
+    key = (api_base, app_id, app_secret)
+    with _TOKEN_PROVIDERS_LOCK:
+        provider = _TOKEN_PROVIDERS.get(key)
+        if provider is None:
+            if not register:
+                return TenantTokenProvider(app_id, app_secret, api_base, background_refresh=False)
+            provider = _TOKEN_PROVIDERS[key] = TenantTokenProvider(app_id, app_secret, api_base)
+        return provider
+
+
+def close_token_providers() -> None:
+    """停止并移除所有共享 token 提供者（凭证变更或测试结束时调用）。"""
+    with _TOKEN_PROVIDERS_LOCK:
+        providers = list(_TOKEN_PROVIDERS.values())
+        _TOKEN_PROVIDERS.clear()
+    for provider in providers:
+        provider.close()
 
 
 class FeishuClient:
@@ -19,57 +382,171 @@ class FeishuClient:
     - feishu_status_done_value (默认 "已完成")
     - feishu_content_field_name (默认 "去敏感词")
     - feishu_page_size (默认 50)
+    - feishu_pool_size (连接池大小，默认 10)
+    - feishu_max_retries / feishu_backoff_base / feishu_backoff_max (重试次数与退避秒数，默认 3 / 0.5 / 8)
+    - feishu_schema_ttl (字段元数据缓存秒数，默认 300)
+    - feishu_modified_field_name (增量同步使用的“修改时间”字段，默认自动识别)
+    - feishu_api_base (开放平台接口根地址，默认 https://open.feishu.cn/open-apis)
     """
 
-    AUTH_URL = "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
-    FIELDS_URL_TPL = "https://open.feishu.cn/open-apis/bitable/v1/apps/{app_token}/tables/{table_id}/fields"
-    SEARCH_URL_TPL = "https://open.feishu.cn/open-apis/bitable/v1/apps/{app_token}/tables/{table_id}/records/search"
+    TABLE_PATH_TPL = "/bitable/v1/apps/{app_token}/tables/{table_id}"
+    # 批量更新接口单次最多 1000 条记录
+    BATCH_UPDATE_LIMIT = 1000
 
-    def __init__(self, settings: Dict[str, str]):
+    def __init__(self, settings: Dict[str, str], session: Optional[requests.Session] = None):
         self.settings = settings
-        self._token_cache: Tuple[str, float] = ("", 0.0)
+        self.session = session or shared_session(int(settings.get("feishu_pool_size", 10) or 10))
+        self.max_retries = int(settings.get("feishu_max_retries", 3))
+        self.backoff_base = float(settings.get("feishu_backoff_base", 0.5))
+        self.backoff_max = float(settings.get("feishu_backoff_max", 8.0))
+        self.schema_ttl = float(settings.get("feishu_schema_ttl", 300))
+        self.api_base = str(settings.get("feishu_api_base", "") or DEFAULT_API_BASE).strip().rstrip("/")
+
+    def table_url(self, app_token: str, table_id: str, suffix: str = "") -> str:
+        """多维表格数据表接口地址，suffix 如 "/fields"、"/records/search"。"""
+        return self.api_base + self.TABLE_PATH_TPL.format(app_token=app_token, table_id=table_id) + suffix
+
+    def _retry_delay(self, attempt: int, resp: Optional[requests.Response] = None) -> float:
+        # 优先遵循服务端给出的等待时间（秒）
+        if resp is not None:
+            for header in ("x-ogw-ratelimit-reset", "Retry-After"):
+                try:
+                    value = float(resp.headers.get(header, ""))
+                except ValueError:
+                    continue
+                return max(0.0, min(value, self.backoff_max))
+        # 指数退避 + 抖动，避免多个请求同时重试
+        delay = min(self.backoff_base * (2 ** attempt), self.backoff_max)
+        return delay * random.uniform(0.5, 1.0)
+
+    def _request(self, method: str, url: str, timeout: float = 15, **kwargs) -> Dict:
+        """经连接池发送请求并返回 JSON。
+
+        连接错误、超时、429/5xx 以及飞书限流错误码按指数退避重试；
+        重试耗尽后：有 JSON 响应则原样返回（由调用方按 code 报错），否则抛出最后的异常。
+        """
+        logger = logging.getLogger("xhs_tool")
+        attempt = 0
+        token_retried = False
+        while True:
+            resp: Optional[requests.Response] = None
+            data = None
+            try:
+                with span("http", cat="feishu", method=method, path=url.split("?", 1)[0][len(self.api_base):],
+                          attempt=attempt) as sp:
+                    resp = self.session.request(method, url, timeout=timeout, **kwargs)
+                    try:
+                        data = resp.json()
+                    except ValueError:
+                        data = None
+                    sp.set(status=resp.status_code, code=data.get("code") if isinstance(data, dict) else None)
+                if (isinstance(data, dict) and data.get("code") in TOKEN_INVALID_CODES
+                        and not token_retried and "Authorization" in (kwargs.get("headers") or {})):
+                    # token 被服务端判定无效（如在别处重置了应用凭证）：丢弃缓存重新获取后重发一次
+                    token_retried = True
+                    provider = self._token_provider()
+                    provider.invalidate(kwargs["headers"]["Authorization"][len("Bearer "):])
+                    kwargs["headers"] = dict(kwargs["headers"], Authorization=f"Bearer {provider.token(self._request)}")
+                    continue
+                retry = resp.status_code in RETRYABLE_STATUS or (
+                    isinstance(data, dict) and data.get("code") in RETRYABLE_CODES
+                )
+                if not retry or attempt >= self.max_retries:
+                    if isinstance(data, dict):
+                        return data
+                    resp.raise_for_status()
+                    raise RuntimeError(f"响应不是 JSON: HTTP {resp.status_code} {url}")
+                reason = f"HTTP {resp.status_code} code={data.get('code') if isinstance(data, dict) else None}"
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                reason = f"{type(e).__name__}: {e}"
+            delay = self._retry_delay(attempt, resp)
+            logger.warning("[FeishuClient] %s %s 失败（%s），%.1fs 后第 %d 次重试",
+                           method, url, reason, delay, attempt + 1)
+            time.sleep(delay)
+            attempt += 1
 
-    def _get_token(self) -> str:
-        cached, ts = self._token_cache
-        # 简单的 1 小时缓存
-        if cached and (time.time() - ts) < 3600:
-            return cached
+    def _token_provider(self, register: bool = True) -> TenantTokenProvider:
         app_id = self.settings.get("feishu_app_id", "").strip()
         app_secret = self.settings.get("feishu_app_secret", "").strip()
         if not app_id or not app_secret:
             raise ValueError("缺少飞书 app_id 或 app_secret")
-        resp = requests.post(self.AUTH_URL, json={"app_id": app_id, "app_secret": app_secret}, timeout=15)
-        data = resp.json()
-        if data.get("code") != 0:
-            raise RuntimeError(f"获取租户 token 失败: {data}")
-        token = data.get("tenant_access_token")
-        if not token:
-            raise RuntimeError("未返回 tenant_access_token")
-        self._token_cache = (token, time.time())
-        return token
+        return token_provider(app_id, app_secret, self.api_base, register=register)
+
+    def get_tenant_token(self, register: bool = True) -> str:
+        """获取 tenant_access_token（进程内共享缓存，按 expire 过期并在后台提前刷新）。
+
+        register=False（如配置对话框测试连通性）：凭证已在使用时复用共享缓存，
+        否则只临时鉴权一次，不登记共享实例、不启动后台刷新。
+        """
+        return self._token_provider(register).token(self._request)
 
     def _headers(self) -> Dict[str, str]:
-        return {"Authorization": f"Bearer {self._get_token()}", "Content-Type": "application/json"}
+        return {"Authorization": f"Bearer {self.get_tenant_token()}", "Content-Type": "application/json"}
+
+    def _fetch_schema(self, app_token: str, table_id: str) -> TableSchema:
+        url = self.table_url(app_token, table_id, "/fields")
+        fields: List[Dict] = []
+        page_token: Optional[str] = None
+        # 字段列表接口分页（默认每页 20 个），字段较多的表需要翻页才能取全
+        while True:
+            params: Dict = {"page_size": 100}
+            if page_token:
+                params["page_token"] = page_token
+            data = self._request("GET", url, headers=self._headers(), params=params, timeout=15)
+            if data.get("code") != 0:
+                raise RuntimeError(f"获取字段失败: {data}")
+            fields.extend(data.get("data", {}).get("items", []) or [])
+            page_token = data.get("data", {}).get("page_token")
+            if not page_token or not data.get("data", {}).get("has_more", True):
+                break
+        return TableSchema(fields)
+
+    def get_schema(self, app_token: str, table_id: str, refresh: bool = False) -> TableSchema:
+        """返回表的字段元数据；在 TTL 内复用进程级缓存，refresh=True 时强制重新获取。"""
+        key = (app_token, table_id)
+        if not refresh:
+            with _SCHEMA_LOCK:
+                schema = _SCHEMA_CACHE.get(key)
+            if schema is not None and schema.age() < self.schema_ttl:
+                return schema
+        schema = self._fetch_schema(app_token, table_id)
+        with _SCHEMA_LOCK:
+            _SCHEMA_CACHE[key] = schema
+        return schema
+
+    def _schema_with(self, app_token: str, table_id: str, field_names: List[str]) -> TableSchema:
+        """取缓存的字段元数据；缺少所需字段时视为缓存过期，重新获取一次（字段可能刚被新增或改名）。"""
+        schema = self.get_schema(app_token, table_id)
+        if all(name in schema.fields for name in field_names):
+            return schema
+        return self.get_schema(app_token, table_id, refresh=True)
 
     def get_fields_map(self, app_token: str, table_id: str) -> Dict[str, str]:
         """返回 字段名->字段ID 的映射。"""
-        url = self.FIELDS_URL_TPL.format(app_token=app_token, table_id=table_id)
-        resp = requests.get(url, headers=self._headers(), timeout=15)
-        data = resp.json()
-        if data.get("code") != 0:
-            raise RuntimeError(f"获取字段失败: {data}")
-        fields = data.get("data", {}).get("items", [])
-        # 兼容不同结构键名：使用 name/field_name 与 id/field_id
-        mapping: Dict[str, str] = {}
-        for f in fields:
-            name = f.get("name") or f.get("field_name")
-            fid = f.get("id") or f.get("field_id")
-            if name and fid:
-                mapping[str(name)] = str(fid)
-        return mapping
+        return dict(self.get_schema(app_token, table_id).fields)
 
-    def search_done_records(self) -> List[Dict]:
-        """按设置查询“笔记状态=已完成”的记录，返回记录列表。"""
+    def get_option_id(self, app_token: str, table_id: str, field_name: str, option_name: str) -> Optional[str]:
+        """返回单选/多选字段中指定选项的ID；缓存未命中时重新获取一次元数据，仍找不到返回 None。"""
+        schema = self._schema_with(app_token, table_id, [field_name])
+        fid = schema.fields.get(field_name)
+        opt_id = schema.options.get(fid, {}).get(option_name) if fid else None
+        # 选项可能是新加的：缓存不是刚取回的就再取一次
+        if opt_id is None and schema.age() > 1.0:
+            schema = self.get_schema(app_token, table_id, refresh=True)
+            fid = schema.fields.get(field_name)
+            opt_id = schema.options.get(fid, {}).get(option_name) if fid else None
+        return opt_id
+
+    def _modified_field_name(self, schema: TableSchema) -> Optional[str]:
+        name = str(self.settings.get("feishu_modified_field_name", "") or "").strip()
+        if name and name in schema.fields:
+            return name
+        return schema.modified_time_field()
+
+    def _search_plan(self, modified_since: Optional[int] = None) -> Dict:
+        """解析搜索相关设置、获取字段映射并构造请求体与记录解码器（每次搜索只做一次）。"""
         app_token = self.settings.get("feishu_bitable_app_token", "").strip()
         table_id = self.settings.get("feishu_bitable_table_id", "").strip()
         if not app_token or not table_id:
@@ -94,8 +571,7 @@ class FeishuClient:
                 s = str(field_names_setting or "").strip()
                 if s:
                     if s.startswith("[") and s.endswith("]"):
-                        import json as __json
-                        arr = __json.loads(s)
+                        arr = _json.loads(s)
                         if isinstance(arr, list):
                             field_names = [str(x).strip() for x in arr if str(x).strip()]
                     else:
@@ -105,225 +581,269 @@ class FeishuClient:
         sort_desc = sort_desc_setting in ("1", "true", "yes", "y")
         automatic_fields = automatic_fields_setting in ("1", "true", "yes", "y")
 
-        fields_map = self.get_fields_map(app_token, table_id)
-        status_field_id = fields_map.get(status_field_name)
-        content_field_id = fields_map.get(content_field_name)
-        # 标题字段：尝试多候选名称
-        title_field_id = None
-        for _cand in ("标题", "笔记标题", "标题（人工审核）"):
-            _fid = fields_map.get(_cand)
-            if _fid:
-                title_field_id = _fid
-                break
-        if not status_field_id:
+        schema = self._schema_with(app_token, table_id, [status_field_name, content_field_name])
+        fields_map = dict(schema.fields)
+        modified_field_name = self._modified_field_name(schema)
+        if modified_since is not None and not modified_field_name:
+            raise ValueError("表中没有“修改时间”字段，无法增量同步")
+        if field_names and modified_field_name and modified_field_name not in field_names:
+            field_names.append(modified_field_name)
+        decoder = _RecordDecoder(fields_map, status_field_name, content_field_name, modified_field_name)
+        if not decoder.status_field_id:
             raise ValueError(f"未找到状态字段: {status_field_name}")
-        if not content_field_id:
+        if not decoder.content_field_id:
             raise ValueError(f"未找到内容字段: {content_field_name}")
         # 记录关键映射，方便调试
+        logging.getLogger("xhs_tool").info(
+            "[FeishuClient] 字段映射: status='%s'->%s, content='%s'->%s, title='标题'->%s",
+            status_field_name,
+            decoder.status_field_id,
+            content_field_name,
+            decoder.content_field_id,
+            decoder.title_field_id,
+        )
+
+        if modified_since is None:
+            conditions = [
+                {
+                    "field_name": status_field_name,
+                    "operator": "is",
+                    "value": [status_done_value],
+                }
+            ]
+        else:
+            # 日期筛选按天比较，用“大于等于”避免漏掉同一天内的后续修改（重复记录合并时覆盖即可）
+            conditions = [
+                {
+                    "field_name": modified_field_name,
+                    "operator": "isGreaterEqual",
+                    "value": ["ExactDate", str(int(modified_since))],
+                }
+            ]
+        # 使用 REST 路径：强制字段名条件筛选 + 分页
+        payload: Dict = {
+            "filter": {
+                "conjunction": "and",
+                "conditions": conditions,
+            },
+            "page_size": page_size,
+        }
+        if view_id:
+            payload["view_id"] = view_id
+        if field_names:
+            payload["field_names"] = field_names
+        if sort_field_name:
+            payload["sort"] = [{"field_name": sort_field_name, "desc": sort_desc}]
+        payload["automatic_fields"] = automatic_fields
+
+        return {
+            "url": self.table_url(app_token, table_id, "/records/search"),
+            "payload": payload,
+            "decoder": decoder,
+            "meta": {
+                "status_field_name": status_field_name,
+                "status_field_id": decoder.status_field_id,
+                "content_field_name": content_field_name,
+                "content_field_id": decoder.content_field_id,
+                "title_field_id": decoder.title_field_id,
+                "fields_map": fields_map,
+                "view_id": view_id,
+                "field_names": field_names,
+                "sort_field_name": sort_field_name,
+                "sort_desc": sort_desc,
+                "automatic_fields": automatic_fields,
+            },
+        }
+
+    def _produce_pages(self, url: str, payload: Dict, out: "queue.Queue", stop: threading.Event) -> None:
+        """生产者：沿 page_token 逐页请求，把原始页数据放入队列；出错时把异常交给消费者。"""
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    out.put(item, timeout=0.2)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        page_token: Optional[str] = None
         try:
-            logger = logging.getLogger("xhs_tool")
-            logger.info(
-                "[FeishuClient] 字段映射: status='%s'->%s, content='%s'->%s, title='标题'->%s",
-                status_field_name,
-                status_field_id,
-                content_field_name,
-                content_field_id,
-                title_field_id,
-            )
-        except Exception:
-            pass
+            while not stop.is_set():
+                page_payload = dict(payload)
+                if page_token:
+                    page_payload["page_token"] = page_token
+                data = self._request("POST", url, headers=self._headers(), json=page_payload, timeout=20)
+                if data.get("code") != 0:
+                    raise RuntimeError(f"搜索记录失败: {data} | payload={page_payload}")
+                body = data.get("data", {}) or {}
+                if not put(("page", body, page_payload)):
+                    return
+                page_token = body.get("page_token")
+                if not page_token:
+                    break
+            put(("done", None, None))
+        except BaseException as e:
+            put(("error", e, None))
 
-        url = self.SEARCH_URL_TPL.format(app_token=app_token, table_id=table_id)
+    def iter_record_pages(self, modified_since: Optional[int] = None,
+                          raw_items: Optional[List[Dict]] = None,
+                          plan: Optional[Dict] = None) -> Iterator[List[Dict]]:
+        """逐页产出解码后的记录（参数含义同 search_done_records）。
+
+        后台线程沿 page_token 请求下一页的同时，当前线程解码并交付上一页，
+        总耗时接近纯网络时间；调用方拿到第一页即可开始显示。
+        raw_items 不为 None 时追加原始记录（用于调试快照）。
+        """
+        plan = plan or self._search_plan(modified_since)
+        decoder: _RecordDecoder = plan["decoder"]
+        pages: "queue.Queue" = queue.Queue(maxsize=2)
+        stop = threading.Event()
+        producer = threading.Thread(target=self._produce_pages, args=(plan["url"], plan["payload"], pages, stop),
+                                    name="feishu-pages", daemon=True)
+        producer.start()
+        try:
+            while True:
+                kind, body, page_payload = pages.get()
+                if kind == "error":
+                    raise body
+                if kind == "done":
+                    return
+                plan["last_payload"] = page_payload
+                batch = body.get("items") or []
+                if raw_items is not None:
+                    raw_items.extend(batch)
+                yield [decoder.decode(rec) for rec in batch]
+        finally:
+            # 调用方提前结束迭代时通知生产者停止
+            stop.set()
+
+    def search_done_records(self, modified_since: Optional[int] = None,
+                            on_page: Optional[Callable[[List[Dict]], None]] = None,
+                            force_snapshot: bool = False) -> List[Dict]:
+        """按设置查询“笔记状态=已完成”的记录，返回记录列表。
+
+        传入 modified_since（毫秒时间戳）时改为按“修改时间”字段拉取此后变更的记录（不限状态），
+        供 sync_done_records 增量合并；表中没有修改时间字段时抛出 ValueError。
+        on_page：每解码完一页即回调一次（用于界面边加载边显示）。
+        force_snapshot：本次无论记录数多少都写原始响应快照。
+        """
+        plan = self._search_plan(modified_since)
         items: List[Dict] = []
         raw_items: List[Dict] = []
-        last_payload_snapshot: Dict = {}
-        page_token: Optional[str] = None
-        # 使用 REST 路径：强制字段名条件筛选 + 分页
-        while True:
-            payload = {
-                "filter": {
-                    "conjunction": "and",
-                    "conditions": [
-                        {
-                            "field_name": status_field_name,
-                            "operator": "is",
-                            "value": [status_done_value],
-                        }
-                    ],
-                },
-                "page_size": page_size,
-            }
-            if view_id:
-                payload.setdefault("view_id", view_id)
-            if field_names:
-                payload.setdefault("field_names", field_names)
-            if sort_field_name:
-                payload.setdefault("sort", [{"field_name": sort_field_name, "desc": sort_desc}])
-            payload.setdefault("automatic_fields", automatic_fields)
-            if page_token:
-                payload["page_token"] = page_token
+        for page in self.iter_record_pages(modified_since, raw_items=raw_items, plan=plan):
+            items.extend(page)
+            if on_page is not None:
+                on_page(page)
+        self._write_search_snapshots(plan, raw_items, len(items), force_snapshot)
+        return items
 
-            last_payload_snapshot = payload
-            resp = requests.post(url, headers=self._headers(), json=payload, timeout=20)
-            data = resp.json()
-            if data.get("code") != 0:
-                raise RuntimeError(f"搜索记录失败: {data} | payload={payload}")
-
-            batch = data.get("data", {}).get("items", [])
-            if isinstance(batch, list):
-                raw_items.extend(batch)
-            for rec in batch:
-                fields = rec.get("fields", {})
-                # 同时支持按字段名与字段ID读取（API可能返回 name-keyed 或 id-keyed）
-                def _get_field_value(_fields: Dict, fid: Optional[str], fname: Optional[str]):
-                    if not isinstance(_fields, dict):
-                        return None
-                    # 优先按字段名读取（更直观，且与过滤保持一致）
-                    if fname and fname in _fields:
-                        return _fields.get(fname)
-                    if fid and fid in _fields:
-                        return _fields.get(fid)
-                    return None
-                content_val = _get_field_value(fields, content_field_id, content_field_name)
-                status_val = _get_field_value(fields, status_field_id, status_field_name)
-                title_val = None
-                # 先按候选名称读取标题；未命中再尝试候选ID
-                for _cand in ("标题", "笔记标题", "标题（人工审核）"):
-                    if _cand in fields:
-                        title_val = fields.get(_cand)
-                        break
-                if title_val is None and (title_field_id is not None):
-                    title_val = fields.get(title_field_id)
-                def _to_text(v):
-                    if v is None:
-                        return ""
-                    if isinstance(v, list):
-                        try:
-                            if all(isinstance(x, dict) for x in v):
-                                parts: List[str] = []
-                                for x in v:
-                                    extracted = None
-                                    for key in ("text", "value", "content", "name"):
-                                        if key in x and isinstance(x[key], (str, int, float)):
-                                            extracted = str(x[key])
-                                            break
-                                    parts.append(extracted if extracted is not None else str(x))
-                                return "\n".join(parts)
-                        except Exception:
-                            pass
-                        return "\n".join(str(x) for x in v)
-                    if isinstance(v, dict):
-                        try:
-                            for key in ("text", "value", "content"):
-                                if key in v and isinstance(v[key], (str, int, float)):
-                                    return str(v[key])
-                        except Exception:
-                            pass
-                        try:
-                            return _json.dumps(v, ensure_ascii=False)
-                        except Exception:
-                            return str(v)
-                    return str(v)
-                try:
-                    logger = logging.getLogger("xhs_tool")
-                    if logger.isEnabledFor(logging.DEBUG):
-                        logger.debug(
-                            "[FeishuClient] rec_id=%s fields_keys=%s content_raw_type=%s status_raw_type=%s title_raw_type=%s",
-                            rec.get("record_id"),
-                            list(fields.keys()) if isinstance(fields, dict) else type(fields),
-                            type(content_val).__name__,
-                            type(status_val).__name__,
-                            type(title_val).__name__ if title_field_id else None,
-                        )
-                except Exception:
-                    pass
-                content_text = _to_text(content_val)
-                if not content_text:
-                    for _cand_name in ("发布内容一键复制", "笔记信息"):
-                        # 先按字段名尝试
-                        if _cand_name in fields:
-                            _alt = fields.get(_cand_name)
-                            _alt_text = _to_text(_alt)
-                            if _alt_text:
-                                try:
-                                    logger = logging.getLogger("xhs_tool")
-                                    logger.info(
-                                        "[FeishuClient] 内容为空，回退字段 '%s' 命中（按名称），rec_id=%s",
-                                        _cand_name,
-                                        rec.get("record_id"),
-                                    )
-                                except Exception:
-                                    pass
-                                content_val = _alt
-                                content_text = _alt_text
-                                break
-                        # 再按字段ID尝试
-                        _fid = fields_map.get(_cand_name)
-                        if _fid and _fid in fields:
-                            _alt = fields.get(_fid)
-                            _alt_text = _to_text(_alt)
-                            if _alt_text:
-                                try:
-                                    logger = logging.getLogger("xhs_tool")
-                                    logger.info(
-                                        "[FeishuClient] 内容为空，回退字段 '%s' 命中（按ID），rec_id=%s",
-                                        _cand_name,
-                                        rec.get("record_id"),
-                                    )
-                                except Exception:
-                                    pass
-                                content_val = _alt
-                                content_text = _alt_text
-                                break
-                items.append({
-                    "record_id": rec.get("record_id"),
-                    "title": _to_text(title_val) or rec.get("record_id"),
-                    "status": _to_text(status_val),
-                    "content": content_text,
-                    "updated_time": rec.get("updated_time"),
-                })
-            page_token = data.get("data", {}).get("page_token")
-            if not page_token:
-                break
-        # 输出原始响应快照与映射辅助信息与搜索请求快照
+    def _write_search_snapshots(self, plan: Dict, raw_items: List[Dict], items_count: int,
+                                force: bool = False) -> None:
+        # 原始响应、映射辅助信息与搜索请求合并为一份快照，由后台线程压缩写入，不阻塞拉取
         try:
-            log_dir = self.settings.get("log_dir", "logs") or "logs"
-            os.makedirs(log_dir, exist_ok=True)
-            raw_path = os.path.join(log_dir, "feishu_refresh_raw_response.json")
-            meta_path = os.path.join(log_dir, "feishu_refresh_debug_meta.json")
-            req_path = os.path.join(log_dir, "feishu_refresh_search_payload.json")
-            with open(raw_path, "w", encoding="utf-8") as rf:
-                _json.dump(raw_items, rf, ensure_ascii=False, indent=2)
-            with open(meta_path, "w", encoding="utf-8") as mf:
-                _json.dump({
-                    "status_field_name": status_field_name,
-                    "status_field_id": status_field_id,
-                    "content_field_name": content_field_name,
-                    "content_field_id": content_field_id,
-                    "title_field_id": title_field_id,
-                    "fields_map": fields_map,
-                    "view_id": view_id,
-                    "field_names": field_names,
-                    "sort_field_name": sort_field_name,
-                    "sort_desc": sort_desc,
-                    "automatic_fields": automatic_fields,
-                    "items_count": len(items),
-                }, mf, ensure_ascii=False, indent=2)
-            with open(req_path, "w", encoding="utf-8") as qf:
-                _json.dump(last_payload_snapshot, qf, ensure_ascii=False, indent=2)
-            try:
-                logger = logging.getLogger("xhs_tool")
-                logger.info(
-                    "[FeishuClient] 原始响应快照: %s | 映射信息: %s | 请求快照: %s",
-                    os.path.abspath(raw_path),
-                    os.path.abspath(meta_path),
-                    os.path.abspath(req_path),
-                )
-            except Exception:
-                pass
+            path = write_snapshot(self.settings, "feishu_refresh_raw", {
+                "meta": dict(plan["meta"], items_count=items_count),
+                "payload": plan.get("last_payload") or plan["payload"],
+                "items": raw_items,
+            }, len(raw_items), force=force)
+            if path:
+                logging.getLogger("xhs_tool").info("[FeishuClient] 原始响应快照: %s", path)
         except Exception:
             pass
-        return items
+
+    def count_done_records(self) -> Optional[int]:
+        """按与全量扫描相同的筛选条件只取一条记录，返回服务端给出的总数（响应中没有 total 时返回 None）。"""
+        plan = self._search_plan()
+        payload = dict(plan["payload"], page_size=1)
+        data = self._request("POST", plan["url"], headers=self._headers(), json=payload, timeout=20)
+        if data.get("code") != 0:
+            raise RuntimeError(f"搜索记录失败: {data} | payload={payload}")
+        total = (data.get("data", {}) or {}).get("total")
+        return total if isinstance(total, int) else None
+
+    def sync_done_records(self, cached_items: Optional[List[Dict]], state: Optional[Dict],
+                          full: bool = False,
+                          on_page: Optional[Callable[[List[Dict]], None]] = None) -> Tuple[List[Dict], Dict]:
+        """增量同步“已完成”记录，返回 (合并后的记录列表, 新同步状态)。
+
+        state 记录上次同步的范围（表与状态配置）、字段结构指纹与高水位（最大修改时间）。
+        范围或字段结构变化、没有高水位、表中没有修改时间字段或 full=True 时执行全量扫描；
+        否则只拉取高水位之后修改过的记录：仍为“已完成”的覆盖/插入，其余从缓存中移除。
+        在飞书中被删除的记录不会出现在变更结果里，因此增量合并后再查询一次“已完成”总数，
+        与合并结果条数不一致时改为全量扫描；另外每 feishu_full_sync_every 次增量同步（默认 50，
+        0 表示关闭）也强制全量扫描一次，兜底总数恰好相同的情况。
+        on_page 仅在全量扫描时逐页回调（增量结果通常只有一页，直接看返回值即可）。
+        full=True 时的全量扫描总是写原始响应快照。
+        """
+        app_token = self.settings.get("feishu_bitable_app_token", "").strip()
+        table_id = self.settings.get("feishu_bitable_table_id", "").strip()
+        status_field_name = self.settings.get("feishu_status_field_name", "笔记状态")
+        status_done_value = self.settings.get("feishu_status_done_value", "已完成")
+        content_field_name = self.settings.get("feishu_content_field_name", "去敏感词")
+        scope = [app_token, table_id, status_field_name, status_done_value, content_field_name,
+                 str(self.settings.get("feishu_view_id", "") or "")]
+        if not app_token or not table_id:
+            raise ValueError("缺少飞书多维表格 app_token 或 table_id，请在配置中明确填写。")
+        schema = self._schema_with(app_token, table_id, [status_field_name, content_field_name])
+        fingerprint = schema.fingerprint()
+        state = state if isinstance(state, dict) else {}
+        hwm = state.get("high_water_mark")
+        incremental = (
+            not full
+            and isinstance(cached_items, list)
+            and isinstance(hwm, int)
+            and state.get("scope") == scope
+            and state.get("schema") == fingerprint
+            and self._modified_field_name(schema) is not None
+        )
+        logger = logging.getLogger("xhs_tool")
+        syncs = int(state.get("incremental_syncs", 0) or 0) + 1
+        full_every = int(self.settings.get("feishu_full_sync_every", 50) or 0)
+        if incremental and full_every > 0 and syncs >= full_every:
+            logger.info("[FeishuClient] 已连续增量同步 %d 次，执行一次全量扫描以清理已删除的记录", syncs - 1)
+            incremental = False
+        if not incremental:
+            return self._full_sync(scope, fingerprint, on_page, force_snapshot=full)
+
+        changed = self.search_done_records(modified_since=hwm)
+        merged = {str(it.get("record_id")): it for it in cached_items}
+        fresh: List[Dict] = []
+        removed = 0
+        for it in changed:
+            rid = str(it.get("record_id"))
+            if it.get("status") == status_done_value:
+                if rid not in merged:
+                    fresh.append(it)
+                merged[rid] = it
+            elif merged.pop(rid, None) is not None:
+                removed += 1
+        # 新增记录排在最前，其余保持原有顺序
+        items: List[Dict] = []
+        seen = set()
+        for it in fresh + list(cached_items):
+            rid = str(it.get("record_id"))
+            if rid in merged and rid not in seen:
+                seen.add(rid)
+                items.append(merged[rid])
+        for it in changed:
+            if isinstance(it.get("updated_time"), int):
+                hwm = max(hwm, it["updated_time"])
+        logger.info("[FeishuClient] 增量同步：变更 %d 条（新增 %d，移除 %d），共 %d 条",
+                    len(changed), len(fresh), removed, len(items))
+        total = self.count_done_records()
+        if total is not None and total != len(items):
+            # 有记录在飞书中被删除（或缓存与服务端已不一致）：全量扫描对账
+            logger.info("[FeishuClient] 服务端共 %d 条，与增量合并结果 %d 条不一致，执行全量扫描", total, len(items))
+            return self._full_sync(scope, fingerprint, on_page)
+        return items, {"scope": scope, "schema": fingerprint, "high_water_mark": hwm, "incremental_syncs": syncs}
+
+    def _full_sync(self, scope: List[str], fingerprint: str, on_page: Optional[Callable[[List[Dict]], None]],
+                   force_snapshot: bool = False) -> Tuple[List[Dict], Dict]:
+        items = self.search_done_records(on_page=on_page, force_snapshot=force_snapshot)
+        stamps = [it.get("updated_time") for it in items if isinstance(it.get("updated_time"), int)]
+        logging.getLogger("xhs_tool").info("[FeishuClient] 全量同步：%d 条", len(items))
+        return items, {"scope": scope, "schema": fingerprint, "high_water_mark": max(stamps) if stamps else None,
+                       "incremental_syncs": 0}
 
     def mark_record_as_used(self, payload: Dict) -> None:
         """将指定记录的状态字段更新为“已使用”。
@@ -350,49 +870,59 @@ class FeishuClient:
         if not record_id:
             raise ValueError("缺少 record_id，无法更新状态")
 
+        fields = self._used_status_fields(app_token, table_id)
+        if fields is None:
+            # 找不到目标选项时不更新，直接返回
+            return
+
+        url = self.table_url(app_token, table_id, f"/records/{record_id}")
+        body = {"fields": fields}
+        data = self._request("PATCH", url, headers=self._headers(), json=body, timeout=15)
+        if data.get("code") != 0:
+            raise RuntimeError(f"更新记录状态失败: {data} | body={body}")
+
+    def _used_status_fields(self, app_token: str, table_id: str) -> Optional[Dict]:
+        """“已使用”状态的字段更新内容；找不到目标单选选项时返回 None。"""
         status_field_name = self.settings.get("feishu_status_field_name", "笔记状态")
         used_value_name = self.settings.get("feishu_status_used_value", "已使用")
-        fields_map = self.get_fields_map(app_token, table_id)
-        status_field_id = fields_map.get(status_field_name)
+        # 字段ID与选项ID均来自共享的元数据缓存，通常无需额外请求
+        schema = self._schema_with(app_token, table_id, [status_field_name])
+        status_field_id = schema.fields.get(status_field_name)
         if not status_field_id:
             raise ValueError(f"未找到状态字段: {status_field_name}")
 
         # 获取单选选项ID
         opt_id = None
         try:
-            meta_url = self.FIELDS_URL_TPL.format(app_token=app_token, table_id=table_id)
-            m_resp = requests.get(meta_url, headers=self._headers(), timeout=15)
-            m_data = m_resp.json()
-            if m_data.get("code") == 0:
-                items = m_data.get("data", {}).get("items", []) or []
-                target_meta = None
-                for it in items:
-                    fid = it.get("id") or it.get("field_id")
-                    fname = it.get("name") or it.get("field_name")
-                    if fid == status_field_id or fname == status_field_name:
-                        target_meta = it
-                        break
-                if isinstance(target_meta, dict):
-                    prop = target_meta.get("property") or {}
-                    options = prop.get("options") or []
-                    for o in options:
-                        if not isinstance(o, dict):
-                            continue
-                        name = o.get("name")
-                        oid = o.get("id") or o.get("option_id")
-                        if name and oid and str(name) == str(used_value_name):
-                            opt_id = str(oid)
-                            break
+            opt_id = self.get_option_id(app_token, table_id, status_field_name, used_value_name)
         except Exception:
             pass
-
         if not opt_id:
-            # 找不到目标选项时不更新，直接返回
-            return
+            return None
+        return {status_field_id: [opt_id]}
 
-        url = f"https://open.feishu.cn/open-apis/bitable/v1/apps/{app_token}/tables/{table_id}/records/{record_id}"
-        body = {"fields": {status_field_id: [opt_id]}}
-        resp = requests.patch(url, headers=self._headers(), json=body, timeout=15)
-        data = resp.json()
-        if data.get("code") != 0:
-            raise RuntimeError(f"更新记录状态失败: {data} | body={body}")
\ No newline at end of file
+    def mark_records_as_used(self, record_ids: List[str]) -> int:
+        """批量将记录状态更新为“已使用”（每 BATCH_UPDATE_LIMIT 条一次请求），返回更新的记录数。
+
+        与 mark_record_as_used 不同，找不到目标选项时抛出 ValueError，由调用方决定是否重试。
+        """
+        record_ids = [str(r) for r in record_ids if r]
+        if not record_ids:
+            return 0
+        app_token = self.settings.get("feishu_bitable_app_token", "").strip()
+        table_id = self.settings.get("feishu_bitable_table_id", "").strip()
+        if not app_token or not table_id:
+            raise ValueError("缺少飞书多维表格 app_token 或 table_id，请在配置中明确填写。")
+        fields = self._used_status_fields(app_token, table_id)
+        if fields is None:
+            used_value_name = self.settings.get("feishu_status_used_value", "已使用")
+            raise ValueError(f"状态字段中未找到选项: {used_value_name}")
+
+        url = self.table_url(app_token, table_id, "/records/batch_update")
+        for i in range(0, len(record_ids), self.BATCH_UPDATE_LIMIT):
+            chunk = record_ids[i:i + self.BATCH_UPDATE_LIMIT]
+            body = {"records": [{"record_id": rid, "fields": fields} for rid in chunk]}
+            data = self._request("POST", url, headers=self._headers(), json=body, timeout=30)
+            if data.get("code") != 0:
+                raise RuntimeError(f"批量更新记录状态失败: {data}")
+        return len(record_ids)
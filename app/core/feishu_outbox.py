@@ -0,0 +1,167 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from .feishu_client import FeishuClient
+from .record_store import RecordStore
+
+
+class UsedStatusOutbox:
+    """“已使用”状态回写队列。
+
+    点击“使用”时只把 record_id 写入本地数据库的 outbox 表（不发网络请求），
+    后台线程在短暂合并窗口后取出到期条目，经批量更新接口一次提交；
+    某批失败时拆分重试以隔离出错的记录，失败的条目按指数退避推迟重试，
+    超过最大次数后丢弃并记录错误。
+    队列持久化在数据库中，程序重启后未提交的条目会继续回写。
+
+    相关设置（每次提交时读取，修改后即时生效）：
+    - feishu_outbox_debounce：合并窗口秒数（默认 0.5）
+    - feishu_outbox_backoff_base / feishu_outbox_backoff_max：重试退避秒数（默认 5 / 600）
+    - feishu_outbox_max_attempts：最大尝试次数（默认 10）
+    """
+
+    def __init__(self, settings: Dict, store: RecordStore):
+        self.settings = settings
+        self.store = store
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="feishu-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """停止后台线程；未提交的条目保留在数据库中，下次启动继续回写。"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def enqueue(self, record_id: str) -> None:
+        self.store.enqueue_used([record_id])
+        self._wake.set()
+
+    def pending(self) -> int:
+        return self.store.outbox_count()
+
+    def flush_now(self) -> int:
+        """立即提交所有到期条目，返回成功回写的记录数。"""
+        with self._flush_lock:
+            due = self.store.due_outbox(limit=FeishuClient.BATCH_UPDATE_LIMIT * 10)
+            if not due:
+                return 0
+            done, failed = self._submit(FeishuClient(self.settings), due)
+            if done:
+                self.store.outbox_done(done)
+                logging.getLogger("xhs_tool").info("[FeishuOutbox] 已回写 %d 条“已使用”状态", len(done))
+            for items, error in failed:
+                self._reschedule(items, error)
+            return len(done)
+
+    # 本次提交中未有任何成功、且已有这么多条单条记录失败时，判定为整体故障而非个别坏记录
+    _MAX_ISOLATED_FAILURES = 3
+
+    def _submit(self, client: FeishuClient, due: List[Tuple[str, int]]
+                ) -> Tuple[List[str], List[Tuple[List[Tuple[str, int]], Exception]]]:
+        """按接口上限分批提交，返回 (成功的 record_id, [(失败条目, 异常)])。
+
+        某批失败时二分拆开重试，直到定位到单条记录，只有真正失败的记录累计尝试次数，
+        不会因一条已删除或被拒绝的记录拖累同批的其他记录。
+        配置错误、网络错误等与具体记录无关的失败不再拆分，剩余条目整体退避。
+        """
+        limit = FeishuClient.BATCH_UPDATE_LIMIT
+        pending = [due[i:i + limit] for i in range(0, len(due), limit)]
+        done: List[str] = []
+        failed: List[Tuple[List[Tuple[str, int]], Exception]] = []
+        while pending:
+            group = pending.pop(0)
+            try:
+                client.mark_records_as_used([rid for rid, _ in group])
+            except (ValueError, requests.RequestException) as e:
+                failed.append((group + [item for g in pending for item in g], e))
+                break
+            except Exception as e:
+                if len(group) > 1:
+                    mid = len(group) // 2
+                    pending[:0] = [group[:mid], group[mid:]]
+                    continue
+                failed.append((group, e))
+                if not done and len(failed) >= self._MAX_ISOLATED_FAILURES:
+                    # 拆到单条仍全部失败：多半是服务端整体异常，避免逐条请求整个队列
+                    failed.append(([item for g in pending for item in g], e))
+                    break
+                continue
+            done.extend(rid for rid, _ in group)
+        return done, [(items, e) for items, e in failed if items]
+
+    def _reschedule(self, due: List[Tuple[str, int]], error: Exception) -> None:
+        logger = logging.getLogger("xhs_tool")
+        base = float(self.settings.get("feishu_outbox_backoff_base", 5))
+        cap = float(self.settings.get("feishu_outbox_backoff_max", 600))
+        max_attempts = int(self.settings.get("feishu_outbox_max_attempts", 10))
+        retry: List[Tuple[str, float]] = []
+        dropped: List[str] = []
+        for rid, attempts in due:
+            if attempts + 1 >= max_attempts:
+                dropped.append(rid)
+            else:
+                retry.append((rid, min(base * (2 ** attempts), cap)))
+        if retry:
+            self.store.outbox_retry(retry, str(error))
+            logger.warning("[FeishuOutbox] 回写 %d 条状态失败，%.0fs 后重试: %s",
+                           len(retry), min(d for _, d in retry), error)
+        if dropped:
+            self.store.outbox_done(dropped)
+            logger.error("[FeishuOutbox] %d 条状态回写已达最大重试次数，放弃: %s | %s",
+                         len(dropped), error, ",".join(dropped))
+
+    def _idle_timeout(self) -> Optional[float]:
+        nxt = self.store.next_outbox_time()
+        if nxt is None:
+            return None
+        return max(0.0, nxt - time.time())
+
+    def _run(self) -> None:
+        logger = logging.getLogger("xhs_tool")
+        while not self._stop.is_set():
+            try:
+                woke = self._wake.wait(self._idle_timeout())
+            except Exception:
+                logger.exception("[FeishuOutbox] 读取队列失败")
+                woke = self._wake.wait(30)
+            if self._stop.is_set():
+                break
+            if woke:
+                self._wake.clear()
+                # 合并短时间内的连续点击为一次请求
+                if self._stop.wait(float(self.settings.get("feishu_outbox_debounce", 0.5))):
+                    break
+            try:
+                self.flush_now()
+            except Exception:
+                logger.exception("[FeishuOutbox] 回写状态失败")
+                # 避免数据库异常时空转
+                self._stop.wait(5)
+
+
+_OUTBOXES: Dict[str, UsedStatusOutbox] = {}
+_OUTBOXES_LOCK = threading.Lock()
+
+
+def get_used_outbox(settings: Dict, store: RecordStore) -> UsedStatusOutbox:
+    """按数据库返回进程内共享的回写队列，并确保后台线程已启动。"""
+    with _OUTBOXES_LOCK:
+        outbox = _OUTBOXES.get(store.path)
+        if outbox is None:
+            outbox = _OUTBOXES[store.path] = UsedStatusOutbox(settings, store)
+    outbox.start()
+    return outbox
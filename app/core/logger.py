@@ -1,28 +1,143 @@
+import atexit
+import contextlib
+import glob
 import logging
+import logging.handlers
+import multiprocessing
 import os
-from datetime import datetime
+import queue
+import time
+from typing import Iterator, Optional
 
+LOG_FILENAME = "xhs_tool.log"
 
-def setup_logger(log_dir: str, level: str = "INFO") -> logging.Logger:
+# 当前生效的队列处理器与监听线程（重复调用 setup_logger 时先拆除旧的）
+_QUEUE_HANDLER: Optional[logging.handlers.QueueHandler] = None
+_LISTENER: Optional[logging.handlers.QueueListener] = None
+
+
+def _stop_listener() -> None:
+    global _LISTENER, _QUEUE_HANDLER
+    if _QUEUE_HANDLER is not None:
+        logging.getLogger("xhs_tool").removeHandler(_QUEUE_HANDLER)
+        _QUEUE_HANDLER = None
+    if _LISTENER is not None:
+        # stop() 会先写完队列中剩余的记录
+        _LISTENER.stop()
+        for h in _LISTENER.handlers:
+            h.close()
+        _LISTENER = None
+
+
+atexit.register(_stop_listener)
+
+
+def prune_logs(log_dir: str, retention_days: float) -> int:
+    """删除超过保留天数的日志文件（含旧版每次启动生成的 run_*.log 与轮转备份），返回删除数量。"""
+    if retention_days <= 0:
+        return 0
+    cutoff = time.time() - retention_days * 86400
+    removed = 0
+    for path in glob.glob(os.path.join(log_dir, "run_*.log")) + glob.glob(os.path.join(log_dir, f"{LOG_FILENAME}.*")):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def setup_logger(log_dir: str, level: str = "INFO", max_bytes: int = 5 * 1024 * 1024,
+                 backup_count: int = 5, retention_days: float = 14) -> logging.Logger:
+    """初始化 xhs_tool 日志：调用线程只把记录放入队列，由后台监听线程写文件与控制台。
+
+    - 日志文件固定为 <log_dir>/xhs_tool.log，超过 max_bytes 时轮转，保留 backup_count 份
+    - 启动时清理超过 retention_days 天的旧日志
+    - 可重复调用（如修改日志目录或级别后），不会叠加重复的处理器
+    """
+    global _QUEUE_HANDLER, _LISTENER
     os.makedirs(log_dir, exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    logfile = os.path.join(log_dir, f"run_{timestamp}.log")
+    log_level = getattr(logging, str(level).upper(), logging.INFO)
+    _stop_listener()
+    removed = prune_logs(log_dir, retention_days)
 
     logger = logging.getLogger("xhs_tool")
-    logger.setLevel(getattr(logging, level.upper(), logging.INFO))
+    logger.setLevel(log_level)
 
-    # File handler
-    fh = logging.FileHandler(logfile, encoding="utf-8")
-    fh.setLevel(getattr(logging, level.upper(), logging.INFO))
     fmt = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+    # File handler
+    fh = logging.handlers.RotatingFileHandler(
+        os.path.join(log_dir, LOG_FILENAME), maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    fh.setLevel(log_level)
     fh.setFormatter(fmt)
-    logger.addHandler(fh)
-
     # Console handler
     ch = logging.StreamHandler()
-    ch.setLevel(getattr(logging, level.upper(), logging.INFO))
+    ch.setLevel(log_level)
     ch.setFormatter(fmt)
-    logger.addHandler(ch)
+
+    log_queue: "queue.Queue" = queue.Queue(-1)
+    _LISTENER = logging.handlers.QueueListener(log_queue, fh, ch, respect_handler_level=True)
+    _LISTENER.start()
+    _QUEUE_HANDLER = logging.handlers.QueueHandler(log_queue)
+    logger.addHandler(_QUEUE_HANDLER)
 
     logger.info("Logger initialized.")
-    return logger
\ No newline at end of file
+    if removed:
+        logger.info("已清理 %d 个过期日志文件", removed)
+    return logger
+
+
+def configure_logging(settings: dict) -> logging.Logger:
+    """按设置初始化日志：log_dir、log_level、log_max_mb（默认 5）、log_backup_count（默认 5）、
+    log_retention_days（默认 14，0 表示不清理）。"""
+    return setup_logger(
+        settings.get("log_dir", "logs") or "logs",
+        settings.get("log_level", "INFO"),
+        max_bytes=int(float(settings.get("log_max_mb", 5)) * 1024 * 1024),
+        backup_count=int(settings.get("log_backup_count", 5)),
+        retention_days=float(settings.get("log_retention_days", 14)),
+    )
+
+
+@contextlib.contextmanager
+def worker_logging() -> Iterator[Optional["multiprocessing.Queue"]]:
+    """进程池期间把子进程的日志转交主进程写出。
+
+    产出一个可经 initargs 传给子进程的队列（子进程内调用 configure_worker_logging），
+    主进程用额外的监听线程把队列中的记录交给当前的文件与控制台处理器；尚未初始化日志时产出 None。
+    """
+    if _LISTENER is None:
+        yield None
+        return
+    log_queue = multiprocessing.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, *_LISTENER.handlers, respect_handler_level=True)
+    listener.start()
+    try:
+        yield log_queue
+    finally:
+        listener.stop()
+        log_queue.close()
+        log_queue.join_thread()
+
+
+def configure_worker_logging(log_queue: Optional["multiprocessing.Queue"], level: str = "INFO") -> logging.Logger:
+    """在子进程内替换继承来的队列处理器（其监听线程只在主进程运行，记录会被丢弃）。
+
+    log_queue 为 worker_logging 产出的队列；为 None 时退回直接输出到控制台。
+    """
+    global _QUEUE_HANDLER, _LISTENER
+    logger = logging.getLogger("xhs_tool")
+    for h in list(logger.handlers):
+        logger.removeHandler(h)
+    # fork 继承的监听器在子进程中没有运行的线程，不能也不需要停止
+    _QUEUE_HANDLER = None
+    _LISTENER = None
+    logger.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+    if log_queue is not None:
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    else:
+        ch = logging.StreamHandler()
+        ch.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+        logger.addHandler(ch)
+    return logger
@@ -1,5 +1,7 @@
 import re
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+
+from .ahocorasick import AhoCorasick
 
 # —— 尾段识别配置（默认值，允许被 configure_tail_filter 覆盖） ——
 TAIL_FILTER_ENABLED = True
@@ -18,9 +20,84 @@ CTA_KEYWORDS = [
 ]
 TAIL_SHORT_THRESHOLD = 120
 
+
+class _TailMatcher:
+    """尾段关键词的编译结果：前缀、标题关键词与 CTA 关键词共用一个 Aho–Corasick 自动机。
+
+    - 标题关键词与 CTA 关键词按小写匹配（与 k.lower() in text.lower() 等价）
+    - 前缀按原样匹配（与 line.startswith(p) 等价）
+    - CTA 计数按关键词列表条目计（列表中重复的条目各计一次）
+    """
+
+    # 标题与内容拼接扫描时使用的分隔符，关键词中不会出现
+    SEP = "\x00"
+
+    def __init__(self, prefixes: List[str], title_keywords: List[str], cta_keywords: List[str]):
+        self.source = (prefixes, title_keywords, cta_keywords)
+        title_keys = [str(k).lower() for k in title_keywords]
+        cta_keys = [str(k).lower() for k in cta_keywords]
+        prefix_keys = [str(p) for p in prefixes]
+        # 空串在 `in`/startswith 语义下恒为命中，单独记录
+        self.title_always = "" in title_keys
+        self.cta_always = cta_keys.count("")
+        self.prefix_always = "" in prefix_keys
+        self.automaton = AhoCorasick(
+            k for k in title_keys + cta_keys + prefix_keys if self.SEP not in k
+        )
+        n = len(self.automaton)
+        self.is_title = [False] * n
+        self.cta_weight = [0] * n
+        self.is_prefix = [False] * n
+        for k in title_keys:
+            pid = self.automaton.pattern_id(k)
+            if pid >= 0:
+                self.is_title[pid] = True
+        for k in cta_keys:
+            pid = self.automaton.pattern_id(k)
+            if pid >= 0:
+                self.cta_weight[pid] += 1
+        for k in prefix_keys:
+            pid = self.automaton.pattern_id(k)
+            if pid >= 0:
+                self.is_prefix[pid] = True
+
+    def signals(self, title: str, content: str) -> Tuple[bool, int]:
+        """一次扫描返回 (标题是否命中尾段关键词, 内容中命中的 CTA 关键词数)。"""
+        title_lower = title.lower()
+        boundary = len(title_lower)
+        title_hit = self.title_always
+        seen_cta = set()
+        for end, pid in self.automaton.iter_matches(title_lower + self.SEP + content.lower()):
+            if end <= boundary:
+                if self.is_title[pid]:
+                    title_hit = True
+            elif self.cta_weight[pid]:
+                seen_cta.add(pid)
+        cta_count = self.cta_always + sum(self.cta_weight[pid] for pid in seen_cta)
+        return title_hit, cta_count
+
+    def starts_with_prefix(self, text: str) -> bool:
+        if self.prefix_always:
+            return True
+        return any(self.is_prefix[pid] for pid in self.automaton.prefix_ids(text))
+
+
+_TAIL_MATCHER: Optional[_TailMatcher] = None
+
+
+def _tail_matcher() -> _TailMatcher:
+    """返回与当前尾段配置一致的匹配器；配置列表被整体替换时自动重建。"""
+    global _TAIL_MATCHER
+    m = _TAIL_MATCHER
+    if m is None or any(a is not b for a, b in zip(m.source, (TAIL_PREFIXES, TAIL_TITLE_KEYWORDS, CTA_KEYWORDS))):
+        m = _TAIL_MATCHER = _TailMatcher(TAIL_PREFIXES, TAIL_TITLE_KEYWORDS, CTA_KEYWORDS)
+    return m
+
+
 def configure_tail_filter(settings: dict):
-    """根据设置更新尾段过滤相关配置。"""
+    """根据设置更新尾段过滤相关配置，并重新编译关键词自动机。"""
     global TAIL_FILTER_ENABLED, TAIL_PREFIXES, TAIL_TITLE_KEYWORDS, CTA_KEYWORDS, TAIL_SHORT_THRESHOLD
+    global _TAIL_MATCHER
     TAIL_FILTER_ENABLED = bool(settings.get("tail_filter_enabled", True))
     prefixes = settings.get("tail_prefixes")
     if isinstance(prefixes, list) and prefixes:
@@ -35,6 +112,7 @@ def configure_tail_filter(settings: dict):
         TAIL_SHORT_THRESHOLD = int(settings.get("tail_short_threshold", 120))
     except Exception:
         TAIL_SHORT_THRESHOLD = 120
+    _TAIL_MATCHER = _TailMatcher(TAIL_PREFIXES, TAIL_TITLE_KEYWORDS, CTA_KEYWORDS)
 
 def is_tail_section(title: str, content: str) -> bool:
     """判断一个分论点是否更像是文案收尾/行动召唤段落。
@@ -45,11 +123,8 @@ def is_tail_section(title: str, content: str) -> bool:
     """
     t = (title or "").strip()
     c = (content or "").strip()
-    t_lower = t.lower()
-    c_lower = c.lower()
 
-    title_hit = any(k.lower() in t_lower for k in TAIL_TITLE_KEYWORDS)
-    cta_count = sum(1 for k in CTA_KEYWORDS if k.lower() in c_lower)
+    title_hit, cta_count = _tail_matcher().signals(t, c)
     short = len(c) < TAIL_SHORT_THRESHOLD
 
     if title_hit and (cta_count >= 1 or short):
@@ -103,12 +178,12 @@ def extract_title_and_points(raw: str) -> Tuple[str, List[Tuple[str, str]]]:
         current_point_content = []
 
     tail_started = False
+    matcher = _tail_matcher()
 
     for line in content_lines:
         # 一旦检测到尾段前缀，标记后续全部作为尾段，后续统一剥离（受开关控制）
         if TAIL_FILTER_ENABLED and not tail_started:
-            l_strip = line.strip()
-            if any(l_strip.startswith(p) for p in TAIL_PREFIXES):
+            if matcher.starts_with_prefix(line.strip()):
                 tail_started = True
 
         if TAIL_FILTER_ENABLED and tail_started:
@@ -135,7 +210,7 @@ def extract_title_and_points(raw: str) -> Tuple[str, List[Tuple[str, str]]]:
     if TAIL_FILTER_ENABLED and tail_started and points:
         last_t, last_c = points[-1]
         # 如果最后一个块包含我们收集到的尾段内容，则移除
-        if is_tail_section(last_t, last_c) or any(last_c.startswith(p) for p in TAIL_PREFIXES):
+        if is_tail_section(last_t, last_c) or matcher.starts_with_prefix(last_c):
             points.pop()
 
     # 额外过滤：连续多个尾段（CTA 尾巴等）（受开关控制）
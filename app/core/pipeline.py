@@ -0,0 +1,126 @@
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .parser import extract_title_and_points, format_paragraphs, parse_processed_template
+from .punctuation import normalize_punctuation
+from .sensitive import desensitize
+from .tracing import span
+from . import excel_writer, xlsx_patch_writer
+from .zipper import ZipMember, make_zip
+
+
+def build_column_map(settings: Dict) -> Dict[str, str]:
+    """根据设置组装 write_to_template 所需的列映射。"""
+    return {
+        "page_column": settings.get("page_column", "页面"),
+        "point_title_column": settings.get("point_title_column", "文本_1"),
+        "point_content_column": settings.get("point_content_column", "文本_2"),
+        "extra_text_column": settings.get("extra_text_column", "文本_3"),
+        "extra_text_default": settings.get("extra_text_default", "内容仅供参考，身体不适请及时就医!"),
+        "image_column": settings.get("image_column", "图片_1"),
+    }
+
+
+def get_template_renderer(settings: Dict) -> Callable[..., Optional[bytes]]:
+    """按设置选择模板写入引擎的 render_template（签名与 excel_writer.render_template 一致）。
+
+    excel_writer_engine：openpyxl（默认）或 xml（直接修补 xlsx，不支持的模板自动回退）。
+    """
+    if str(settings.get("excel_writer_engine", "openpyxl")).lower() == "xml":
+        return xlsx_patch_writer.render_template
+    return excel_writer.render_template
+
+
+def export_zip(settings: Dict, title: str, points: List[Tuple[str, str]],
+               template_path: Optional[str] = None,
+               output_dir: Optional[str] = None,
+               images: Optional[List[Optional[str]]] = None,
+               zip_name_suffix: Optional[str] = None,
+               timings: Optional[Dict[str, float]] = None) -> str:
+    """写入模板并打包，返回 ZIP 路径。
+
+    Excel 在内存中生成后直接写入压缩流；仅当 delete_excel_after_zip 关闭时才另存一份到输出目录。
+    images 中的图片写入图片列，并从原路径直接打包到压缩包根目录（与 Excel 同级）。
+    """
+    output_dir = output_dir or settings.get("zip_output_dir", "output")
+    xlsx_name = excel_writer.output_filename(title)
+    with span("write", timings=timings, points=len(points)):
+        data = get_template_renderer(settings)(
+            template_path or settings.get("template_excel_path"),
+            points,
+            build_column_map(settings),
+            images
+        )
+        if not settings.get("delete_excel_after_zip", True):
+            os.makedirs(output_dir, exist_ok=True)
+            with open(os.path.join(output_dir, xlsx_name), "wb") as f:
+                f.write(data)
+    with span("zip", timings=timings):
+        members: List[ZipMember] = [(data, xlsx_name)]
+        for p in images or []:
+            if p and os.path.isfile(p):
+                members.append((p, os.path.basename(p)))
+        level = settings.get("zip_compress_level")
+        zip_path = make_zip(None, output_dir, zip_name_suffix=zip_name_suffix, members=members,
+                            compresslevel=int(level) if level not in (None, "") else None,
+                            probe_unknown=bool(settings.get("zip_entropy_probe", False)))
+    return zip_path
+
+
+def format_points(points: List[Tuple[str, str]], settings: Dict,
+                  timings: Optional[Dict[str, float]] = None) -> List[Tuple[str, str]]:
+    """对分论点做标点规范、去敏感词与排版（与主界面“处理文案”一致）。
+
+    传入 timings 时累计 normalize/desensitize/format 三个阶段的耗时（秒）。
+    """
+    formatted: List[Tuple[str, str]] = []
+    for pt_title, pt_content in points:
+        with span("normalize", timings=timings):
+            norm_title = normalize_punctuation(pt_title)
+            norm_content = normalize_punctuation(pt_content)
+        with span("desensitize", timings=timings):
+            norm_title = desensitize(norm_title)
+            norm_content = desensitize(norm_content)
+        with span("format", timings=timings):
+            fmt_content = format_paragraphs(
+                norm_content,
+                max_lines=settings.get("max_lines_per_paragraph", 0),
+                max_chars=settings.get("max_chars_per_line", 0)
+            )
+        formatted.append((norm_title, fmt_content))
+    return formatted
+
+
+def prepare_points(raw: str, settings: Dict, fallback_title: str = "",
+                   timings: Optional[Dict[str, float]] = None) -> Tuple[str, List[Tuple[str, str]]]:
+    """解析文案得到 (标题, 分论点)。
+
+    - 若文本已是处理模板，直接解析模板，标题使用 fallback_title；
+    - 否则按原文解析并做标点与排版规整。
+    """
+    with span("parse", timings=timings):
+        pairs = parse_processed_template(raw)
+        if pairs:
+            title = fallback_title
+            if not title:
+                title, _ = extract_title_and_points(raw)
+        else:
+            title, points = extract_title_and_points(raw)
+    if pairs:
+        return title or "输出", pairs
+    return title or fallback_title or "输出", format_points(points, settings, timings)
+
+
+def process_note(raw: str, settings: Dict, fallback_title: str = "",
+                 template_path: Optional[str] = None,
+                 output_dir: Optional[str] = None,
+                 timings: Optional[Dict[str, float]] = None) -> str:
+    """完整处理一条文案：解析 → 规范 → 排版 → 写入模板 → 压缩，返回 ZIP 路径。
+
+    - timings：传入字典时记录各阶段耗时（秒）：parse/normalize/desensitize/format/write/zip/total
+    """
+    with span("total", timings=timings):
+        title, pairs = prepare_points(raw, settings, fallback_title, timings)
+        zip_path = export_zip(settings, title, pairs, template_path=template_path,
+                              output_dir=output_dir, timings=timings)
+    return zip_path
@@ -13,33 +13,38 @@ EN_TO_CN = {
     ")": "）",
 }
 
+_DASH_RUN_RE = re.compile(r"-{2,}")
+
+
+def _pair_quotes(text: str, quote: str, cn_open: str, cn_close: str) -> str:
+    """按出现顺序交替替换为开/闭引号：切分后用切片交错拼接，避免逐段的 Python 循环。"""
+    parts = text.split(quote)
+    n = len(parts) - 1
+    if n <= 0:
+        return text
+    out = [""] * (2 * n + 1)
+    out[0::2] = parts
+    out[1::2] = (cn_open, cn_close) * (n // 2) + (cn_open,) * (n % 2)
+    return "".join(out)
+
+
 def normalize_punctuation(text: str) -> str:
-    # 先替换常见英文标点为中文标点
+    # 先替换常见英文标点为中文标点：仅在文本中确实出现时才替换，
+    # 中文文案里多数英文标点不存在，可避免整段文本的无效复制。
+    # （str.translate 对非 ASCII 文本逐字符查表，实测比此处更慢）
     for en, cn in EN_TO_CN.items():
-        text = text.replace(en, cn)
+        if en != cn and en in text:
+            text = text.replace(en, cn)
 
     # 处理引号，将直引号替换为中文引号
-    # 简化处理：成对出现的双引号替换为 “ ”，单引号替换为 ‘ ’
-    def replace_quotes(s: str, quote: str, cn_open: str, cn_close: str) -> str:
-        parts = s.split(quote)
-        if len(parts) <= 1:
-            return s
-        out = []
-        open_next = True
-        for i, p in enumerate(parts):
-            out.append(p)
-            if i < len(parts) - 1:
-                out.append(cn_open if open_next else cn_close)
-                open_next = not open_next
-        return "".join(out)
-
-    text = replace_quotes(text, '"', '“', '”')
-    text = replace_quotes(text, "'", '‘', '’')
-
-    # 规范省略号：英文 ... -> 中文 ……
-    text = re.sub(r"\.{3,}", "……", text)
-
-    # 统一破折号: -- 或 —— -> ——
-    text = re.sub(r"-{2,}", "——", text)
-
-    return text
\ No newline at end of file
+    # 成对出现的双引号替换为 “ ”，单引号替换为 ‘ ’；数量为奇数时最后一个视为开引号
+    text = _pair_quotes(text, '"', '“', '”')
+    text = _pair_quotes(text, "'", '‘', '’')
+
+    # 英文句点此时已全部转换为“。”，"..." 会得到 "。。。"，因此无需再匹配英文省略号
+
+    # 统一破折号: -- 或更长 -> ——
+    if "--" in text:
+        text = _DASH_RUN_RE.sub("——", text)
+
+    return text
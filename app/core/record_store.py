@@ -0,0 +1,286 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# 结构版本：表结构变化时递增，便于日后升级旧库
+_SCHEMA_VERSION = 1
+
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS records (
+    record_id    TEXT PRIMARY KEY,
+    position     INTEGER NOT NULL,
+    title        TEXT,
+    status       TEXT,
+    content      TEXT,
+    updated_time INTEGER,
+    extra        TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_records_status ON records(status);
+CREATE INDEX IF NOT EXISTS idx_records_position ON records(position);
+CREATE TABLE IF NOT EXISTS used_records (
+    record_id TEXT PRIMARY KEY,
+    used_at   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS outbox (
+    record_id    TEXT PRIMARY KEY,
+    queued_at    REAL NOT NULL,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL DEFAULT 0,
+    last_error   TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_next ON outbox(next_attempt);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# 记录中单独成列的键，其余键以 JSON 存入 extra
+_COLUMNS = ("record_id", "title", "status", "content", "updated_time")
+
+
+class RecordStore:
+    """飞书记录的本地存储（SQLite，WAL 模式）。
+
+    - records：同步得到的“已完成”记录，按 position 保持列表顺序，按 record_id/status 建索引
+    - used_records：本地已使用标记
+    - outbox：待回写到飞书的“已使用”状态（后台批量提交，失败按退避时间重试）
+    - meta：同步状态等元数据（JSON 文本）
+    连接可跨线程使用（后台同步线程与界面线程共用），所有操作由同一把锁串行化。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA_SQL)
+        if self.get_meta("schema_version") is None:
+            self.set_meta("schema_version", _SCHEMA_VERSION)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # —— 记录 ——
+    @staticmethod
+    def _row_to_item(row) -> Dict:
+        item = {"record_id": row[0], "title": row[1], "status": row[2],
+                "content": row[3], "updated_time": row[4]}
+        if row[5]:
+            try:
+                item.update(json.loads(row[5]))
+            except ValueError:
+                pass
+        return item
+
+    @staticmethod
+    def _item_to_row(position: int, item: Dict):
+        extra = {k: v for k, v in item.items() if k not in _COLUMNS}
+        updated = item.get("updated_time")
+        return (
+            str(item.get("record_id") or ""),
+            position,
+            item.get("title"),
+            item.get("status"),
+            item.get("content"),
+            updated if isinstance(updated, int) else None,
+            json.dumps(extra, ensure_ascii=False) if extra else None,
+        )
+
+    def load_items(self) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT record_id, title, status, content, updated_time, extra FROM records ORDER BY position"
+            ).fetchall()
+        return [self._row_to_item(r) for r in rows]
+
+    def get(self, record_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT record_id, title, status, content, updated_time, extra FROM records WHERE record_id = ?",
+                (str(record_id),),
+            ).fetchone()
+        return self._row_to_item(row) if row else None
+
+    def items_by_status(self, status: str) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT record_id, title, status, content, updated_time, extra FROM records "
+                "WHERE status = ? ORDER BY position",
+                (status,),
+            ).fetchall()
+        return [self._row_to_item(r) for r in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def replace_items(self, items: Iterable[Dict], sync_state: Optional[Dict] = None,
+                      precondition: Optional[Callable[[], bool]] = None) -> bool:
+        """用同步结果整体替换记录列表（单个事务）；可同时写入同步状态。
+
+        precondition 在写事务内调用（与其他写入串行），返回 False 时放弃写入，
+        用于丢弃已被更新的同步取代的结果。返回是否已写入。
+        """
+        rows = [self._item_to_row(i, it) for i, it in enumerate(items) if it.get("record_id")]
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                if precondition is not None and not precondition():
+                    cur.execute("ROLLBACK")
+                    return False
+                cur.execute("DELETE FROM records")
+                cur.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                if sync_state is not None:
+                    cur.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                                ("sync_state", json.dumps(sync_state, ensure_ascii=False)))
+                cur.execute("COMMIT")
+            except BaseException:
+                cur.execute("ROLLBACK")
+                raise
+        return True
+
+    # —— 已使用标记 ——
+    def mark_used(self, record_id: str) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO used_records VALUES (?, ?)", (str(record_id), time.time()))
+
+    def is_used(self, record_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM used_records WHERE record_id = ?", (str(record_id),)
+            ).fetchone() is not None
+
+    def used_ids(self) -> Set[str]:
+        with self._lock:
+            return {r[0] for r in self._conn.execute("SELECT record_id FROM used_records")}
+
+    # —— 待回写队列 ——
+    def enqueue_used(self, record_ids: Iterable[str]) -> None:
+        """加入回写队列（已在队列中的记录立即重新变为可提交）。"""
+        now = time.time()
+        rows = [(str(rid), now) for rid in record_ids if rid]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO outbox (record_id, queued_at) VALUES (?, ?) "
+                "ON CONFLICT(record_id) DO UPDATE SET next_attempt = 0",
+                rows,
+            )
+
+    def due_outbox(self, now: Optional[float] = None, limit: int = 1000) -> List[Tuple[str, int]]:
+        """返回到期可提交的 (record_id, 已尝试次数)，按入队顺序。"""
+        now = time.time() if now is None else now
+        with self._lock:
+            return self._conn.execute(
+                "SELECT record_id, attempts FROM outbox WHERE next_attempt <= ? ORDER BY queued_at, rowid LIMIT ?",
+                (now, int(limit)),
+            ).fetchall()
+
+    def next_outbox_time(self) -> Optional[float]:
+        """最早的下次提交时间；队列为空时返回 None。"""
+        with self._lock:
+            row = self._conn.execute("SELECT MIN(next_attempt) FROM outbox").fetchone()
+        return row[0] if row else None
+
+    def outbox_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def outbox_done(self, record_ids: Iterable[str]) -> None:
+        with self._lock:
+            self._conn.executemany("DELETE FROM outbox WHERE record_id = ?", [(str(r),) for r in record_ids])
+
+    def outbox_retry(self, delays: Iterable[Tuple[str, float]], error: str = "") -> None:
+        """记录一次失败：尝试次数加一，并按各自的退避秒数推迟下次提交。"""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE outbox SET attempts = attempts + 1, next_attempt = ?, last_error = ? WHERE record_id = ?",
+                [(now + float(delay), error, str(rid)) for rid, delay in delays],
+            )
+
+    # —— 元数据 ——
+    def get_meta(self, key: str, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        if row is None or row[0] is None:
+            return default
+        try:
+            return json.loads(row[0])
+        except ValueError:
+            return default
+
+    def set_meta(self, key: str, value) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                               (key, json.dumps(value, ensure_ascii=False)))
+
+    def get_sync_state(self) -> Optional[Dict]:
+        state = self.get_meta("sync_state")
+        return state if isinstance(state, dict) else None
+
+    def migrate_from_settings(self, settings: Dict) -> bool:
+        """把旧版保存在设置文件中的缓存记录、已使用标记与同步状态迁入本库，并从 settings 中移除。
+
+        返回 settings 是否被修改（调用方据此保存设置文件）。
+        """
+        keys = ("feishu_cached_items", "feishu_used_records", "feishu_sync_state")
+        if not any(k in settings for k in keys):
+            return False
+        cached = settings.get("feishu_cached_items")
+        state = settings.get("feishu_sync_state")
+        if isinstance(cached, list) and cached and self.count() == 0:
+            self.replace_items([it for it in cached if isinstance(it, dict)],
+                               state if isinstance(state, dict) else None)
+        for rid in settings.get("feishu_used_records") or []:
+            self.mark_used(str(rid))
+        for k in keys:
+            settings.pop(k, None)
+        logging.getLogger("xhs_tool").info("已将飞书缓存记录迁移到本地数据库: %s", self.path)
+        return True
+
+
+_STORES: Dict[str, RecordStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def default_store_path(settings: Dict, settings_path: Optional[str] = None) -> str:
+    """数据库路径：设置项 feishu_store_path，默认与设置文件同目录的 feishu_records.db。"""
+    path = str(settings.get("feishu_store_path", "") or "").strip()
+    if path:
+        return path
+    base = os.path.dirname(os.path.abspath(settings_path)) if settings_path else os.getcwd()
+    return os.path.join(base, "feishu_records.db")
+
+
+def get_record_store(settings: Dict, settings_path: Optional[str] = None) -> RecordStore:
+    """按路径返回进程内共享的 RecordStore（首次打开时迁移旧版设置中的缓存数据）。"""
+    path = os.path.abspath(default_store_path(settings, settings_path))
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = _STORES[path] = RecordStore(path)
+            created = True
+        else:
+            created = False
+    if created and store.migrate_from_settings(settings) and settings_path:
+        from .config_manager import ConfigManager
+        from .utils import save_settings
+        try:
+            manager = ConfigManager.instance()
+        except RuntimeError:
+            manager = None
+        # 只有传入的正是全局共享的设置字典时才交给 ConfigManager，否则直接写回 settings_path
+        if manager is not None and manager.settings is settings:
+            manager.save()
+        else:
+            save_settings(settings_path, settings)
+    return store
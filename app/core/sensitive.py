@@ -0,0 +1,170 @@
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+from .ahocorasick import AhoCorasick
+
+# 缓存格式版本：结构变化时递增，旧缓存自动失效
+_CACHE_VERSION = 2
+
+# —— 去敏感词配置（默认关闭，允许被 configure_sensitive_filter 覆盖） ——
+SENSITIVE_FILTER_ENABLED = False
+SENSITIVE_MODE = "replace"  # replace：替换；flag：保留原词并标记
+SENSITIVE_MASK_CHAR = "*"
+SENSITIVE_FLAG_FORMAT = "【{word}】"
+
+
+class SensitiveFilter:
+    """敏感词替换器：词典编译为 Aho–Corasick 自动机，单次线性扫描完成匹配。
+
+    词典文件（UTF-8）每行一个词条，# 开头为注释；可用制表符或“=”指定替换词：
+        排毒=排D
+        刺激	刺j
+        某敏感词
+    未指定替换词的词条按字数替换为掩码字符。
+    重叠命中时取最左、最长的词条（与人工替换的直觉一致）。
+    编译结果以 JSON 纯数据缓存（不使用 pickle，缓存文件被改动也不会执行任意代码）。
+    """
+
+    def __init__(self, entries: Dict[str, Optional[str]]):
+        self.automaton = AhoCorasick(entries.keys())
+        self.replacements: List[Optional[str]] = [entries.get(w) for w in self.automaton.patterns]
+
+    def __len__(self) -> int:
+        return len(self.automaton)
+
+    @staticmethod
+    def parse_dictionary(path: str) -> Dict[str, Optional[str]]:
+        entries: Dict[str, Optional[str]] = {}
+        with open(path, "r", encoding="utf-8-sig") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if "\t" in line:
+                    word, repl = line.split("\t", 1)
+                elif "=" in line:
+                    word, repl = line.split("=", 1)
+                else:
+                    word, repl = line, None
+                word = word.strip()
+                if word:
+                    entries.setdefault(word, repl.strip() if repl is not None else None)
+        return entries
+
+    @classmethod
+    def load(cls, dict_path: str, cache_path: Optional[str] = None) -> "SensitiveFilter":
+        """加载词典；命中磁盘缓存（源文件路径、大小、修改时间一致）时跳过重新编译。"""
+        st = os.stat(dict_path)
+        signature = [_CACHE_VERSION, os.path.abspath(dict_path), st.st_size, st.st_mtime_ns]
+        cache_path = cache_path or f"{dict_path}.cache"
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("signature") == signature:
+                return cls._from_cache(cached)
+        except Exception:
+            pass
+        obj = cls(cls.parse_dictionary(dict_path))
+        try:
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"signature": signature, "automaton": obj.automaton.to_data(),
+                           "replacements": obj.replacements}, f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            # 缓存写入失败不影响使用，仅下次启动需要重新编译
+            logging.getLogger("xhs_tool").debug("敏感词缓存写入失败: %s", e)
+        return obj
+
+    @classmethod
+    def _from_cache(cls, cached: Dict) -> "SensitiveFilter":
+        automaton = AhoCorasick.from_data(cached["automaton"])
+        replacements = [None if r is None else str(r) for r in cached["replacements"]]
+        if len(replacements) != len(automaton):
+            raise ValueError("缓存的替换词数量与词条不一致")
+        obj = cls.__new__(cls)
+        obj.automaton = automaton
+        obj.replacements = replacements
+        return obj
+
+    def _find_ids(self, text: str) -> List[Tuple[int, int, int]]:
+        patterns = self.automaton.patterns
+        # 每个起点只保留最长的命中
+        longest: Dict[int, int] = {}
+        for end, pid in self.automaton.iter_matches(text):
+            start = end - len(patterns[pid])
+            best = longest.get(start)
+            if best is None or len(patterns[pid]) > len(patterns[best]):
+                longest[start] = pid
+        hits: List[Tuple[int, int, int]] = []
+        pos = 0
+        for start in sorted(longest):
+            if start < pos:
+                continue
+            pid = longest[start]
+            pos = start + len(patterns[pid])
+            hits.append((start, pos, pid))
+        return hits
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """返回不重叠的命中列表 (起始, 结束, 词条)，按出现顺序排列。"""
+        patterns = self.automaton.patterns
+        return [(start, end, patterns[pid]) for start, end, pid in self._find_ids(text)]
+
+    def apply(self, text: str, mode: str = "replace", mask_char: str = "*",
+              flag_format: str = "【{word}】") -> str:
+        hits = self._find_ids(text)
+        if not hits:
+            return text
+        patterns = self.automaton.patterns
+        out: List[str] = []
+        pos = 0
+        for start, end, pid in hits:
+            out.append(text[pos:start])
+            if mode == "flag":
+                # 只替换 {word} 占位符，格式中的其他花括号原样保留
+                out.append(flag_format.replace("{word}", patterns[pid]))
+            else:
+                repl = self.replacements[pid]
+                out.append(repl if repl is not None else mask_char * (end - start))
+            pos = end
+        out.append(text[pos:])
+        return "".join(out)
+
+
+_SENSITIVE_FILTER: Optional[SensitiveFilter] = None
+
+
+def configure_sensitive_filter(settings: dict):
+    """根据设置加载（或关闭）敏感词过滤。
+
+    - sensitive_filter_enabled：是否启用（默认关闭）
+    - sensitive_dict_path：词典文件路径
+    - sensitive_cache_path：编译缓存路径（默认 <词典路径>.cache）
+    - sensitive_mode：replace / flag
+    - sensitive_mask_char、sensitive_flag_format：替换掩码与标记格式
+    """
+    global SENSITIVE_FILTER_ENABLED, SENSITIVE_MODE, SENSITIVE_MASK_CHAR, SENSITIVE_FLAG_FORMAT, _SENSITIVE_FILTER
+    SENSITIVE_MODE = "flag" if settings.get("sensitive_mode") == "flag" else "replace"
+    SENSITIVE_MASK_CHAR = str(settings.get("sensitive_mask_char", "*") or "*")
+    SENSITIVE_FLAG_FORMAT = str(settings.get("sensitive_flag_format", "【{word}】") or "【{word}】")
+    SENSITIVE_FILTER_ENABLED = False
+    _SENSITIVE_FILTER = None
+    if not settings.get("sensitive_filter_enabled", False):
+        return
+    dict_path = str(settings.get("sensitive_dict_path", "") or "").strip()
+    if not dict_path or not os.path.exists(dict_path):
+        logging.getLogger("xhs_tool").warning("敏感词词典不存在，已跳过去敏感词: %s", dict_path)
+        return
+    cache_path = str(settings.get("sensitive_cache_path", "") or "").strip() or None
+    _SENSITIVE_FILTER = SensitiveFilter.load(dict_path, cache_path)
+    SENSITIVE_FILTER_ENABLED = True
+
+
+def desensitize(text: str) -> str:
+    """按当前配置对文本去敏感词；未启用时原样返回。"""
+    if not SENSITIVE_FILTER_ENABLED or _SENSITIVE_FILTER is None or not text:
+        return text
+    return _SENSITIVE_FILTER.apply(text, SENSITIVE_MODE, SENSITIVE_MASK_CHAR, SENSITIVE_FLAG_FORMAT)
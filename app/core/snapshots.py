@@ -0,0 +1,145 @@
+import atexit
+import datetime
+import gzip
+import json
+import logging
+import os
+import queue
+import random
+import threading
+from typing import Dict, Optional
+
+
+class SnapshotWriter:
+    """后台写调试快照：序列化、gzip 压缩与落盘都在写线程完成，调用方只入队。
+
+    每类快照保存为 <类型>-<时间戳>.json.gz，写入后按类型只保留最近 keep 份，
+    并在目录总大小超过 max_bytes 时从最旧的开始删除（至少保留刚写入的一份）。
+    """
+
+    def __init__(self, directory: str, keep: int = 5, max_bytes: int = 50 * 1024 * 1024):
+        self.directory = directory
+        self.keep = max(1, keep)
+        self.max_bytes = max_bytes
+        self._queue: "queue.Queue" = queue.Queue()
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, kind: str, data) -> str:
+        """加入写入队列，返回将要写入的文件路径；data 入队后不应再被修改。"""
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        path = os.path.join(self.directory, f"{kind}-{stamp}.json.gz")
+        with self._cond:
+            self._pending += 1
+        self._queue.put((kind, path, data))
+        return path
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待队列中的快照写完；超时返回 False。"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def _run(self) -> None:
+        while True:
+            kind, path, data = self._queue.get()
+            try:
+                self._write(kind, path, data)
+            except Exception as e:
+                logging.getLogger("xhs_tool").debug("写入调试快照失败: %s", e)
+            finally:
+                with self._cond:
+                    self._pending -= 1
+                    self._cond.notify_all()
+
+    def _write(self, kind: str, path: str, data) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=5) as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self._prune(kind, path)
+
+    def _prune(self, kind: str, latest: str) -> None:
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json.gz"):
+                continue
+            full = os.path.join(self.directory, name)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            entries.append((name, full, st.st_size))
+        # 文件名含时间戳，按名称排序即按时间排序
+        entries.sort()
+        same_kind = [e for e in entries if e[0].rsplit("-", 3)[0] == kind]
+        doomed = {e[1] for e in same_kind[:-self.keep]}
+        total = sum(e[2] for e in entries if e[1] not in doomed)
+        for name, full, size in entries:
+            if total <= self.max_bytes:
+                break
+            if full not in doomed and full != latest:
+                doomed.add(full)
+                total -= size
+        for full in doomed:
+            try:
+                os.remove(full)
+            except OSError:
+                pass
+
+
+_WRITERS: Dict[str, SnapshotWriter] = {}
+_WRITERS_LOCK = threading.Lock()
+
+
+def get_snapshot_writer(settings: Dict) -> SnapshotWriter:
+    """按快照目录返回进程内共享的写入器（默认 <log_dir>/snapshots）。"""
+    directory = str(settings.get("snapshot_dir", "") or "").strip() or os.path.join(
+        settings.get("log_dir", "logs") or "logs", "snapshots")
+    directory = os.path.abspath(directory)
+    with _WRITERS_LOCK:
+        writer = _WRITERS.get(directory)
+        if writer is None:
+            writer = _WRITERS[directory] = SnapshotWriter(
+                directory,
+                keep=int(settings.get("snapshot_keep", 5)),
+                max_bytes=int(settings.get("snapshot_max_mb", 50)) * 1024 * 1024,
+            )
+        return writer
+
+
+def should_snapshot(settings: Dict, record_count: int, force: bool = False) -> bool:
+    """快照策略：
+
+    - snapshot_mode：auto（默认）/ always / off
+    - auto 模式下记录数不超过 snapshot_max_records（默认 2000）时每次都写；
+      超过时按 snapshot_sample_rate（默认 0.1）抽样，日志级别为 DEBUG 或 force=True（如用户触发的全量刷新）时必写
+    """
+    mode = str(settings.get("snapshot_mode", "auto") or "auto").lower()
+    if mode == "off":
+        return False
+    if mode == "always" or force:
+        return True
+    if record_count <= int(settings.get("snapshot_max_records", 2000)):
+        return True
+    if logging.getLogger("xhs_tool").isEnabledFor(logging.DEBUG):
+        return True
+    return random.random() < float(settings.get("snapshot_sample_rate", 0.1))
+
+
+def write_snapshot(settings: Dict, kind: str, data, record_count: int = 0,
+                   force: bool = False) -> Optional[str]:
+    """按策略提交一份快照，返回文件路径；本次不写时返回 None。force 只作用于这一次写入。"""
+    if not should_snapshot(settings, record_count, force):
+        return None
+    return get_snapshot_writer(settings).submit(kind, data)
+
+
+@atexit.register
+def _flush_all() -> None:
+    with _WRITERS_LOCK:
+        writers = list(_WRITERS.values())
+    for writer in writers:
+        writer.flush(5)
@@ -0,0 +1,234 @@
+"""轻量级分段计时（span）：记录各处理阶段的耗时，可导出为 Chrome trace-event JSON。
+
+    with span("parse"):
+        ...
+    @traced("image.download")
+    def download(...): ...
+
+- 未启用追踪且未传 timings 时，span() 返回共享的空对象，开销只有一次函数调用
+- 传入 timings 字典时无论是否启用追踪都会按名称累计秒数（供批处理统计各阶段耗时）
+- 启用后事件保存在内存中（上限 trace_max_events），程序退出时写出 trace 文件并在日志中输出汇总；
+  trace 文件可在 chrome://tracing 或 https://ui.perfetto.dev 中打开
+- 时间戳取 perf_counter（系统范围单调时钟），批处理工作进程经 drain/merge 汇总后可在同一时间轴上对齐
+"""
+import atexit
+import datetime
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+# —— 追踪配置（默认关闭，允许被 configure_tracing 覆盖） ——
+TRACE_ENABLED = False
+TRACE_DIR = os.path.join("logs", "traces")
+TRACE_MAX_EVENTS = 200000
+
+_EVENTS: List[Dict] = []
+_SEEN_THREADS: set = set()
+_LOCK = threading.Lock()
+_DROPPED = 0
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+    def set(self, **args) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "timings", "start")
+
+    def __init__(self, name: str, cat: str, args: Dict, timings: Optional[Dict[str, float]]):
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.timings = timings
+        self.start = 0.0
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        end = time.perf_counter()
+        if self.timings is not None:
+            self.timings[self.name] = self.timings.get(self.name, 0.0) + (end - self.start)
+        if TRACE_ENABLED:
+            if exc_type is not None:
+                self.args["error"] = exc_type.__name__
+            _record(self.name, self.cat, self.start, end, self.args)
+        return False
+
+    def set(self, **args) -> None:
+        """补充事件参数（如 HTTP 状态码），在导出的 trace 中显示。"""
+        self.args.update(args)
+
+
+def _record(name: str, cat: str, start: float, end: float, args: Dict) -> None:
+    global _DROPPED
+    pid, tid = os.getpid(), threading.get_ident()
+    event = {
+        "name": name,
+        "cat": cat,
+        "ph": "X",
+        "ts": round(start * 1e6, 3),
+        "dur": round((end - start) * 1e6, 3),
+        "pid": pid,
+        "tid": tid,
+    }
+    if args:
+        event["args"] = args
+    with _LOCK:
+        if len(_EVENTS) >= TRACE_MAX_EVENTS:
+            _DROPPED += 1
+            return
+        if (pid, tid) not in _SEEN_THREADS:
+            # 元数据事件：trace 查看器中以线程名显示各行
+            _SEEN_THREADS.add((pid, tid))
+            _EVENTS.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                            "args": {"name": threading.current_thread().name}})
+        _EVENTS.append(event)
+
+
+def span(name: str, cat: str = "app", timings: Optional[Dict[str, float]] = None, **args):
+    """返回计时上下文管理器；args 作为事件参数写入 trace。"""
+    if not TRACE_ENABLED and timings is None:
+        return _NULL_SPAN
+    return _Span(name, cat, args, timings)
+
+
+def traced(name: Optional[str] = None, cat: str = "app") -> Callable:
+    """函数装饰器：每次调用记录一个 span（默认以函数限定名命名）。"""
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            if not TRACE_ENABLED:
+                return fn(*a, **kw)
+            with _Span(span_name, cat, {}, None):
+                return fn(*a, **kw)
+        return wrapper
+    return decorator
+
+
+def configure_tracing(settings: dict) -> None:
+    """根据设置启用（或关闭）追踪。
+
+    - trace_enabled：是否启用（默认关闭）
+    - trace_dir：trace 文件目录（默认 <log_dir>/traces）
+    - trace_max_events：内存中最多保留的事件数（默认 200000，超出后丢弃新事件）
+    """
+    global TRACE_ENABLED, TRACE_DIR, TRACE_MAX_EVENTS
+    TRACE_DIR = str(settings.get("trace_dir", "") or "").strip() or os.path.join(
+        settings.get("log_dir", "logs") or "logs", "traces")
+    try:
+        TRACE_MAX_EVENTS = int(settings.get("trace_max_events", 200000))
+    except (TypeError, ValueError):
+        TRACE_MAX_EVENTS = 200000
+    TRACE_ENABLED = bool(settings.get("trace_enabled", False))
+
+
+def events() -> List[Dict]:
+    with _LOCK:
+        return list(_EVENTS)
+
+
+def reset() -> None:
+    """清空已记录的事件（fork 出的工作进程需先调用，避免带上父进程的事件）。"""
+    global _DROPPED
+    with _LOCK:
+        _EVENTS.clear()
+        _SEEN_THREADS.clear()
+        _DROPPED = 0
+
+
+def drain() -> List[Dict]:
+    """取出并清空已记录的事件（工作进程把事件随结果传回主进程）。"""
+    with _LOCK:
+        drained = list(_EVENTS)
+        _EVENTS.clear()
+        _SEEN_THREADS.clear()
+    return drained
+
+
+def merge(trace_events: List[Dict]) -> None:
+    """并入其他进程 drain 出的事件。"""
+    if not trace_events:
+        return
+    with _LOCK:
+        _EVENTS.extend(trace_events)
+
+
+def summary() -> Dict[str, Dict[str, float]]:
+    """按 span 名称汇总：次数、总耗时、平均与最大耗时（毫秒），按总耗时降序。"""
+    stats: Dict[str, Dict[str, float]] = {}
+    for ev in events():
+        if ev.get("ph") != "X":
+            continue
+        s = stats.setdefault(ev["name"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        ms = ev["dur"] / 1000.0
+        s["count"] += 1
+        s["total_ms"] += ms
+        s["max_ms"] = max(s["max_ms"], ms)
+    for s in stats.values():
+        s["mean_ms"] = s["total_ms"] / s["count"]
+    return dict(sorted(stats.items(), key=lambda kv: kv[1]["total_ms"], reverse=True))
+
+
+def format_summary(stats: Optional[Dict[str, Dict[str, float]]] = None) -> str:
+    stats = summary() if stats is None else stats
+    lines = [f"{'span':<28} {'count':>7} {'total ms':>11} {'mean ms':>10} {'max ms':>10}"]
+    for name, s in stats.items():
+        lines.append(f"{name:<28} {int(s['count']):>7} {s['total_ms']:>11.2f} "
+                     f"{s['mean_ms']:>10.2f} {s['max_ms']:>10.2f}")
+    return "\n".join(lines)
+
+
+def export_chrome_trace(path: Optional[str] = None) -> str:
+    """把已记录的事件写为 Chrome trace-event JSON，返回文件路径。"""
+    if path is None:
+        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(TRACE_DIR, f"trace_{stamp}_{os.getpid()}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with _LOCK:
+        trace_events = list(_EVENTS)
+        dropped = _DROPPED
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms",
+                   "otherData": {"dropped_events": dropped}}, f, ensure_ascii=False)
+    return path
+
+
+def write_run_report() -> Optional[str]:
+    """写出本次运行的 trace 文件并在日志中输出各阶段汇总；没有事件时返回 None。"""
+    stats = summary()
+    if not stats:
+        return None
+    logger = logging.getLogger("xhs_tool")
+    try:
+        path = export_chrome_trace()
+    except OSError as e:
+        logger.warning("写出 trace 文件失败: %s", e)
+        path = None
+    logger.info("本次运行各阶段耗时汇总（trace: %s）\n%s", path, format_summary(stats))
+    return path
+
+
+@atexit.register
+def _report_at_exit() -> None:
+    if TRACE_ENABLED:
+        write_run_report()
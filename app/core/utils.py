@@ -1,5 +1,6 @@
 import json
 import os
+import threading
 
 
 def load_settings(path: str) -> dict:
@@ -10,6 +11,19 @@ def load_settings(path: str) -> dict:
 
 
 def save_settings(path: str, data: dict):
+    """原子写入设置文件：先写同目录临时文件并落盘，再替换原文件，写入中途崩溃不会留下半截文件。"""
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
\ No newline at end of file
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
\ No newline at end of file
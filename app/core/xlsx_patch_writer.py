@@ -0,0 +1,482 @@
+"""直接修补 xlsx 的模板写入器（不构建 openpyxl 对象模型）。
+
+模板约定只追加纯文本行、不改变样式与结构，因此这里：
+- 模板中除活动工作表 XML 外的所有部件原样复制；
+- 活动工作表 XML 只写入新行（填入数据区之后预设行高/样式的空行元素，或插入 </sheetData> 前）
+  并更新 <dimension>，其余字节不变；
+- 新单元格使用内联字符串（与 openpyxl 3.1 的输出方式一致），无需改写 sharedStrings。
+
+对外提供与 excel_writer.write_to_template 相同签名的 write_to_template；
+遇到无法安全修补的模板结构时自动回退到 openpyxl 写入器。
+"""
+import bisect
+import io
+import logging
+import os
+import re
+import threading
+import zipfile
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+from xml.etree import ElementTree as ET
+
+from . import excel_writer
+from .tracing import span
+
+
+class UnsupportedTemplate(Exception):
+    """模板结构不适合直接修补（由调用方回退到 openpyxl 写入器）。"""
+
+
+_CELL_REF_RE = re.compile(r"^([A-Z]+)(\d+)$")
+_XML_DECL_ENCODING_RE = re.compile(rb'^\s*<\?xml[^>]*encoding=["\']([^"\']+)["\']')
+_SHEETDATA_EMPTY_RE = re.compile(rb"<((?:[\w.-]+:)?)sheetData\s*/>")
+_SHEETDATA_CLOSE_RE = re.compile(rb"</((?:[\w.-]+:)?)sheetData\s*>")
+_DIMENSION_RE = re.compile(rb'(<(?:[\w.-]+:)?dimension\s+ref=")([^"]*)(")')
+# 不含单元格的行元素（仅设置了行高/行样式），如 <row r="5" ht="27"/> 或 <row r="5"></row>
+_EMPTY_ROW_RE = re.compile(rb"<((?:[\w.-]+:)?)row\b([^>]*?)(?:/>|>\s*</(?:[\w.-]+:)?row\s*>)")
+_ROW_NUM_RE = re.compile(rb'\sr="(\d+)"')
+# 与 openpyxl 一致：工作表中不允许的控制字符
+_ILLEGAL_CHARACTERS_RE = re.compile(r"[\000-\010]|[\013-\014]|[\016-\037]")
+_NUMERALS = ["一", "二", "三", "四", "五", "六", "七", "八", "九", "十",
+             "十一", "十二", "十三", "十四", "十五", "十六", "十七", "十八", "十九", "二十"]
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _col_index(letters: str) -> int:
+    idx = 0
+    for ch in letters:
+        idx = idx * 26 + (ord(ch) - 64)
+    return idx
+
+
+def _col_letters(idx: int) -> str:
+    out = ""
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        out = chr(65 + rem) + out
+    return out
+
+
+def _split_ref(ref: str) -> Tuple[int, int]:
+    m = _CELL_REF_RE.match(ref.replace("$", "").upper())
+    if not m:
+        raise UnsupportedTemplate(f"无法解析单元格引用: {ref}")
+    return _col_index(m.group(1)), int(m.group(2))
+
+
+def _resolve_part(base_dir: str, target: str) -> str:
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return os.path.normpath(os.path.join(base_dir, target)).replace("\\", "/")
+
+
+def _plain_text(node) -> str:
+    """富文本/纯文本字符串节点的纯文本内容（忽略拼音 rPh）。"""
+    parts: List[str] = []
+    for child in node:
+        name = _local(child.tag)
+        if name == "t":
+            parts.append(child.text or "")
+        elif name == "r":
+            for t in child:
+                if _local(t.tag) == "t":
+                    parts.append(t.text or "")
+    return "".join(parts)
+
+
+class _PatchTemplate:
+    """解析一次后缓存的模板信息。"""
+
+    def __init__(self, key: Tuple, data: bytes):
+        self.key = key
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            self.parts: List[Tuple[zipfile.ZipInfo, bytes]] = [(info, zf.read(info)) for info in zf.infolist()]
+        contents = {info.filename: blob for info, blob in self.parts}
+        self.sheet_path = self._active_sheet_path(contents)
+        self.sheet_xml = contents[self.sheet_path]
+        m = _XML_DECL_ENCODING_RE.match(self.sheet_xml)
+        if m and m.group(1).lower().replace(b"-", b"") != b"utf8":
+            raise UnsupportedTemplate("工作表 XML 非 UTF-8 编码")
+        # 新行插入位置：</sheetData> 之前，或展开空的 <sheetData/>
+        m = _SHEETDATA_CLOSE_RE.search(self.sheet_xml) or _SHEETDATA_EMPTY_RE.search(self.sheet_xml)
+        if m is None:
+            raise UnsupportedTemplate("工作表缺少 sheetData")
+        self.sheetdata_match = (m.start(), m.end(), m.re is _SHEETDATA_EMPTY_RE)
+        self.ns_prefix = m.group(1).decode()
+        shared = self._shared_strings(contents)
+        self._scan_sheet(shared)
+        self.trailing_rows = self._trailing_rows()
+        self.headers: Dict[Tuple[str, ...], Tuple[Optional[int], List]] = {}
+
+    @staticmethod
+    def _rels(contents: Dict[str, bytes], rels_path: str) -> Dict[str, Tuple[str, str]]:
+        rels: Dict[str, Tuple[str, str]] = {}
+        blob = contents.get(rels_path)
+        if blob is None:
+            return rels
+        for rel in ET.fromstring(blob):
+            rels[rel.get("Id", "")] = (rel.get("Type", ""), rel.get("Target", ""))
+        return rels
+
+    def _active_sheet_path(self, contents: Dict[str, bytes]) -> str:
+        wb_path = "xl/workbook.xml"
+        root_rels = self._rels(contents, "_rels/.rels")
+        for rel_type, target in root_rels.values():
+            if rel_type.endswith("/officeDocument"):
+                wb_path = target.lstrip("/")
+                break
+        if wb_path not in contents:
+            raise UnsupportedTemplate("未找到 workbook.xml")
+        wb_dir = os.path.dirname(wb_path)
+        self._wb_dir = wb_dir
+        self._wb_rels = self._rels(contents, f"{wb_dir}/_rels/{os.path.basename(wb_path)}.rels")
+        root = ET.fromstring(contents[wb_path])
+        active = 0
+        sheets: List[str] = []
+        for el in root.iter():
+            name = _local(el.tag)
+            if name == "workbookView":
+                try:
+                    active = int(el.get("activeTab", 0) or 0)
+                except ValueError:
+                    active = 0
+            elif name == "sheet":
+                rid = next((v for k, v in el.attrib.items() if _local(k) == "id"), "")
+                sheets.append(rid)
+        if not sheets:
+            raise UnsupportedTemplate("工作簿中没有工作表")
+        if not 0 <= active < len(sheets):
+            active = 0
+        rel_type, target = self._wb_rels.get(sheets[active], ("", ""))
+        if not rel_type.endswith("/worksheet"):
+            raise UnsupportedTemplate("活动工作表不是普通工作表")
+        path = _resolve_part(wb_dir, target)
+        if path not in contents:
+            raise UnsupportedTemplate(f"缺少工作表部件: {path}")
+        return path
+
+    def _shared_strings(self, contents: Dict[str, bytes]) -> List[str]:
+        for rel_type, target in self._wb_rels.values():
+            if rel_type.endswith("/sharedStrings"):
+                blob = contents.get(_resolve_part(self._wb_dir, target))
+                if blob is None:
+                    return []
+                return [_plain_text(si) for si in ET.fromstring(blob) if _local(si.tag) == "si"]
+        return []
+
+    def _scan_sheet(self, shared: List[str]) -> None:
+        """读取前10行的值、max_row（与 openpyxl 的 ws.max_row 一致）以及最后一个 <row> 行号。"""
+        top: Dict[int, Dict[int, object]] = {}
+        max_row = 0
+        max_col = 0
+        last_row_el = 0
+        row_idx = 0
+        row_nums: List[int] = []
+        for _, el in ET.iterparse(io.BytesIO(self.sheet_xml), events=("end",)):
+            name = _local(el.tag)
+            if name == "row":
+                r = el.get("r")
+                row_idx = int(r) if r else row_idx + 1
+                last_row_el = max(last_row_el, row_idx)
+                row_nums.append(row_idx if r else -row_idx)
+                col_idx = 0
+                for c in el:
+                    if _local(c.tag) != "c":
+                        continue
+                    ref = c.get("r")
+                    if ref:
+                        col_idx, cell_row = _split_ref(ref)
+                    else:
+                        col_idx, cell_row = col_idx + 1, row_idx
+                    max_row = max(max_row, cell_row)
+                    max_col = max(max_col, col_idx)
+                    if cell_row <= 10:
+                        top.setdefault(cell_row, {})[col_idx] = self._cell_value(c, shared)
+                el.clear()
+            elif name in ("mergeCell", "hyperlink"):
+                # openpyxl 会为合并区域与超链接创建单元格，它们同样计入 max_row
+                ref = el.get("ref", "")
+                for part in ref.split(":"):
+                    if part:
+                        col_idx, cell_row = _split_ref(part)
+                        max_row = max(max_row, cell_row)
+                        max_col = max(max_col, col_idx)
+        self.max_row = max_row or 1
+        self.max_col = max_col
+        self.last_row_element = last_row_el
+        self._row_nums = row_nums
+        self.top_rows: List[List] = []
+        for r in range(1, min(10, self.max_row) + 1):
+            vals = top.get(r, {})
+            self.top_rows.append([vals.get(c) for c in range(1, max(max_col, 1) + 1)])
+
+    def _trailing_rows(self) -> Dict[int, Tuple[int, int, bytes, bytes]]:
+        """数据区之后的空行元素：行号 -> (起始偏移, 结束偏移, 命名空间前缀, 属性)，新行写入这些元素中。
+
+        模板常为后续行预设行高与行样式（如一直到第 1000 行），openpyxl 会保留这些属性并在其中写入单元格。
+        """
+        expected = [n for n in self._row_nums if abs(n) > self.max_row]
+        if not expected:
+            return {}
+        if any(n < 0 for n in expected):
+            raise UnsupportedTemplate("数据区之后的行元素缺少行号")
+        rows: Dict[int, Tuple[int, int, bytes, bytes]] = {}
+        for m in _EMPTY_ROW_RE.finditer(self.sheet_xml):
+            num = _ROW_NUM_RE.search(b" " + m.group(2))
+            if num and int(num.group(1)) > self.max_row:
+                rows[int(num.group(1))] = (m.start(), m.end(), m.group(1), m.group(2))
+        if sorted(rows) != sorted(expected):
+            raise UnsupportedTemplate("无法定位数据区之后的行元素")
+        return rows
+
+    @staticmethod
+    def _cell_value(c, shared: List[str]):
+        t = c.get("t", "n")
+        v = f = None
+        inline = None
+        for child in c:
+            name = _local(child.tag)
+            if name == "v":
+                v = child.text
+            elif name == "f":
+                f = child.text
+            elif name == "is":
+                inline = _plain_text(child)
+        if f is not None:
+            return f"={f}"
+        if t == "inlineStr":
+            return inline
+        if v is None:
+            return None
+        if t == "s":
+            try:
+                return shared[int(v)]
+            except (ValueError, IndexError):
+                return None
+        if t == "n":
+            try:
+                return int(v) if re.fullmatch(r"-?\d+", v) else float(v)
+            except ValueError:
+                return v
+        if t == "b":
+            return v == "1"
+        return v
+
+
+class _Unsupported:
+    """缓存的解析失败结果：同一模板文件不再重复读取与解析，直接回退。"""
+
+    def __init__(self, key: Tuple, error: Exception):
+        self.key = key
+        self.error = error
+
+
+_CACHE: Dict[str, Union[_PatchTemplate, _Unsupported]] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def _get_template(template_path: str) -> _PatchTemplate:
+    """按 路径+修改时间+大小 缓存解析结果（包括失败结果）；无法修补时抛出 UnsupportedTemplate。"""
+    abs_path = os.path.abspath(template_path)
+    st = os.stat(abs_path)
+    key = (abs_path, st.st_mtime_ns, st.st_size)
+    with _CACHE_LOCK:
+        entry = _CACHE.get(abs_path)
+    if entry is None or entry.key != key:
+        with open(abs_path, "rb") as f:
+            data = f.read()
+        try:
+            entry = _PatchTemplate(key, data)
+        except Exception as e:
+            # 任何解析错误（含写入器自身缺陷）都视为不支持，由调用方回退 openpyxl
+            entry = _Unsupported(key, e)
+        with _CACHE_LOCK:
+            _CACHE[abs_path] = entry
+    if isinstance(entry, _Unsupported):
+        raise UnsupportedTemplate(str(entry.error)) from entry.error
+    return entry
+
+
+def clear_template_cache() -> None:
+    with _CACHE_LOCK:
+        _CACHE.clear()
+
+
+def _escape(text: str) -> str:
+    # 与 openpyxl 一致：\r 原样写出（读取时按 XML 规则归一为 \n）
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _cell_xml(ref: str, value: Optional[str]) -> str:
+    if value is None:
+        return ""
+    value = str(value)
+    if _ILLEGAL_CHARACTERS_RE.search(value):
+        raise ValueError(f"{value} cannot be used in worksheets.")
+    if value.startswith("=") and len(value) > 1:
+        # 与 openpyxl 一致：以 = 开头的文本按公式写入
+        return f'<c r="{ref}"><f>{_escape(value[1:])}</f><v /></c>'
+    if value == "":
+        return f'<c r="{ref}" t="inlineStr" />'
+    space = ' xml:space="preserve"' if value.strip() != value else ""
+    return f'<c r="{ref}" t="inlineStr"><is><t{space}>{_escape(value)}</t></is></c>'
+
+
+def write_to_template(template_path: str, output_dir: str, title: str,
+                      points: List[Tuple[str, str]],
+                      column_map: Dict[str, str],
+                      images: Optional[List[Optional[str]]] = None) -> str:
+    """与 excel_writer.write_to_template 行为一致的快速写入器，返回生成的输出文件路径。"""
+    os.makedirs(output_dir, exist_ok=True)
+    out_path = os.path.join(output_dir, excel_writer.output_filename(title))
+    render_template(template_path, points, column_map, images, output=out_path)
+    return out_path
+
+
+def render_template(template_path: str,
+                    points: List[Tuple[str, str]],
+                    column_map: Dict[str, str],
+                    images: Optional[List[Optional[str]]] = None,
+                    output: Union[None, str, BinaryIO] = None) -> Optional[bytes]:
+    """与 excel_writer.render_template 一致：output 为 None 时返回 xlsx 字节，否则写入路径或文件对象。"""
+    if not os.path.exists(template_path):
+        raise FileNotFoundError(f"模板文件不存在: {template_path}")
+    try:
+        with span("template_load", path=os.path.basename(template_path)):
+            tpl = _get_template(template_path)
+    except UnsupportedTemplate as e:
+        logging.getLogger("xhs_tool").debug("模板不支持直接修补，回退 openpyxl: %s", e)
+        return excel_writer.render_template(template_path, points, column_map, images, output)
+
+    page_col_name = column_map.get("page_column", "页面") or "页面"
+    point_title_col_name = column_map.get("point_title_column", "文本_1") or "文本_1"
+    point_content_col_name = column_map.get("point_content_column", "文本_2") or "文本_2"
+    extra_text_col_name = column_map.get("extra_text_column", "文本_3") or "文本_3"
+    extra_text_default = column_map.get("extra_text_default", "内容仅供参考，身体不适请及时就医!")
+    image_col_name = column_map.get("image_column")
+    need_cols = [page_col_name, point_title_col_name, point_content_col_name, extra_text_col_name]
+
+    header_key = tuple(need_cols)
+    cached_header = tpl.headers.get(header_key)
+    if cached_header is None:
+        header_row = None
+        headers: List = []
+        for r, row_vals in enumerate(tpl.top_rows, 1):
+            if row_vals and all(col in row_vals for col in need_cols):
+                header_row = r
+                headers = row_vals
+                break
+        cached_header = tpl.headers[header_key] = (header_row, headers)
+    header_row, headers = cached_header
+    if header_row is None:
+        raise ValueError(
+            f"未在前10行找到表头，需包含列：{', '.join(need_cols)}"
+        )
+
+    def try_col_index_from_headers(name: Optional[str]) -> Optional[int]:
+        if not name:
+            return None
+        try:
+            return headers.index(name) + 1
+        except ValueError:
+            return None
+
+    page_col = try_col_index_from_headers(page_col_name)
+    point_title_col = try_col_index_from_headers(point_title_col_name)
+    point_content_col = try_col_index_from_headers(point_content_col_name)
+    extra_text_col = try_col_index_from_headers(extra_text_col_name)
+    image_col = try_col_index_from_headers(image_col_name)
+
+    write_row_start = tpl.max_row + 1
+    rows_xml: List[Tuple[int, str]] = []
+    last_row = tpl.max_row
+    max_col = tpl.max_col
+    for idx, (pt_title, pt_content) in enumerate(points):
+        row = write_row_start + idx
+        num_cn = _NUMERALS[idx] if idx < len(_NUMERALS) else f"{idx+1}"
+        cells: Dict[int, Optional[str]] = {
+            page_col: f"分论点{num_cn}页面",
+            point_title_col: pt_title,
+            point_content_col: pt_content,
+            extra_text_col: extra_text_default,
+        }
+        if image_col is not None and isinstance(images, list):
+            img_path = images[idx] if idx < len(images) else None
+            img_name = None
+            if img_path:
+                img_name = os.path.splitext(os.path.basename(img_path))[0]
+            cells[image_col] = img_name or ""
+        cells_xml = "".join(_cell_xml(f"{_col_letters(c)}{row}", cells[c]) for c in sorted(cells))
+        rows_xml.append((row, cells_xml))
+        last_row = row
+        max_col = max(max_col, max(cells))
+
+    sheet_xml = tpl.sheet_xml
+    if rows_xml:
+        sheet_xml = _insert_rows(tpl, rows_xml)
+        sheet_xml = _update_dimension(sheet_xml, last_row, max_col)
+
+    target = io.BytesIO() if output is None else output
+    with span("save", rows=len(points)), zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as zout:
+        for info, blob in tpl.parts:
+            zout.writestr(info, sheet_xml if info.filename == tpl.sheet_path else blob)
+    return target.getvalue() if output is None else None
+
+
+def _insert_rows(tpl: _PatchTemplate, rows_xml: List[Tuple[int, str]]) -> bytes:
+    """把新行写入：已有的空行元素保留其属性并填入单元格，其余行插入到下一个行号更大的行元素
+    （没有则是 </sheetData>）之前，保持行号递增。"""
+    sheet_xml = tpl.sheet_xml
+    prefix = tpl.ns_prefix
+    trailing = sorted(tpl.trailing_rows)
+    start, end, is_empty = tpl.sheetdata_match
+    # (插入位置, 替换结束位置, 行号, 内容)
+    splices: List[Tuple[int, int, int, bytes]] = []
+    for row, cells_xml in rows_xml:
+        if prefix:
+            cells_xml = re.sub(r"<(/?)(c|is|t|f|v)\b", rf"<\1{prefix}\2", cells_xml)
+        existing = tpl.trailing_rows.get(row)
+        if existing is not None:
+            row_start, row_end, row_prefix, attrs = existing
+            tag = row_prefix + b"row"
+            splices.append((row_start, row_end, row,
+                            b"<" + tag + attrs.rstrip() + b">" + cells_xml.encode("utf-8") + b"</" + tag + b">"))
+            continue
+        blob = f'<{prefix}row r="{row}">{cells_xml}</{prefix}row>'.encode("utf-8")
+        idx = bisect.bisect_right(trailing, row)
+        pos = tpl.trailing_rows[trailing[idx]][0] if idx < len(trailing) else start
+        splices.append((pos, pos, row, blob))
+    if is_empty:
+        # 展开 <sheetData/>：新行全部落在其中
+        tag = f"{prefix}sheetData".encode()
+        payload = b"".join(blob for *_, blob in sorted(splices, key=lambda x: x[2]))
+        return sheet_xml[:start] + b"<" + tag + b">" + payload + b"</" + tag + b">" + sheet_xml[end:]
+    out: List[bytes] = []
+    pos = 0
+    for splice_start, splice_end, _, blob in sorted(splices, key=lambda x: (x[0], x[2])):
+        out.append(sheet_xml[pos:splice_start])
+        out.append(blob)
+        pos = splice_end
+    out.append(sheet_xml[pos:])
+    return b"".join(out)
+
+
+def _update_dimension(sheet_xml: bytes, last_row: int, max_col: int) -> bytes:
+    m = _DIMENSION_RE.search(sheet_xml)
+    if not m:
+        return sheet_xml
+    ref = m.group(2).decode()
+    first = ref.split(":")[0] or "A1"
+    try:
+        first_col, first_row = _split_ref(first)
+        if ":" in ref:
+            end_col, _ = _split_ref(ref.split(":")[1])
+        else:
+            end_col = first_col
+    except UnsupportedTemplate:
+        return sheet_xml
+    new_ref = f"{_col_letters(first_col)}{first_row}:{_col_letters(max(end_col, max_col))}{last_row}"
+    return sheet_xml[:m.start(2)] + new_ref.encode() + sheet_xml[m.end(2):]
@@ -1,26 +1,121 @@
+import math
 import os
+import threading
 import zipfile
-from typing import Optional
+from collections import Counter
+from typing import Iterable, Optional, Tuple, Union
 
+# 压缩包成员：(来源, 包内文件名)；来源为 bytes 时是内存数据，为 str 时是磁盘文件路径
+ZipMember = Tuple[Union[bytes, str], str]
 
-def make_zip(input_file: str, zip_output_dir: str,
+# 自身已压缩的格式：再做 deflate 几乎没有体积收益，直接存储
+STORED_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".webp", ".gif", ".heic", ".avif",
+    ".mp3", ".mp4", ".mov", ".zip", ".gz", ".7z", ".rar",
+}
+# 始终压缩的格式（xlsx 体积小，deflate 仍能再省少量空间）
+DEFLATED_EXTENSIONS = {".xlsx", ".txt", ".md", ".csv", ".json", ".xml", ".html"}
+
+_PROBE_SIZE = 64 * 1024
+# 采样字节熵（比特/字节）高于该值视为已压缩数据
+_ENTROPY_THRESHOLD = 7.5
+
+
+def _byte_entropy(sample: bytes) -> float:
+    if not sample:
+        return 0.0
+    n = len(sample)
+    return -sum(c / n * math.log2(c / n) for c in Counter(sample).values())
+
+
+def _read_sample(source: Union[bytes, str]) -> bytes:
+    if isinstance(source, bytes):
+        return source[:_PROBE_SIZE]
+    try:
+        with open(source, "rb") as f:
+            return f.read(_PROBE_SIZE)
+    except OSError:
+        return b""
+
+
+def compression_for(arcname: str, source: Union[bytes, str, None] = None,
+                    probe: bool = False) -> int:
+    """按成员类型选择压缩方式：已压缩格式存储，其余 deflate；
+    probe=True 时对未知类型采样计算字节熵，接近随机数据的同样直接存储。"""
+    ext = os.path.splitext(arcname)[1].lower()
+    if ext in STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    if ext in DEFLATED_EXTENSIONS or not probe or source is None:
+        return zipfile.ZIP_DEFLATED
+    if _byte_entropy(_read_sample(source)) >= _ENTROPY_THRESHOLD:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def make_zip(input_file: Optional[str], zip_output_dir: str,
              images_dir: Optional[str] = None,
-             zip_name_suffix: Optional[str] = None) -> str:
+             zip_name_suffix: Optional[str] = None,
+             members: Optional[Iterable[ZipMember]] = None,
+             zip_name: Optional[str] = None,
+             compresslevel: Optional[int] = None,
+             probe_unknown: bool = False) -> str:
+    """打包 Excel（及图片）为 ZIP，返回压缩包路径。
+
+    - input_file：磁盘上的 Excel 路径；Excel 仅在内存中时传 None，并通过 members 提供
+    - members：显式成员列表，内存数据或源文件均直接写入压缩流，无需先复制到临时目录；
+      包内文件名重复时只保留第一个
+    - zip_name：压缩包名（不含 .zip），默认取 input_file 的文件名
+    - compresslevel：deflate 压缩级别（0-9，默认 zlib 的 6）；图片等已压缩格式按原样存储
+    - probe_unknown：对未知扩展名的成员做熵探测，决定存储还是压缩
+    """
     os.makedirs(zip_output_dir, exist_ok=True)
-    base = os.path.basename(input_file)
-    name, _ = os.path.splitext(base)
+    members = list(members or [])
+    if zip_name:
+        name = zip_name
+    elif input_file:
+        name, _ = os.path.splitext(os.path.basename(input_file))
+    elif members:
+        name, _ = os.path.splitext(os.path.basename(members[0][1]))
+    else:
+        raise ValueError("未指定压缩内容")
     # 支持配图版命名：<主题>-配图版.zip
     if zip_name_suffix:
         name = f"{name}-{zip_name_suffix}"
     zip_path = os.path.join(zip_output_dir, f"{name}.zip")
 
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-        # Excel 位于压缩包根目录
-        zf.write(input_file, arcname=os.path.basename(input_file))
-        # 图片与 Excel 同级（根目录），不再放入 images/ 子目录
-        if images_dir and os.path.isdir(images_dir):
-            for root, _, files in os.walk(images_dir):
-                for fname in files:
-                    fpath = os.path.join(root, fname)
-                    zf.write(fpath, arcname=os.path.basename(fpath))
-    return zip_path
\ No newline at end of file
+    # 先写入同目录临时文件再原子替换，避免并发写同名压缩包时产生损坏文件
+    tmp_path = f"{zip_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            def add(source: Union[bytes, str], arcname: str) -> None:
+                ctype = compression_for(arcname, source, probe_unknown)
+                level = compresslevel if ctype == zipfile.ZIP_DEFLATED else None
+                if isinstance(source, bytes):
+                    zf.writestr(arcname, source, compress_type=ctype, compresslevel=level)
+                else:
+                    zf.write(source, arcname=arcname, compress_type=ctype, compresslevel=level)
+
+            # Excel 位于压缩包根目录
+            seen = set()
+            if input_file:
+                seen.add(os.path.basename(input_file))
+                add(input_file, os.path.basename(input_file))
+            for source, arcname in members:
+                if arcname in seen:
+                    continue
+                seen.add(arcname)
+                add(source, arcname)
+            # 图片与 Excel 同级（根目录），不再放入 images/ 子目录
+            if images_dir and os.path.isdir(images_dir):
+                for root, _, files in os.walk(images_dir):
+                    for fname in files:
+                        fpath = os.path.join(root, fname)
+                        add(fpath, os.path.basename(fpath))
+        os.replace(tmp_path, zip_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return zip_path
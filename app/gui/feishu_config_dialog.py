@@ -1,7 +1,6 @@
 from typing import Dict, Optional
 
 import re
-import requests
 from urllib.parse import urlparse, parse_qs
 
 from PyQt5.QtCore import Qt
@@ -11,6 +10,7 @@ from PyQt5.QtWidgets import (
 )
 from app.gui.message_dialog import MessageDialog
 
+from app.core.feishu_client import FeishuClient
 from app.core.utils import save_settings
 from app.core.config_manager import ConfigManager
 
@@ -244,24 +244,21 @@ class FeishuConfigDialog(QDialog):
             if not app_id or not app_secret:
                 raise ValueError("请填写 App ID 和 App Secret")
 
-            # 1) 测试鉴权
-            auth_url = "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
-            resp = requests.post(auth_url, json={"app_id": app_id, "app_secret": app_secret}, timeout=15)
-            data = resp.json()
-            if data.get("code") != 0:
-                raise RuntimeError(f"鉴权失败: {data}")
-            token = data.get("tenant_access_token")
-            if not token:
-                raise RuntimeError("鉴权成功但未返回 token")
+            # 1) 测试鉴权（凭证未变时复用进程内的 token 缓存；新凭证只临时鉴权，不启动后台刷新）
+            client = FeishuClient(dict(self.settings, feishu_app_id=app_id, feishu_app_secret=app_secret))
+            try:
+                token = client.get_tenant_token(register=False)
+            except RuntimeError as e:
+                raise RuntimeError(f"鉴权失败: {e}")
 
             # 2) 测试表访问（若能派生 app_token/table_id）
             derived = self._derive_from_link(link) or {}
             app_token = derived.get("feishu_bitable_app_token", "")
             table_id = derived.get("feishu_bitable_table_id", "")
             if app_token and table_id:
-                fields_url = f"https://open.feishu.cn/open-apis/bitable/v1/apps/{app_token}/tables/{table_id}/fields"
+                fields_url = client.table_url(app_token, table_id, "/fields")
                 headers = {"Authorization": f"Bearer {token}"}
-                f_resp = requests.get(fields_url, headers=headers, timeout=15)
+                f_resp = client.session.get(fields_url, headers=headers, timeout=15)
                 f_data = f_resp.json()
                 if f_data.get("code") != 0:
                     raise RuntimeError(f"表访问失败: {f_data}")
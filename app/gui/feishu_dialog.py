@@ -1,21 +1,178 @@
-from typing import List, Dict, Callable
-import os
-import json
+from typing import List, Dict, Callable, Optional, Set
 import logging
 
-from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal, QAbstractTableModel, QModelIndex, QEvent, QSize
 from PyQt5.QtWidgets import (
-    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem,
-    QWidget, QHeaderView, QApplication, QProgressBar
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableView, QAbstractItemView,
+    QStyledItemDelegate, QStyleOptionButton, QStyle, QHeaderView, QApplication, QProgressBar, QWidget
 )
 from PyQt5.QtGui import QFontMetrics
 
 from app.core.feishu_client import FeishuClient
+from app.core.record_store import RecordStore, get_record_store
+from app.core.feishu_outbox import get_used_outbox
+from app.core.snapshots import write_snapshot
 from app.gui.feishu_config_dialog import FeishuConfigDialog
 from app.core.utils import save_settings
 from app.core.config_manager import ConfigManager
 
 
+class _RecordTableModel(QAbstractTableModel):
+    """飞书记录表格模型：数据只保存一份记录列表，单元格内容在视图绘制可见行时按需生成。"""
+
+    HEADERS = ["ID", "文案预览（去敏感词）", "状态", "更新时间", "操作"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._items: List[Dict] = []
+        # 单行预览文本按需生成并缓存（只有绘制过的行才会生成）
+        self._previews: Dict[int, str] = {}
+        self._used: Set[str] = set()
+        self._fetch_time = ""
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._items)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and 0 <= section < len(self.HEADERS):
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        if not 0 <= row < len(self._items):
+            return None
+        it = self._items[row]
+        if role == Qt.DisplayRole:
+            if col == 0:
+                # 序号ID（1,2,3...）
+                return str(row + 1)
+            if col == 1:
+                # 单行显示，省略号由视图按当前列宽在绘制时处理
+                text = self._previews.get(row)
+                if text is None:
+                    text = str(it.get("content", "")).replace("\r", " ").replace("\n", " ")
+                    self._previews[row] = text
+                return text
+            if col == 2:
+                # 状态：本地记忆“是否已使用”，默认未使用
+                return "已使用" if str(it.get("record_id", "")) in self._used else "未使用"
+            if col == 3:
+                # 更新时间：显示为本次获取时间
+                return self._fetch_time
+            return None
+        if role == Qt.ToolTipRole and col == 1:
+            return str(it.get("content", ""))
+        if role == Qt.TextAlignmentRole and col in (0, 1):
+            return int(Qt.AlignHCenter | Qt.AlignVCenter)
+        if role == Qt.UserRole:
+            # 整条记录，供预览与编辑回调使用
+            return it
+        return None
+
+    def record(self, row: int) -> Optional[Dict]:
+        if 0 <= row < len(self._items):
+            return self._items[row]
+        return None
+
+    def set_items(self, items: List[Dict], used: Set[str], fetch_time: str = ""):
+        self.beginResetModel()
+        self._items = list(items)
+        self._previews = {}
+        self._used = set(used)
+        self._fetch_time = str(fetch_time)
+        self.endResetModel()
+
+    def append_items(self, items: List[Dict], used: Set[str], fetch_time: str = ""):
+        self._used = set(used)
+        self._fetch_time = str(fetch_time)
+        if not items:
+            return
+        base = len(self._items)
+        self.beginInsertRows(QModelIndex(), base, base + len(items) - 1)
+        self._items.extend(items)
+        self.endInsertRows()
+
+    def mark_used(self, row: int):
+        it = self.record(row)
+        if it is None:
+            return
+        self._used.add(str(it.get("record_id", "")))
+        idx = self.index(row, 2)
+        self.dataChanged.emit(idx, idx)
+
+
+class _ButtonDelegate(QStyledItemDelegate):
+    """操作列按钮：直接绘制按钮外观并处理点击，不为每一行创建控件。"""
+
+    clicked = pyqtSignal(int)
+
+    def __init__(self, text: str, parent=None):
+        super().__init__(parent)
+        self._text = text
+        self._pressed_row = -1
+        # 样式模板：按钮外观取自与原内联按钮相同的样式表（不显示）；
+        # 作为视图的子控件随视图一同销毁，没有视图时随委托销毁
+        self._template = QPushButton(text, parent if isinstance(parent, QWidget) else None)
+        self._template.setObjectName("InlineButton")
+        self._template.setStyleSheet("min-height:22px; min-width:66px; padding:2px 6px; font-size:12px;")
+        self._template.hide()
+        if self._template.parent() is None:
+            self.destroyed.connect(self._template.deleteLater)
+
+    @staticmethod
+    def _button_rect(option):
+        size = QSize(min(66, option.rect.width() - 8), min(22, option.rect.height() - 4))
+        return QStyle.alignedRect(option.direction, Qt.AlignCenter, size, option.rect)
+
+    def paint(self, painter, option, index):
+        # 先绘制背景（含选中态），再在单元格中居中绘制按钮
+        super().paint(painter, option, index)
+        opt = QStyleOptionButton()
+        opt.rect = self._button_rect(option)
+        opt.text = self._text
+        opt.fontMetrics = QFontMetrics(self._template.font())
+        opt.state = QStyle.State_Enabled | (
+            QStyle.State_Sunken if index.row() == self._pressed_row else QStyle.State_Raised)
+        style = option.widget.style() if option.widget is not None else QApplication.style()
+        style.drawControl(QStyle.CE_PushButton, opt, painter, self._template)
+
+    def editorEvent(self, event, model, option, index):
+        etype = event.type()
+        if etype not in (QEvent.MouseButtonPress, QEvent.MouseButtonRelease, QEvent.MouseButtonDblClick):
+            return False
+        if event.button() != Qt.LeftButton:
+            return False
+        inside = self._button_rect(option).contains(event.pos())
+        if etype == QEvent.MouseButtonRelease:
+            pressed, self._pressed_row = self._pressed_row, -1
+            self._repaint(index)
+            if inside and pressed == index.row():
+                self.clicked.emit(index.row())
+            return inside
+        if inside:
+            self._pressed_row = index.row()
+            self._repaint(index)
+        return inside
+
+    def _repaint(self, index):
+        view = self.parent()
+        try:
+            view.viewport().update(view.visualRect(index))
+        except Exception:
+            pass
+
+
 class FeishuDialog(QDialog):
     def __init__(self, settings: Dict, on_edit: Callable[[Dict], None], parent=None, settings_path: str = None):
         super().__init__(parent)
@@ -23,6 +180,10 @@ class FeishuDialog(QDialog):
         self.settings = ConfigManager.instance().settings
         self.on_edit = on_edit
         self.settings_path = settings_path
+        # 记录缓存、已使用标记与同步状态保存在本地数据库，不再写入设置文件
+        self.store = get_record_store(self.settings, settings_path)
+        # “已使用”状态由后台队列批量回写飞书，点击不再等待网络
+        self.outbox = get_used_outbox(self.settings, self.store)
         self.setWindowTitle("同步飞书数据")
         # 初始尺寸：优先使用记忆尺寸，其次自适应父窗口比例
         self.resize(760, 520)
@@ -52,6 +213,8 @@ class FeishuDialog(QDialog):
         top = QHBoxLayout()
         self.btn_refresh = QPushButton("刷新")
         self.btn_refresh.setObjectName("InlineButton")
+        self.btn_full_refresh = QPushButton("全量刷新")
+        self.btn_full_refresh.setObjectName("InlineButton")
         self.btn_config = QPushButton("配置")
         self.btn_config.setObjectName("InlineButton")
         self.info = QLabel("准备就绪")
@@ -72,6 +235,7 @@ class FeishuDialog(QDialog):
                 pass
         self.info.mousePressEvent = _copy_info_to_clipboard
         top.addWidget(self.btn_refresh)
+        top.addWidget(self.btn_full_refresh)
         top.addWidget(self.btn_config)
         top.addStretch(1)
         top.addWidget(self.info)
@@ -86,23 +250,30 @@ class FeishuDialog(QDialog):
             self.loading_bar = None
         layout.addLayout(top)
 
-        # 表格
-        self.table = QTableWidget(0, 5)
-        self.table.setHorizontalHeaderLabels(["ID", "文案预览（去敏感词）", "状态", "更新时间", "操作"])
+        # 表格：模型/视图结构，只绘制可见行，大表打开时间与记录数无关
+        self.model = _RecordTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.verticalHeader().setVisible(False)
-        # 控制默认行高，避免操作按钮过大导致表格行溢出
+        # 控制默认行高，固定行高后视图无需逐行计算尺寸
         try:
             self.table.verticalHeader().setDefaultSectionSize(30)
+            self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         except Exception:
             pass
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        # 禁止换行以实现单行显示
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        # 禁止换行以实现单行显示，超出列宽时右侧省略
         try:
             self.table.setWordWrap(False)
+            self.table.setTextElideMode(Qt.ElideRight)
         except Exception:
             pass
-        # 允许用户手动调整列宽，默认内容列自适应填充，其余可调整；若存在记忆列宽则优先应用并全部可调整
+        # 操作列：绘制的“去编辑”按钮
+        self.button_delegate = _ButtonDelegate("去编辑", self.table)
+        self.button_delegate.clicked.connect(self._on_use_clicked)
+        self.table.setItemDelegateForColumn(4, self.button_delegate)
         header = self.table.horizontalHeader()
         header.setStretchLastSection(False)
         try:
@@ -143,8 +314,8 @@ class FeishuDialog(QDialog):
         try:
             self.table.setStyleSheet(
                 "QHeaderView::section{background:#f5f6f8; padding:4px 8px; font-weight:600; color:#333; border-bottom:1px solid #d9d9de;}\n"
-                "QTableWidget{gridline-color:#e5e7eb;}\n"
-                "QTableWidget::item{padding:2px;}\n"
+                "QTableView{gridline-color:#e5e7eb;}\n"
+                "QTableView::item{padding:2px;}\n"
             )
         except Exception:
             pass
@@ -152,7 +323,8 @@ class FeishuDialog(QDialog):
 
         # 底部关闭按钮移除（按需求）
 
-        self.btn_refresh.clicked.connect(self.load_data)
+        self.btn_refresh.clicked.connect(lambda: self.load_data())
+        self.btn_full_refresh.clicked.connect(lambda: self.load_data(full=True))
         self.btn_config.clicked.connect(self.open_config)
 
         # 首次打开异步加载，避免阻塞对话框显示
@@ -179,31 +351,70 @@ class FeishuDialog(QDialog):
             # 兜底直接显示原文本
             self.info.setText(str(text))
 
+    class _Superseded(Exception):
+        """加载线程已被新的加载取代。"""
+
     class _FetchThread(QThread):
-        result_ready = pyqtSignal(list)
+        """后台同步线程。is_current 由界面按加载代号提供：返回 False 表示已被新的加载取代。
+
+        线程与界面不共享锁：界面只递增代号，线程在分页时与写入本地数据库的事务内检查代号，
+        过期的结果直接丢弃，不会覆盖新线程写入的数据。
+        """
+        page_ready = pyqtSignal(list)
+        result_ready = pyqtSignal(list, dict)
         error = pyqtSignal(str)
 
-        def __init__(self, settings: Dict):
+        def __init__(self, settings: Dict, store: RecordStore, is_current: Callable[[], bool],
+                     full: bool = False):
             super().__init__()
             self._settings = settings
+            self._store = store
+            self._is_current = is_current
+            self._full = full
+
+        def _emit_page(self, page: List[Dict]):
+            # 已被新的加载取代：中止分页拉取
+            if not self._is_current():
+                raise FeishuDialog._Superseded()
+            self.page_ready.emit(page)
 
         def run(self):
             try:
                 client = FeishuClient(self._settings)
-                items = client.search_done_records()
-                self.result_ready.emit(items)
+                # 增量同步：只拉取上次同步后变更的记录并与本地缓存合并
+                items, state = client.sync_done_records(
+                    self._store.load_items(),
+                    self._store.get_sync_state(),
+                    full=self._full,
+                    # 全量扫描时逐页发出，界面拿到第一页即可显示与点击
+                    on_page=self._emit_page,
+                )
+                if not self._store.replace_items(items, state, precondition=self._is_current):
+                    return
+                self.result_ready.emit(items, state)
+            except FeishuDialog._Superseded:
+                pass
             except Exception as e:
-                self.error.emit(str(e))
+                if self._is_current():
+                    self.error.emit(str(e))
 
-    def load_data(self):
+    def load_data(self, full: bool = False):
+        """加载记录：默认增量同步；full=True（“全量刷新”）时重新扫描整表。"""
         self._set_info("加载中...")
+        # 每次加载递增代号：旧线程迟到的信号直接忽略
+        self._load_gen = getattr(self, "_load_gen", 0) + 1
+        gen = self._load_gen
         # 先尝试使用缓存填充，提升首屏体验
+        has_cache = False
         try:
-            cached = self.settings.get("feishu_cached_items")
+            cached = self.store.load_items()
             if isinstance(cached, list) and cached:
                 self._fill_table(cached)
+                has_cache = True
         except Exception:
             pass
+        # 流式显示：无缓存或全量刷新时，分页到达即追加；已显示缓存的增量刷新等待最终结果
+        stream = {"enabled": full or not has_cache, "started": False, "count": 0}
         # 显示加载指示器
         try:
             if getattr(self, "loading_bar", None):
@@ -212,46 +423,48 @@ class FeishuDialog(QDialog):
             pass
         # 启动后台线程加载，避免 UI 卡顿
         try:
-            # 如有旧线程，尝试停止
-            if getattr(self, "_fetch_thread", None):
-                try:
-                    self._fetch_thread.quit()
-                    self._fetch_thread.wait(100)
-                except Exception:
-                    pass
-            self._fetch_thread = self._FetchThread(self.settings)
+            # 如有旧线程：代号已递增，它会自行停止分页并丢弃结果；保留引用直到其结束
+            old = getattr(self, "_fetch_thread", None)
+            if old is not None and old.isRunning():
+                self._stale_threads = [t for t in getattr(self, "_stale_threads", []) if t.isRunning()]
+                self._stale_threads.append(old)
+            self._fetch_thread = self._FetchThread(self.settings, self.store, lambda: gen == self._load_gen,
+                                                   full=bool(full))
             # 记录启动时间
             import datetime as _dt
             self._fetch_time_str = _dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-            def _on_result(items: List[Dict]):
+            def _on_page(page: List[Dict]):
+                if gen != self._load_gen or not stream["enabled"]:
+                    return
                 try:
-                    self._fill_table(items)
-                    # 写入缓存供下次快速显示
-                    try:
-                        self.settings["feishu_cached_items"] = items
-                        if self.settings_path:
-                            try:
-                                ConfigManager.instance().save()
-                            except Exception:
-                                save_settings(self.settings_path, self.settings)
-                    except Exception:
-                        pass
-                    # —— 调试输出：记录刷新获取到的数据 ——
+                    if not stream["started"]:
+                        stream["started"] = True
+                        self.model.set_items([], self._used_ids(), getattr(self, "_fetch_time_str", ""))
+                    self._append_rows(page)
+                    stream["count"] += len(page)
+                    self._set_info(f"已加载 {stream['count']} 条...")
+                except Exception:
+                    pass
+
+            def _on_result(items: List[Dict], state: Dict):
+                if gen != self._load_gen:
+                    return
+                try:
+                    # 已流式显示全部记录时无需重建表格，保留用户的选中与滚动位置
+                    if not (stream["started"] and stream["count"] == len(items)):
+                        self._fill_table(items)
+                    # 同步结果已由后台线程写入本地数据库
+                    # —— 调试输出：记录刷新获取到的数据（快照由后台线程压缩写入） ——
                     try:
                         logger = logging.getLogger("xhs_tool")
                         logger.info("[FeishuDialog] 刷新获取到 %d 条记录", len(items))
-                        try:
-                            if logger.isEnabledFor(logging.DEBUG):
-                                logger.debug("[FeishuDialog] items=%s", json.dumps(items, ensure_ascii=False))
-                        except Exception:
-                            pass
-                        log_dir = self.settings.get("log_dir", "logs") or "logs"
-                        os.makedirs(log_dir, exist_ok=True)
-                        snapshot_path = os.path.join(log_dir, "feishu_refresh_latest.json")
-                        with open(snapshot_path, 'w', encoding='utf-8') as f:
-                            json.dump(items, f, ensure_ascii=False, indent=2)
-                        self._set_info(f"共 {len(items)} 条 | 快照: {os.path.abspath(snapshot_path)}")
+                        snapshot_path = write_snapshot(self.settings, "feishu_refresh_latest", items, len(items),
+                                                       force=bool(full))
+                        if snapshot_path:
+                            self._set_info(f"共 {len(items)} 条 | 快照: {snapshot_path}")
+                        else:
+                            self._set_info(f"共 {len(items)} 条")
                     except Exception:
                         self._set_info(f"共 {len(items)} 条")
                 finally:
@@ -262,6 +475,8 @@ class FeishuDialog(QDialog):
                         pass
 
             def _on_error(err: str):
+                if gen != self._load_gen:
+                    return
                 self._set_info(f"错误: {err}")
                 try:
                     if getattr(self, "loading_bar", None):
@@ -269,6 +484,7 @@ class FeishuDialog(QDialog):
                 except Exception:
                     pass
 
+            self._fetch_thread.page_ready.connect(_on_page)
             self._fetch_thread.result_ready.connect(_on_result)
             self._fetch_thread.error.connect(_on_error)
             self._fetch_thread.start()
@@ -287,191 +503,79 @@ class FeishuDialog(QDialog):
             self.load_data()
 
     def _fill_table(self, items: List[Dict]):
-        self.table.setRowCount(0)
-        # 读取本地已使用记录ID集合（持久化在 settings）
+        self.model.set_items(items, self._used_ids(), getattr(self, "_fetch_time_str", ""))
+        self._select_first_row()
+
+    def _append_rows(self, items: List[Dict]):
+        """在表格末尾追加记录行：不重置已有行、选中项与列宽，供分页流式显示使用。"""
+        base = self.model.rowCount()
+        self.model.append_items(items, self._used_ids(), getattr(self, "_fetch_time_str", ""))
+        # 默认选中第一行（仅首批数据，后续追加不改变选中项）
+        if items and base == 0:
+            self._select_first_row()
+
+    def _used_ids(self):
+        # 读取本地已使用记录ID集合（持久化在本地数据库）
         try:
-            used_records = set(self.settings.get("feishu_used_records", []))
+            return self.store.used_ids()
         except Exception:
-            used_records = set()
-        for i, it in enumerate(items):
-            self.table.insertRow(i)
-            # 序号ID（1,2,3...）
-            id_item = QTableWidgetItem(str(i + 1))
-            try:
-                id_item.setTextAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
-            except Exception:
-                pass
-            self.table.setItem(i, 0, id_item)
-            # 文案预览：设置 tooltip 显示完整内容；初次渲染保证不为空
-            content_text = str(it.get("content", ""))
-            single_line = content_text.replace("\r", " ").replace("\n", " ")
-            # 单行省略显示：根据当前列宽截断文本；若列宽尚未就绪，则回退为完整单行文本
-            try:
-                fm = QFontMetrics(self.table.font())
-                col_w = int(self.table.columnWidth(1)) - 16
-                if col_w <= 20:
-                    display_text = single_line
-                else:
-                    display_text = fm.elidedText(single_line, Qt.ElideRight, col_w)
-            except Exception:
-                display_text = single_line
-            content_item = QTableWidgetItem(display_text)
-            try:
-                # 显示内容居中
-                content_item.setTextAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
-            except Exception:
-                pass
-            content_item.setToolTip(content_text)
-            # 存储整条记录以便预览与编辑回调使用
-            try:
-                content_item.setData(Qt.UserRole, it)
-            except Exception:
-                pass
-            self.table.setItem(i, 1, content_item)
-            # 状态：本地记忆“是否已使用”，默认未使用
-            rid = str(it.get("record_id", ""))
-            status_text = "已使用" if rid in used_records else "未使用"
-            self.table.setItem(i, 2, QTableWidgetItem(status_text))
-            # 更新时间：显示为本次获取时间
-            fetch_ts = getattr(self, "_fetch_time_str", "")
-            self.table.setItem(i, 3, QTableWidgetItem(str(fetch_ts)))
-
-            # 操作列
-            cell = QWidget()
-            h = QHBoxLayout(cell)
-            h.setContentsMargins(4, 2, 4, 2)
-            try:
-                h.setSpacing(4)
-                # 操作按钮居中且保留边距，不填满单元格
-                h.setAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
-            except Exception:
-                pass
-            btn = QPushButton("去编辑")
-            btn.setObjectName("InlineButton")
-            # 缩小按钮尺寸，避免溢出单元格
-            try:
-                btn.setFixedHeight(22)
-                btn.setFixedWidth(66)
-                # 局部样式覆盖全局 InlineButton 的最小尺寸和内边距
-                btn.setStyleSheet("min-height:22px; min-width:66px; padding:2px 6px; font-size:12px;")
-            except Exception:
-                pass
-            def make_cb(payload: Dict, row_index: int):
-                def _cb():
-                    # 本地标记为已使用并持久化，避免刷新后状态复原
-                    try:
-                        rid_local = str(payload.get("record_id", ""))
-                        if rid_local:
-                            used_records.add(rid_local)
-                            try:
-                                self.table.setItem(row_index, 2, QTableWidgetItem("已使用"))
-                            except Exception:
-                                pass
-                            self.settings["feishu_used_records"] = sorted(list(used_records))
-                            if self.settings_path:
-                                try:
-                                    ConfigManager.instance().save()
-                                except Exception:
-                                    save_settings(self.settings_path, self.settings)
-                    except Exception:
-                        # 本地标记失败不影响后续流程
-                        pass
-                    # 先尝试标记“已使用”，失败也不阻塞后续流程
-                    try:
-                        client = FeishuClient(self.settings)
-                        try:
-                            client.mark_record_as_used(payload)
-                        except Exception:
-                            # 忽略网络或权限错误
-                            pass
-                    except Exception:
-                        # 构造客户端失败也不影响文案注入
-                        pass
-                    # 始终注入文案到主窗口编辑框
-                    try:
-                        self.on_edit(payload)
-                    except Exception:
-                        pass
-                    # 关闭对话框
-                    try:
-                        self.accept()
-                    except Exception:
-                        pass
-                    # 尝试切换焦点到主窗口与编辑框（无论是否关闭成功）
-                    try:
-                        parent = self.parent()
-                        if parent is not None:
-                            try:
-                                parent.activateWindow()
-                                parent.raise_()
-                                parent.setFocus()
-                                try:
-                                    ti = getattr(parent, "text_input", None)
-                                    if ti is not None:
-                                        ti.setFocus()
-                                except Exception:
-                                    pass
-                            except Exception:
-                                pass
-                    except Exception:
-                        pass
-                return _cb
-            btn.clicked.connect(make_cb(it, i))
-            try:
-                h.addWidget(btn)
-            except Exception:
-                h.addWidget(btn)
-            # 不再添加伸缩项，保持按钮在单元格中居中显示
-            self.table.setCellWidget(i, 4, cell)
+            return set()
 
-        # 默认选中第一行
+    def _select_first_row(self):
         try:
-            if items:
-                self.table.setCurrentCell(0, 1)
+            if self.model.rowCount() > 0:
+                self.table.setCurrentIndex(self.model.index(0, 1))
         except Exception:
             pass
-        # 根据最终列宽刷新省略显示
+
+    def _on_use_clicked(self, row: int):
+        payload = self.model.record(row)
+        if payload is None:
+            return
+        # 本地标记为已使用并持久化，避免刷新后状态复原；飞书状态加入回写队列，由后台线程提交
+        try:
+            rid_local = str(payload.get("record_id", ""))
+            if rid_local:
+                self.model.mark_used(row)
+                self.store.mark_used(rid_local)
+                self.outbox.enqueue(rid_local)
+        except Exception:
+            # 本地标记失败不影响后续流程
+            logging.getLogger("xhs_tool").exception("[FeishuDialog] 标记已使用失败")
+        # 始终注入文案到主窗口编辑框
         try:
-            # 布局完成后刷新一次，保证省略效果与列宽一致
-            QTimer.singleShot(0, self._update_content_ellipses)
+            self.on_edit(payload)
         except Exception:
             pass
-    def _on_section_resized(self, logical_index: int, old_size: int, new_size: int):
+        # 关闭对话框
         try:
-            self._snapshot_widths()
+            self.accept()
         except Exception:
             pass
-        # 内容列宽变化时刷新省略显示
+        # 尝试切换焦点到主窗口与编辑框（无论是否关闭成功）
         try:
-            if logical_index == 1:
-                self._update_content_ellipses()
+            parent = self.parent()
+            if parent is not None:
+                parent.activateWindow()
+                parent.raise_()
+                parent.setFocus()
+                ti = getattr(parent, "text_input", None)
+                if ti is not None:
+                    ti.setFocus()
         except Exception:
             pass
 
-    def _snapshot_widths(self):
+    def _on_section_resized(self, logical_index: int, old_size: int, new_size: int):
+        # 省略显示由视图在绘制可见行时完成，这里只记录列宽
         try:
-            widths = [self.table.columnWidth(i) for i in range(5)]
-            self.settings["feishu_dialog_table_widths"] = widths
+            self._snapshot_widths()
         except Exception:
             pass
 
-    def _update_content_ellipses(self):
+    def _snapshot_widths(self):
         try:
-            fm = QFontMetrics(self.table.font())
-            col_w = max(0, self.table.columnWidth(1) - 16)
-            rows = self.table.rowCount()
-            for r in range(rows):
-                item = self.table.item(r, 1)
-                if not item:
-                    continue
-                payload = item.data(Qt.UserRole)
-                if isinstance(payload, dict):
-                    full = str(payload.get("content", ""))
-                else:
-                    full = item.toolTip() or item.text()
-                display_text = fm.elidedText(full.replace("\r", " ").replace("\n", " "), Qt.ElideRight, col_w)
-                item.setText(display_text)
-                item.setToolTip(full)
+            widths = [self.table.columnWidth(i) for i in range(5)]
+            self.settings["feishu_dialog_table_widths"] = widths
         except Exception:
             pass
 
@@ -10,6 +10,7 @@ from PyQt5.QtWidgets import (
 
 from app.core.utils import save_settings
 from app.core.config_manager import ConfigManager
+from app.core.tracing import span, traced
 
 
 class ImageDialog(QDialog):
@@ -657,10 +658,9 @@ class ImageDialog(QDialog):
         """写入有图模板并压缩：Excel与图片在压缩包同级。"""
         try:
             # 组装写入参数
-            from app.core.excel_writer import write_to_template
-            from app.core.zipper import make_zip
+            from app.core.pipeline import export_zip
             from app.gui.message_dialog import MessageDialog
-            import os, shutil, tempfile
+            import os
 
             # 标题从父窗口的 last_title 或者用首行标题
             title = getattr(self.parent(), 'last_title', None) or (self.points[0][0] if self.points else '输出')
@@ -685,50 +685,17 @@ class ImageDialog(QDialog):
                 MessageDialog.error(self, '错误', f'图片文件名（不含后缀）重复：{", ".join(dups)}\n请修改后再试')
                 return
 
-            # 写入 Excel（图片列：图片_1）
-            out_xlsx = write_to_template(
+            # 写入 Excel（图片列：图片_1），图片从缓存路径直接打包（与Excel同级写入到zip根目录）
+            zip_path = export_zip(
+                self.settings,
+                title,
+                self.points,
                 template_path=template_path,
                 output_dir=output_dir,
-                title=title,
-                points=self.points,
-                column_map={
-                    'page_column': self.settings.get('page_column', '页面'),
-                    'point_title_column': self.settings.get('point_title_column', '文本_1'),
-                    'point_content_column': self.settings.get('point_content_column', '文本_2'),
-                    'extra_text_column': self.settings.get('extra_text_column', '文本_3'),
-                    'extra_text_default': self.settings.get('extra_text_default', '内容仅供参考，身体不适请及时就医!'),
-                    'image_column': self.settings.get('image_column', '图片_1')
-                },
-                images=self.local_images
+                images=self.local_images,
+                zip_name_suffix='配图版'
             )
 
-            # 将本地图片复制到临时目录以便打包（与Excel同级写入到zip根目录）
-            tmp_images_dir = None
-            if any(self.local_images):
-                tmp_images_dir = tempfile.mkdtemp(prefix='images_')
-                for p in filter(None, self.local_images):
-                    try:
-                        shutil.copy(p, os.path.join(tmp_images_dir, os.path.basename(p)))
-                    except Exception:
-                        pass
-
-            # 生成配图版 ZIP
-            zip_path = make_zip(out_xlsx, output_dir, images_dir=tmp_images_dir, zip_name_suffix='配图版')
-
-            # 根据设置删除Excel，仅保留zip
-            if self.settings.get('delete_excel_after_zip', True):
-                try:
-                    os.remove(out_xlsx)
-                except Exception:
-                    pass
-
-            # 清理临时目录
-            if tmp_images_dir and os.path.isdir(tmp_images_dir):
-                try:
-                    shutil.rmtree(tmp_images_dir)
-                except Exception:
-                    pass
-
             MessageDialog.info(self, '完成', f'已生成配图版压缩包：\n{zip_path}')
             self._info(f"完成：压缩包已生成 → {os.path.basename(zip_path)}")
         except Exception as e:
@@ -935,10 +902,13 @@ class ImageDialog(QDialog):
                     try:
                         from rembg import remove  # type: ignore
                         from PIL import Image
-                        im = Image.open(img_path).convert('RGBA')
-                        im_out = remove(im)
+                        with span("image.decode", cat="image"):
+                            im = Image.open(img_path).convert('RGBA')
+                        with span("rembg", cat="image", size=f"{im.width}x{im.height}"):
+                            im_out = remove(im)
                         out_path = self._derived_path(img_path, suffix='_nobg')
-                        im_out.save(out_path)
+                        with span("image.encode", cat="image"):
+                            im_out.save(out_path)
                         return out_path
                     except Exception:
                         # 回退到简单白底抠图
@@ -998,6 +968,7 @@ class ImageDialog(QDialog):
 
         # 后台执行，不阻塞主线程
 
+    @traced("image.remove_bg", cat="image")
     def _simple_remove_bg(self, img_path: str) -> Optional[str]:
         """将近白色背景置为透明的简易抠图。"""
         try:
@@ -1066,18 +1037,19 @@ class ImageDialog(QDialog):
             if source == "pixabay" and api_key:
                 # Pixabay: https://pixabay.com/api/?key=KEY&q=QUERY&image_type=photo&orientation=horizontal&per_page=10&safesearch=true
                 try:
-                    resp = requests.get(
-                        "https://pixabay.com/api/",
-                        params={
-                            "key": api_key,
-                            "q": q,
-                            "image_type": "photo",
-                            "orientation": "horizontal",
-                            "safesearch": "true",
-                            "per_page": 5,
-                        },
-                        timeout=12,
-                    )
+                    with span("image.search", cat="image", source="pixabay"):
+                        resp = requests.get(
+                            "https://pixabay.com/api/",
+                            params={
+                                "key": api_key,
+                                "q": q,
+                                "image_type": "photo",
+                                "orientation": "horizontal",
+                                "safesearch": "true",
+                                "per_page": 5,
+                            },
+                            timeout=12,
+                        )
                     if resp.ok:
                         data = resp.json()
                         hits = data.get("hits") or []
@@ -1090,12 +1062,13 @@ class ImageDialog(QDialog):
             elif source == "pexels" and api_key:
                 # Pexels: GET https://api.pexels.com/v1/search?query=QUERY&per_page=1  (Header: Authorization)
                 try:
-                    resp = requests.get(
-                        "https://api.pexels.com/v1/search",
-                        params={"query": q, "per_page": 5},
-                        headers={"Authorization": api_key},
-                        timeout=12,
-                    )
+                    with span("image.search", cat="image", source="pexels"):
+                        resp = requests.get(
+                            "https://api.pexels.com/v1/search",
+                            params={"query": q, "per_page": 5},
+                            headers={"Authorization": api_key},
+                            timeout=12,
+                        )
                     if resp.ok:
                         data = resp.json()
                         photos = data.get("photos") or []
@@ -1112,23 +1085,26 @@ class ImageDialog(QDialog):
 
             # 下载图片并统一保存为配置的格式（失败则回退占位图）
             try:
-                r = requests.get(img_url, headers={"Accept": "image/*"}, timeout=(5, 15))
-                r.raise_for_status()
-                data = r.content
-            except Exception:
-                try:
-                    r = requests.get(_fallback_url(), headers={"Accept": "image/*"}, timeout=(5, 12))
+                with span("image.download", cat="image", source=source):
+                    r = requests.get(img_url, headers={"Accept": "image/*"}, timeout=(5, 15))
                     r.raise_for_status()
                     data = r.content
+            except Exception:
+                try:
+                    with span("image.download", cat="image", source="picsum"):
+                        r = requests.get(_fallback_url(), headers={"Accept": "image/*"}, timeout=(5, 12))
+                        r.raise_for_status()
+                        data = r.content
                 except Exception:
                     return None
-            img = Image.open(io.BytesIO(data))
-            # 可选：统一尺寸
-            try:
-                img = img.convert("RGBA") if img.mode in ("P", "LA") else img.convert("RGB")
-                img = img.resize((dw, dh))
-            except Exception:
-                pass
+            with span("image.decode", cat="image", bytes=len(data)):
+                img = Image.open(io.BytesIO(data))
+                # 可选：统一尺寸
+                try:
+                    img = img.convert("RGBA") if img.mode in ("P", "LA") else img.convert("RGB")
+                    img = img.resize((dw, dh))
+                except Exception:
+                    pass
 
             out_dir = self.settings.get('zip_output_dir', 'output')
             # 使用绝对路径，避免因工作目录变化导致 QPixmap 无法读取
@@ -1146,13 +1122,14 @@ class ImageDialog(QDialog):
                 fpath = os.path.abspath(fpath)
             except Exception:
                 pass
-            try:
-                img.save(fpath)
-            except Exception:
-                # 如果保存失败，回退为 PNG
-                base, _ = os.path.splitext(fpath)
-                fpath = f"{base}.png"
-                img.save(fpath)
+            with span("image.encode", cat="image", format=fmt.lower()):
+                try:
+                    img.save(fpath)
+                except Exception:
+                    # 如果保存失败，回退为 PNG
+                    base, _ = os.path.splitext(fpath)
+                    fpath = f"{base}.png"
+                    img.save(fpath)
             self.local_images[row] = fpath
             return fpath
         except Exception:
@@ -1284,7 +1261,8 @@ class ImageDialog(QDialog):
                 try:
                     from PIL import Image
                     is_nobg = ("_nobg" in img_path)
-                    im = Image.open(img_path).convert('RGBA')
+                    with span("image.decode", cat="image"):
+                        im = Image.open(img_path).convert('RGBA')
                     alpha = im.split()[3]
                     has_transparency = alpha.getextrema()[0] < 255
                     if is_nobg or has_transparency:
@@ -1351,6 +1329,7 @@ class ImageDialog(QDialog):
         except Exception:
             self._info("裁剪过程中出现错误")
 
+    @traced("image.crop", cat="image")
     def _crop_to_content(self, im, src_path: str) -> Optional[str]:
         """基于透明像素的内容边缘裁剪。"""
         try:
@@ -1366,6 +1345,7 @@ class ImageDialog(QDialog):
         except Exception:
             return None
 
+    @traced("image.crop", cat="image")
     def _resize_or_pad_to_size(self, im, src_path: str, dst_size: Tuple[int, int], mode: str, bg_color: str) -> Optional[str]:
         """按 cover/contain 逻辑生成目标尺寸图。"""
         try:
@@ -6,11 +6,14 @@ from PyQt5.QtWidgets import (
     QAction, QLabel, QHBoxLayout, QSizePolicy
 )
 
-from app.core.logger import setup_logger
-from app.core.punctuation import normalize_punctuation
-from app.core.parser import extract_title_and_points, format_paragraphs, render_processed_template, parse_processed_template, configure_tail_filter
-from app.core.excel_writer import write_to_template
-from app.core.zipper import make_zip
+from app.core.logger import configure_logging
+from app.core.tracing import configure_tracing, span
+from app.core.parser import extract_title_and_points, render_processed_template, parse_processed_template, configure_tail_filter
+from app.core.pipeline import format_points, export_zip
+from app.core.sensitive import configure_sensitive_filter
+from app.core.record_store import get_record_store
+from app.core.feishu_outbox import get_used_outbox
+from app.core.excel_writer import output_filename
 from app.core.utils import load_settings, save_settings
 from app.core.config_manager import ConfigManager
 from app.gui.settings_dialog import SettingsDialog
@@ -31,7 +34,16 @@ class MainWindow(QMainWindow):
         # 应用尾段过滤配置
         configure_tail_filter(self.settings)
 
-        self.logger = setup_logger(self.settings.get("log_dir", "logs"), self.settings.get("log_level", "INFO"))
+        self.logger = configure_logging(self.settings)
+        configure_tracing(self.settings)
+        # 加载去敏感词词典（默认关闭；词典编译结果缓存在磁盘）
+        self._configure_sensitive_filter(self.settings)
+        # 仅在相关设置变化时重新编译尾段关键词与敏感词词典
+        cfg = ConfigManager.instance()
+        cfg.subscribe(configure_tail_filter, keys=["tail_*", "cta_keywords"])
+        cfg.subscribe(self._configure_sensitive_filter, keys=["sensitive_*"])
+        cfg.subscribe(configure_logging, keys=["log_*"])
+        cfg.subscribe(configure_tracing, keys=["trace_*"])
 
         central = QWidget()
         layout = QVBoxLayout()
@@ -95,31 +107,38 @@ class MainWindow(QMainWindow):
         # 启动后预取飞书数据到缓存，提升打开同步页面体验
         try:
             class _PrefetchThread(QThread):
-                result_ready = pyqtSignal(list)
+                result_ready = pyqtSignal(list, dict)
                 error = pyqtSignal(str)
 
-                def __init__(self, settings: dict):
+                def __init__(self, settings: dict, store):
                     super().__init__()
                     self._settings = settings
+                    self._store = store
 
                 def run(self):
                     try:
                         from app.core.feishu_client import FeishuClient
                         client = FeishuClient(self._settings)
-                        items = client.search_done_records()
-                        self.result_ready.emit(items)
+                        # 启动预取同样走增量同步，缓存未过期时只需一次小请求
+                        items, state = client.sync_done_records(
+                            self._store.load_items(),
+                            self._store.get_sync_state(),
+                        )
+                        self._store.replace_items(items, state)
+                        self.result_ready.emit(items, state)
                     except Exception as e:
                         self.error.emit(str(e))
 
             def _start_prefetch():
                 try:
+                    store = get_record_store(self.settings, self.settings_path)
+                    # 启动状态回写队列：继续提交上次运行未完成的“已使用”标记
+                    get_used_outbox(self.settings, store)
                     # 保持引用在实例上，避免被GC
-                    self._prefetch_thread = _PrefetchThread(self.settings)
+                    self._prefetch_thread = _PrefetchThread(self.settings, store)
 
-                    def _on_ok(items: list):
+                    def _on_ok(items: list, state: dict):
                         try:
-                            self.settings["feishu_cached_items"] = items
-                            save_settings(self.settings_path, self.settings)
                             self.status_label.setText(f"已预取飞书数据：{len(items)} 条")
                         except Exception:
                             pass
@@ -159,13 +178,20 @@ class MainWindow(QMainWindow):
             updated = dlg.get_settings()
             self.settings.update(updated)
             try:
+                # 尾段过滤与去敏感词配置由订阅回调按变化的键更新
                 ConfigManager.instance().save()
             except Exception:
                 save_settings(self.settings_path, self.settings)
-            # 更新解析器配置
-            configure_tail_filter(self.settings)
+                configure_tail_filter(self.settings)
+                self._configure_sensitive_filter(self.settings)
             self.logger.info("设置已更新: %s", updated)
 
+    def _configure_sensitive_filter(self, settings: dict):
+        try:
+            configure_sensitive_filter(settings)
+        except Exception as e:
+            self.logger.warning("加载敏感词词典失败: %s", e)
+
     def open_about(self):
         contact_url = self.settings.get("contact_url", "")
         dlg = AboutDialog(self.settings.get("about_text", ""), contact_url, self)
@@ -201,13 +227,15 @@ class MainWindow(QMainWindow):
             self.logger.info("开始处理文案")
 
             # 固定逻辑：始终避免嵌套，且尾段过滤按解析器内置开关启用
-            already_pairs = parse_processed_template(raw)
+            with span("parse"):
+                already_pairs = parse_processed_template(raw)
+                if not already_pairs:
+                    title, points = extract_title_and_points(raw)
             if already_pairs:
                 self.logger.info("检测到已处理模板，执行去嵌套的重新排版。分论点数: %d", len(already_pairs))
                 points = already_pairs
                 title = getattr(self, "last_title", "")
             else:
-                title, points = extract_title_and_points(raw)
                 self.logger.info("解析标题: %s, 分论点数: %d", title, len(points))
                 # 记忆标题（用于命名与再次处理场景）
                 self.last_title = title
@@ -217,18 +245,8 @@ class MainWindow(QMainWindow):
             # 上述分支已完成解析，这里不重复解析
             # 解析完成，开始规范化与排版
             # 标点与排版（再次处理也只对内容做规整，模板不嵌套）
-            formatted_points = []
-            for pt_title, pt_content in points:
-                norm_title = normalize_punctuation(pt_title)
-                norm_content = normalize_punctuation(pt_content)
-                fmt_content = format_paragraphs(
-                    norm_content,
-                    # 不限制行数：避免删除文案内容
-                    max_lines=self.settings.get("max_lines_per_paragraph", 0),
-                    # 取消按字符折行：设置为0表示不做字符切分，仅按句号分行
-                    max_chars=self.settings.get("max_chars_per_line", 0)
-                )
-                formatted_points.append((norm_title, fmt_content))
+            # 不限制行数、不按字符折行（由设置决定），仅按句号分行
+            formatted_points = format_points(points, self.settings)
 
             # 渲染处理模板并显示供用户微调
             processed = render_processed_template(formatted_points)
@@ -256,57 +274,26 @@ class MainWindow(QMainWindow):
                 # 未有标题：从当前文本尝试提取一次标题用于命名
                 tmp_title, _ = extract_title_and_points(processed_text)
                 self.last_title = tmp_title or self.last_title or "输出"
-            pairs = parse_processed_template(processed_text)
+            with span("parse"):
+                pairs = parse_processed_template(processed_text)
             # 若不是处理模板或解析为空，自动执行一次处理流程（随时可用）
             if not pairs:
                 self.logger.info("当前内容非处理模板或为空，自动执行处理流程以写入")
-                title, points = extract_title_and_points(processed_text)
+                with span("parse"):
+                    title, points = extract_title_and_points(processed_text)
                 self.last_title = title or self.last_title or "输出"
                 # 做与处理流程一致的排版规整
-                formatted_points = []
-                for pt_title, pt_content in points:
-                    norm_title = normalize_punctuation(pt_title)
-                    norm_content = normalize_punctuation(pt_content)
-                    fmt_content = format_paragraphs(
-                        norm_content,
-                        max_lines=self.settings.get("max_lines_per_paragraph", 0),
-                        max_chars=self.settings.get("max_chars_per_line", 0)
-                    )
-                    formatted_points.append((norm_title, fmt_content))
-                pairs = formatted_points
+                pairs = format_points(points, self.settings)
             # 更新当前主题（写入前确保同步显示）
             self.theme_label.setText(f"当前主题：{self.last_title}")
             self.logger.info("处理模板解析出分论点: %d", len(pairs))
 
-            # 写入 Excel（移除标题列，使用页面/文本_1/文本_2）
-            out_xlsx = write_to_template(
-                template_path=self.settings.get("template_excel_path"),
-                output_dir=self.settings.get("zip_output_dir", "output"),
-                title=self.last_title or "",
-                points=pairs,
-                column_map={
-                    "page_column": self.settings.get("page_column", "页面"),
-                    "point_title_column": self.settings.get("point_title_column", "文本_1"),
-                    "point_content_column": self.settings.get("point_content_column", "文本_2"),
-                    # 新增：文本_3列与默认内容
-                    "extra_text_column": self.settings.get("extra_text_column", "文本_3"),
-                    "extra_text_default": self.settings.get("extra_text_default", "内容仅供参考，身体不适请及时就医!"),
-                    "image_column": self.settings.get("image_column", "图片_1")
-                }
-            )
-            self.logger.info("已生成Excel: %s", out_xlsx)
-
-            # 生成 ZIP
-            zip_path = make_zip(out_xlsx, self.settings.get("zip_output_dir", "output"))
+            # 写入 Excel（移除标题列，使用页面/文本_1/文本_2）并生成 ZIP：Excel 在内存中直接写入压缩包
+            zip_path = export_zip(self.settings, self.last_title or "", pairs)
             self.logger.info("已生成ZIP: %s", zip_path)
-
-            # 根据设置删除Excel，仅保留zip
-            if self.settings.get("delete_excel_after_zip", True):
-                try:
-                    os.remove(out_xlsx)
-                    self.logger.info("已删除Excel，仅保留zip")
-                except Exception as de:
-                    self.logger.warning("删除Excel失败: %s", de)
+            if not self.settings.get("delete_excel_after_zip", True):
+                self.logger.info("已保留Excel: %s", os.path.join(
+                    self.settings.get("zip_output_dir", "output"), output_filename(self.last_title or "")))
 
             MessageDialog.info(self, "完成", f"已生成压缩包：\n{zip_path}")
             self.status_label.setText(f"完成：压缩包已生成 → {os.path.basename(zip_path)}")
@@ -338,17 +325,7 @@ class MainWindow(QMainWindow):
                 # 回退：按原文解析并做与处理流程一致的规整
                 title, points = extract_title_and_points(processed_text)
                 self.last_title = title or self.last_title or "输出"
-                formatted_points = []
-                for pt_title, pt_content in points:
-                    norm_title = normalize_punctuation(pt_title)
-                    norm_content = normalize_punctuation(pt_content)
-                    fmt_content = format_paragraphs(
-                        norm_content,
-                        max_lines=self.settings.get("max_lines_per_paragraph", 0),
-                        max_chars=self.settings.get("max_chars_per_line", 0)
-                    )
-                    formatted_points.append((norm_title, fmt_content))
-                pairs = formatted_points
+                pairs = format_points(points, self.settings)
             # 打开配图页面
             dlg = ImageDialog(self.settings, pairs, self.settings_path, self)
             dlg.exec_()
@@ -0,0 +1,146 @@
+"""FeishuClient 压测：在本地模拟服务上测量整表搜索与状态回写的吞吐与延迟分位数。
+
+运行（仓库根目录）：
+    python benchmarks/bench_feishu_client.py [--sizes 1K,10K,100K] [--page-size 500]
+        [--latency 0.02] [--jitter 0] [--error-rate 0] [--repeat 3] [--marks 200]
+
+- search：search_done_records 整表拉取“已完成”记录（含分页、解码与调试快照写入）
+- mark：逐条 mark_record_as_used（PATCH）与一次 mark_records_as_used（batch_update）
+- 请求级延迟在客户端侧统计（含重试与退避），按接口分别给出 p50/p90/p99
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.feishu_client import FeishuClient, clear_schema_cache  # noqa: E402
+from benchmarks.feishu_stub_server import FeishuStubServer, StubBitable  # noqa: E402
+
+
+class TimedClient(FeishuClient):
+    """按接口记录每次 _request 耗时的客户端。"""
+
+    def __init__(self, settings: Dict, samples: Dict[str, List[float]]):
+        super().__init__(settings)
+        self.samples = samples
+
+    def _request(self, method: str, url: str, timeout: float = 15, **kwargs) -> Dict:
+        t0 = time.perf_counter()
+        try:
+            return super()._request(method, url, timeout=timeout, **kwargs)
+        finally:
+            self.samples[endpoint_name(method, url)].append(time.perf_counter() - t0)
+
+
+def endpoint_name(method: str, url: str) -> str:
+    path = url.split("?", 1)[0]
+    for suffix in ("/fields", "/records/search", "/records/batch_update", "/tenant_access_token/internal"):
+        if path.endswith(suffix):
+            return f"{method} {suffix.rsplit('/', 1)[-1]}"
+    return f"{method} record"
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+def parse_count(s: str) -> int:
+    s = s.strip().upper()
+    mult = 1
+    if s.endswith("K"):
+        mult, s = 1000, s[:-1]
+    elif s.endswith("M"):
+        mult, s = 1000 * 1000, s[:-1]
+    return int(float(s) * mult)
+
+
+def make_settings(base_url: str, page_size: int, log_dir: str) -> Dict:
+    return {
+        "feishu_api_base": base_url,
+        "feishu_app_id": "bench",
+        "feishu_app_secret": "bench",
+        "feishu_bitable_app_token": "appBench",
+        "feishu_bitable_table_id": "tblBench",
+        "feishu_page_size": page_size,
+        "feishu_backoff_base": 0.05,
+        "feishu_backoff_max": 0.5,
+        "feishu_max_retries": 5,
+        "log_dir": log_dir,
+    }
+
+
+def print_latencies(samples: Dict[str, List[float]]) -> None:
+    for name in sorted(samples):
+        vals = samples[name]
+        print(f"    {name:<22} n={len(vals):<6} p50={percentile(vals, 50) * 1000:8.2f}ms "
+              f"p90={percentile(vals, 90) * 1000:8.2f}ms p99={percentile(vals, 99) * 1000:8.2f}ms")
+
+
+def bench_size(server: FeishuStubServer, n: int, args, log_dir: str) -> None:
+    server.table.reset(n)
+    expected = server.table.done_count
+    clear_schema_cache()
+    settings = make_settings(server.base_url, args.page_size, log_dir)
+
+    samples: Dict[str, List[float]] = defaultdict(list)
+    client = TimedClient(settings, samples)
+    walls: List[float] = []
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        items = client.search_done_records()
+        walls.append(time.perf_counter() - t0)
+        if len(items) != expected:
+            raise AssertionError(f"记录数不一致：期望 {expected}，实际 {len(items)}")
+    best = min(walls)
+    print(f"  search  {expected} 条已完成记录：best {best * 1000:.1f}ms "
+          f"median {percentile(walls, 50) * 1000:.1f}ms | {expected / best:,.0f} 条/s")
+    print_latencies(samples)
+
+    ids = [it["record_id"] for it in items[:args.marks]]
+    samples = defaultdict(list)
+    client = TimedClient(settings, samples)
+    t0 = time.perf_counter()
+    for rid in ids:
+        client.mark_record_as_used({"record_id": rid})
+    single = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    client.mark_records_as_used(ids)
+    batch = time.perf_counter() - t0
+    print(f"  mark    {len(ids)} 条：逐条 {single * 1000:.1f}ms（{len(ids) / single:,.0f} 次/s），"
+          f"批量 {batch * 1000:.1f}ms")
+    print_latencies(samples)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", default="1K,10K,100K")
+    ap.add_argument("--page-size", type=int, default=500)
+    ap.add_argument("--latency", type=float, default=0.0, help="模拟服务每个请求的固定延迟（秒）")
+    ap.add_argument("--jitter", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--marks", type=int, default=200)
+    args = ap.parse_args()
+
+    table = StubBitable(0, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    with FeishuStubServer(table) as server, tempfile.TemporaryDirectory() as log_dir:
+        print(f"stub: {server.base_url} latency={args.latency}s jitter={args.jitter}s "
+              f"error_rate={args.error_rate} page_size={args.page_size}")
+        for label in args.sizes.split(","):
+            print(f"[{label}]")
+            bench_size(server, parse_count(label), args, log_dir)
+            if table.stats.get("injected_error"):
+                print(f"  injected errors: {table.stats['injected_error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""normalize_punctuation 微基准：对比逐项全量替换的旧实现与按需替换的新实现。
+
+运行（仓库根目录）：
+    python benchmarks/bench_punctuation.py [--sizes 10K,100K,1M,10M] [--repeat 5] [--profile copy|dense]
+
+- copy：接近真实文案（以中文为主，夹杂少量英文标点与引号）
+- dense：英文标点与直引号密集的极端输入
+同时校验两种实现在随机文本上的输出完全一致。
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.punctuation import EN_TO_CN, normalize_punctuation  # noqa: E402
+
+
+def legacy_normalize_punctuation(text: str) -> str:
+    """旧实现（逐项 str.replace + 两次 split 配对引号 + 两个正则），仅用于对比。"""
+    for en, cn in EN_TO_CN.items():
+        text = text.replace(en, cn)
+
+    def replace_quotes(s: str, quote: str, cn_open: str, cn_close: str) -> str:
+        parts = s.split(quote)
+        if len(parts) <= 1:
+            return s
+        out = []
+        open_next = True
+        for i, p in enumerate(parts):
+            out.append(p)
+            if i < len(parts) - 1:
+                out.append(cn_open if open_next else cn_close)
+                open_next = not open_next
+        return "".join(out)
+
+    text = replace_quotes(text, '"', '“', '”')
+    text = replace_quotes(text, "'", '‘', '’')
+    text = re.sub(r"\.{3,}", "……", text)
+    text = re.sub(r"-{2,}", "——", text)
+    return text
+
+
+_ALPHABET = (
+    "肝主疏泄大忌郁结不良情绪是伤的首要因素通过冥想静坐一些自己爱好来让沉下心"
+    "abcdefgXYZ0123456789 \n,.?!:;\"'()-—…“”，。"
+)
+
+_COPY_LINES = [
+    "肝主疏泄，大忌郁结。不良情绪是伤肝的首要因素。",
+    "通过冥想、静坐、一些自己的爱好来让自己沉下心来.",
+    "不熬夜:尽量在晚上11点(子时)前入睡,熟睡能让肝血回归!",
+    "玫瑰花6-10朵 + 菊花3-5朵。沸水冲泡，盖闷5分钟，可加少许冰糖或蜂蜜调味。",
+    "理解\"怒伤肝\"的道理，有意识地遇事冷静……",
+    "你们还有什么养脾胃小妙招吗?欢迎在评论区分享交流～",
+]
+
+
+def make_text(size: int, seed: int = 0, profile: str = "copy") -> str:
+    rnd = random.Random(seed)
+    if profile == "dense":
+        chunk = "".join(rnd.choice(_ALPHABET) for _ in range(4096))
+        chunk += '他说:"真的吗?"--是的... (没错!)'
+    else:
+        chunk = "\n".join(rnd.choice(_COPY_LINES) for _ in range(200))
+    reps = size // len(chunk) + 1
+    return (chunk * reps)[:size]
+
+
+def parse_size(s: str) -> int:
+    s = s.strip().upper()
+    mult = 1
+    if s.endswith("K"):
+        mult, s = 1024, s[:-1]
+    elif s.endswith("M"):
+        mult, s = 1024 * 1024, s[:-1]
+    return int(float(s) * mult)
+
+
+def bench(fn, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def check_equivalence(samples: int = 2000) -> None:
+    rnd = random.Random(42)
+    for i in range(samples):
+        n = rnd.randint(0, 200)
+        s = "".join(rnd.choice(_ALPHABET) for _ in range(n))
+        old, new = legacy_normalize_punctuation(s), normalize_punctuation(s)
+        if old != new:
+            raise AssertionError(f"输出不一致（样本 {i}）：{s!r}\n旧：{old!r}\n新：{new!r}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", default="10K,100K,1M,10M")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--profile", choices=("copy", "dense"), default="copy")
+    args = ap.parse_args()
+
+    check_equivalence()
+    print("equivalence: OK")
+    print(f"profile: {args.profile}")
+    print(f"{'size':>8} {'legacy ms':>12} {'new ms':>10} {'speedup':>8}")
+    for label in args.sizes.split(","):
+        size = parse_size(label)
+        text = make_text(size, profile=args.profile)
+        if legacy_normalize_punctuation(text) != normalize_punctuation(text):
+            raise AssertionError(f"输出不一致：{label}")
+        old = bench(legacy_normalize_punctuation, text, args.repeat)
+        new = bench(normalize_punctuation, text, args.repeat)
+        print(f"{label:>8} {old * 1000:>12.2f} {new * 1000:>10.2f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
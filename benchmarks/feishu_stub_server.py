@@ -0,0 +1,329 @@
+"""本地飞书开放平台模拟服务：只实现 FeishuClient 用到的接口，用于压测与联调。
+
+实现的接口（路径与飞书一致，前缀 /open-apis）：
+- POST  /auth/v3/tenant_access_token/internal
+- GET   /bitable/v1/apps/<app>/tables/<table>/fields（page_token 分页）
+- POST  /bitable/v1/apps/<app>/tables/<table>/records/search（支持状态 is 与修改时间 isGreaterEqual 筛选）
+- POST  /bitable/v1/apps/<app>/tables/<table>/records/batch_update
+- PATCH /bitable/v1/apps/<app>/tables/<table>/records/<record_id>
+
+可配置记录数、“已完成”占比、单页上限、固定/随机延迟与错误注入（429 限流码或 500）。
+
+单独运行（仓库根目录）：
+    python benchmarks/feishu_stub_server.py [--port 8765] [--records 10000] [--latency 0.02] [--error-rate 0.01]
+然后在设置中加入 "feishu_api_base": "http://127.0.0.1:8765/open-apis"（app_token/table_id 任意）。
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+STATUS_OPTIONS = [("optDone", "已完成"), ("optUsed", "已使用"), ("optTodo", "待处理")]
+FIELDS = [
+    {"field_id": "fldTitle", "field_name": "标题", "type": 1, "is_primary": True},
+    {"field_id": "fldStatus", "field_name": "笔记状态", "type": 3,
+     "property": {"options": [{"id": oid, "name": name} for oid, name in STATUS_OPTIONS]}},
+    {"field_id": "fldContent", "field_name": "去敏感词", "type": 1},
+    {"field_id": "fldModified", "field_name": "修改时间", "type": 1002},
+]
+_FIELD_NAMES = {f["field_id"]: f["field_name"] for f in FIELDS}
+_OPTION_NAMES = dict(STATUS_OPTIONS)
+_DAY_MS = 24 * 3600 * 1000
+
+_TABLE_RE = re.compile(r"^/open-apis/bitable/v1/apps/[^/]+/tables/[^/]+(/.*)$")
+
+_SAMPLE_LINES = [
+    "肝主疏泄，大忌郁结。不良情绪是伤肝的首要因素。",
+    "通过冥想、静坐、一些自己的爱好来让自己沉下心来。",
+    "不熬夜：尽量在晚上11点（子时）前入睡，熟睡能让肝血回归！",
+    "玫瑰花6-10朵 + 菊花3-5朵。沸水冲泡，盖闷5分钟，可加少许冰糖或蜂蜜调味。",
+]
+
+
+class StubBitable:
+    """内存中的单张多维表格及其接口逻辑（与 HTTP 层无关，线程安全）。"""
+
+    def __init__(self, records: int = 1000, done_ratio: float = 0.8, max_page_size: int = 500,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 token_ttl: int = 7200, seed: int = 0):
+        self.max_page_size = max_page_size
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.token_ttl = token_ttl
+        self._lock = threading.Lock()
+        self._rnd = random.Random(seed)
+        self._tokens: Dict[str, float] = {}
+        self.stats: Dict[str, int] = {}
+        self.reset(records, done_ratio, seed)
+
+    def reset(self, records: int, done_ratio: float = 0.8, seed: int = 0) -> None:
+        rnd = random.Random(seed)
+        now = int(time.time() * 1000)
+        rows: List[Dict] = []
+        for i in range(records):
+            status = "已完成" if rnd.random() < done_ratio else "待处理"
+            content = "\n".join(rnd.choice(_SAMPLE_LINES) for _ in range(rnd.randint(3, 8)))
+            rows.append({
+                "record_id": f"rec{i:07d}",
+                "fields": {
+                    "标题": [{"type": "text", "text": f"测试笔记 {i}"}],
+                    "笔记状态": status,
+                    "去敏感词": [{"type": "text", "text": content}],
+                    "修改时间": now - rnd.randint(0, 30) * _DAY_MS,
+                },
+            })
+        with self._lock:
+            self._rows = rows
+            self._index = {r["record_id"]: r for r in rows}
+            self._filtered: Dict[str, List[Dict]] = {}
+            self.stats = {}
+
+    def delete_records(self, record_ids: List[str]) -> None:
+        """模拟在飞书中删除记录（删除不会更新任何记录的修改时间）。"""
+        gone = set(record_ids)
+        with self._lock:
+            self._rows = [r for r in self._rows if r["record_id"] not in gone]
+            self._index = {r["record_id"]: r for r in self._rows}
+            self._filtered.clear()
+
+    @property
+    def done_count(self) -> int:
+        with self._lock:
+            return sum(1 for r in self._rows if r["fields"]["笔记状态"] == "已完成")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] = self.stats.get(name, 0) + 1
+
+    # —— 接口实现：返回 (HTTP 状态码, JSON 响应, 额外响应头) ——
+    def handle(self, method: str, path: str, query: Dict[str, str], headers: Dict[str, str],
+               body: Optional[Dict]) -> Tuple[int, Dict, Dict[str, str]]:
+        if self.latency or self.jitter:
+            time.sleep(self.latency + self._rnd.uniform(0, self.jitter))
+        if self.error_rate and self._rnd.random() < self.error_rate:
+            self._count("injected_error")
+            if self._rnd.random() < 0.5:
+                return 429, {"code": 99991400, "msg": "request trigger frequency limit"}, {"x-ogw-ratelimit-reset": "0"}
+            return 500, {"code": 1254607, "msg": "internal error"}, {}
+
+        if method == "POST" and path == "/open-apis/auth/v3/tenant_access_token/internal":
+            self._count("auth")
+            return 200, self._auth(body or {}), {}
+        m = _TABLE_RE.match(path)
+        if not m:
+            return 404, {"code": 404, "msg": f"no route: {method} {path}"}, {}
+        if not self._authorized(headers.get("authorization", "")):
+            return 400, {"code": 99991663, "msg": "Invalid access token for authorization"}, {}
+        sub = m.group(1)
+        if method == "GET" and sub == "/fields":
+            self._count("fields")
+            return 200, self._fields(query), {}
+        if method == "POST" and sub == "/records/search":
+            self._count("search")
+            return 200, self._search(query, body or {}), {}
+        if method == "POST" and sub == "/records/batch_update":
+            self._count("batch_update")
+            return 200, self._batch_update(body or {}), {}
+        if method == "PATCH" and sub.startswith("/records/"):
+            self._count("patch")
+            return 200, self._update(sub[len("/records/"):], (body or {}).get("fields") or {}), {}
+        return 404, {"code": 404, "msg": f"no route: {method} {path}"}, {}
+
+    def _auth(self, body: Dict) -> Dict:
+        if not body.get("app_id") or not body.get("app_secret"):
+            return {"code": 10003, "msg": "invalid param"}
+        token = f"t-stub-{self._rnd.getrandbits(64):016x}"
+        with self._lock:
+            self._tokens[token] = time.time() + self.token_ttl
+        return {"code": 0, "msg": "ok", "tenant_access_token": token, "expire": self.token_ttl}
+
+    def _authorized(self, header: str) -> bool:
+        token = header[len("Bearer "):] if header.startswith("Bearer ") else ""
+        with self._lock:
+            return self._tokens.get(token, 0) > time.time()
+
+    def _page_size(self, query: Dict[str, str], body: Dict, default: int = 20) -> int:
+        raw = query.get("page_size") or body.get("page_size") or default
+        try:
+            size = int(raw)
+        except (TypeError, ValueError):
+            size = default
+        return max(1, min(size, self.max_page_size))
+
+    @staticmethod
+    def _offset(query: Dict[str, str], body: Dict) -> int:
+        token = query.get("page_token") or body.get("page_token") or ""
+        return int(token) if str(token).isdigit() else 0
+
+    def _fields(self, query: Dict[str, str]) -> Dict:
+        size = self._page_size(query, {})
+        start = self._offset(query, {})
+        items = FIELDS[start:start + size]
+        more = start + size < len(FIELDS)
+        return {"code": 0, "msg": "success", "data": {
+            "items": items, "total": len(FIELDS), "has_more": more,
+            "page_token": str(start + size) if more else ""}}
+
+    @staticmethod
+    def _match(row: Dict, conditions: List[Dict]) -> bool:
+        fields = row["fields"]
+        for cond in conditions:
+            name = cond.get("field_name")
+            value = cond.get("value") or []
+            op = cond.get("operator")
+            if op == "is" and name == "笔记状态":
+                if fields.get(name) not in value:
+                    return False
+            elif op == "isGreaterEqual" and name == "修改时间" and len(value) == 2:
+                # 与飞书一致：日期条件按天比较
+                day_start = int(value[1]) // _DAY_MS * _DAY_MS
+                if fields.get(name, 0) < day_start:
+                    return False
+        return True
+
+    def _search(self, query: Dict[str, str], body: Dict) -> Dict:
+        key = json.dumps(body.get("filter") or {}, sort_keys=True, ensure_ascii=False)
+        with self._lock:
+            rows = self._filtered.get(key)
+            if rows is None:
+                conditions = (body.get("filter") or {}).get("conditions") or []
+                rows = self._filtered[key] = [r for r in self._rows if self._match(r, conditions)]
+        size = self._page_size(query, body)
+        start = self._offset(query, body)
+        page = rows[start:start + size]
+        names = body.get("field_names")
+        if names:
+            page = [{"record_id": r["record_id"],
+                     "fields": {k: v for k, v in r["fields"].items() if k in names}} for r in page]
+        more = start + size < len(rows)
+        return {"code": 0, "msg": "success", "data": {
+            "items": page, "total": len(rows), "has_more": more,
+            "page_token": str(start + size) if more else ""}}
+
+    def _update(self, record_id: str, fields: Dict) -> Dict:
+        with self._lock:
+            row = self._index.get(record_id)
+            if row is None:
+                return {"code": 1254043, "msg": "RecordIdNotFound"}
+            for key, value in fields.items():
+                name = _FIELD_NAMES.get(key, key)
+                if name == "笔记状态" and isinstance(value, list):
+                    # 客户端写入选项ID列表
+                    value = _OPTION_NAMES.get(value[0], value[0]) if value else ""
+                row["fields"][name] = value
+            row["fields"]["修改时间"] = int(time.time() * 1000)
+            self._filtered.clear()
+        return {"code": 0, "msg": "success", "data": {"record": row}}
+
+    def _batch_update(self, body: Dict) -> Dict:
+        records = body.get("records") or []
+        if len(records) > 1000:
+            return {"code": 1254104, "msg": "RecordExceedLimit"}
+        with self._lock:
+            missing = [r.get("record_id") for r in records if r.get("record_id") not in self._index]
+        if missing:
+            return {"code": 1254043, "msg": f"RecordIdNotFound: {missing[:5]}"}
+        updated = [self._update(r["record_id"], r.get("fields") or {})["data"]["record"] for r in records]
+        return {"code": 0, "msg": "success", "data": {"records": updated}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 响应头与响应体分两次写出，关闭 Nagle 避免与客户端延迟确认叠加出约 40ms 的额外等待
+    disable_nagle_algorithm = True
+    table: StubBitable
+
+    def log_message(self, format, *args):
+        pass
+
+    def _dispatch(self) -> None:
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = None
+        if length:
+            try:
+                body = json.loads(self.rfile.read(length))
+            except ValueError:
+                body = None
+        headers = {k.lower(): v for k, v in self.headers.items()}
+        status, data, extra = self.table.handle(self.command, url.path, query, headers, body)
+        payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for k, v in extra.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PATCH = _dispatch
+
+
+class FeishuStubServer:
+    """在后台线程运行的模拟服务；base_url 可直接作为设置项 feishu_api_base。"""
+
+    def __init__(self, table: Optional[StubBitable] = None, host: str = "127.0.0.1", port: int = 0):
+        self.table = table or StubBitable()
+        handler = type("Handler", (_Handler,), {"table": self.table})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/open-apis"
+
+    def start(self) -> "FeishuStubServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="feishu-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "FeishuStubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--records", type=int, default=10000)
+    ap.add_argument("--done-ratio", type=float, default=0.8)
+    ap.add_argument("--max-page-size", type=int, default=500)
+    ap.add_argument("--latency", type=float, default=0.0, help="每个请求的固定延迟（秒）")
+    ap.add_argument("--jitter", type=float, default=0.0, help="在固定延迟上追加的随机延迟上限（秒）")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="注入 429/500 错误的概率")
+    ap.add_argument("--token-ttl", type=int, default=7200)
+    args = ap.parse_args()
+
+    table = StubBitable(args.records, args.done_ratio, args.max_page_size,
+                        args.latency, args.jitter, args.error_rate, args.token_ttl)
+    server = FeishuStubServer(table, args.host, args.port)
+    print(f"飞书模拟服务已启动：{server.base_url}（记录 {args.records} 条，已完成 {table.done_count} 条）")
+    print(json.dumps({"feishu_api_base": server.base_url, "feishu_app_id": "stub", "feishu_app_secret": "stub",
+                      "feishu_bitable_app_token": "appStub", "feishu_bitable_table_id": "tblStub"},
+                     ensure_ascii=False, indent=2))
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
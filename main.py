@@ -77,7 +77,10 @@ def main():
         win.setWindowIcon(QIcon(icon_path))
     win.resize(800, 600)
     win.show()
-    sys.exit(app.exec_())
+    code = app.exec_()
+    # 退出前写入尚未落盘的设置（保存由后台线程合并延迟写入）
+    cfg.flush()
+    sys.exit(code)
 
 
 if __name__ == "__main__":
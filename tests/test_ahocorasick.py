@@ -0,0 +1,48 @@
+import pickle
+import random
+
+from app.core.ahocorasick import AhoCorasick
+
+
+def _naive_matches(patterns, text):
+    found = set()
+    for pid, p in enumerate(patterns):
+        start = text.find(p)
+        while start != -1:
+            found.add((start + len(p), pid))
+            start = text.find(p, start + 1)
+    return found
+
+
+def test_matches_agree_with_naive_scan():
+    rnd = random.Random(0)
+    alphabet = "ab肝火c"
+    for _ in range(300):
+        raw = ["".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 4))) for _ in range(rnd.randint(1, 8))]
+        ac = AhoCorasick(raw)
+        text = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 40)))
+        assert set(ac.iter_matches(text)) == _naive_matches(ac.patterns, text)
+        assert ac.matched_ids(text) == {pid for _, pid in _naive_matches(ac.patterns, text)}
+        assert ac.prefix_ids(text) == sorted(
+            (pid for pid, p in enumerate(ac.patterns) if text.startswith(p)),
+            key=lambda pid: len(ac.patterns[pid]))
+
+
+def test_overlapping_and_nested_patterns():
+    ac = AhoCorasick(["he", "she", "his", "hers"])
+    assert sorted(ac.iter_matches("ushers")) == [(4, 0), (4, 1), (6, 3)]
+
+
+def test_empty_and_duplicate_patterns_are_skipped():
+    ac = AhoCorasick(["", "关注", "点赞", "关注"])
+    assert ac.patterns == ["关注", "点赞"]
+    assert len(ac) == 2
+    assert ac.pattern_id("点赞") == 1
+    assert ac.pattern_id("收藏") == -1
+    assert ac.matched_ids("") == set()
+
+
+def test_automaton_survives_pickle():
+    ac = AhoCorasick(["记得关注", "关注"])
+    clone = pickle.loads(pickle.dumps(ac))
+    assert set(clone.iter_matches("记得关注我")) == set(ac.iter_matches("记得关注我"))
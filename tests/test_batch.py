@@ -0,0 +1,66 @@
+import json
+import os
+
+import pytest
+
+from app import cli
+from app.core import batch, logger
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NOTE = "标题：{title}\n\n一、早睡养肝\n尽量在晚上11点前入睡。\n\n二、少喝酒\n酒精伤肝。\n"
+STAGES = {"parse", "normalize", "desensitize", "format", "write", "zip", "total"}
+
+
+@pytest.fixture
+def settings(tmp_path):
+    with open(cli.DEFAULT_SETTINGS_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    data.update(zip_output_dir=str(tmp_path / "out"), log_dir=str(tmp_path / "logs"), trace_enabled=False,
+                sensitive_filter_enabled=False, delete_excel_after_zip=True,
+                template_excel_path=os.path.join(ROOT, "template", "稿定设计-数据上传无图模板.xlsx"))
+    yield data
+    logger._stop_listener()
+
+
+def _jobs():
+    return [("note0", NOTE.format(title="笔记0"), "note0"),
+            ("empty", "  \n", "empty"),
+            ("note1", NOTE.format(title="笔记1"), "note1"),
+            ("unreadable", OSError("权限不足"), "unreadable")]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_run_batch_result_shape(settings, jobs):
+    results = {r["source"]: r for r in batch.run_batch(_jobs(), settings, jobs=jobs)}
+    assert set(results) == {"note0", "note1", "empty", "unreadable"}
+    for r in results.values():
+        assert set(r) == {"source", "zip_path", "timings", "error", "pid"}
+
+    for source in ("note0", "note1"):
+        ok = results[source]
+        assert ok["error"] is None
+        assert os.path.isfile(ok["zip_path"])
+        assert set(ok["timings"]) == STAGES
+        assert all(v >= 0 for v in ok["timings"].values())
+        assert ok["timings"]["total"] >= ok["timings"]["write"]
+
+    empty = results["empty"]
+    assert (empty["error"], empty["zip_path"], empty["timings"]) == ("空文案", None, {})
+    assert empty["pid"] is not None
+
+    unreadable = results["unreadable"]
+    assert unreadable["error"] == "OSError: 权限不足"
+    assert (unreadable["zip_path"], unreadable["timings"], unreadable["pid"]) == (None, {}, None)
+
+
+def test_sequential_runs_in_process_and_pool_in_workers(settings):
+    jobs = [(f"note{i}", NOTE.format(title=f"笔记{i}"), f"note{i}") for i in range(4)]
+    sequential = list(batch.run_batch(jobs, settings, jobs=1))
+    assert [r["source"] for r in sequential] == [j[0] for j in jobs]
+    assert {r["pid"] for r in sequential} == {os.getpid()}
+
+    pooled = list(batch.run_batch(jobs, dict(settings, zip_output_dir=settings["zip_output_dir"] + "-pool"),
+                                  jobs=2))
+    assert sorted(r["source"] for r in pooled) == [j[0] for j in jobs]
+    assert all(r["error"] is None for r in pooled)
+    assert os.getpid() not in {r["pid"] for r in pooled}
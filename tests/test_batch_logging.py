@@ -0,0 +1,26 @@
+import logging
+import os
+
+from app.core import batch, logger
+
+
+def _logging_process_note(raw, settings, fallback_title="", timings=None):
+    logging.getLogger("xhs_tool").warning("worker %d handled %s", os.getpid(), fallback_title)
+    return f"{fallback_title}.zip"
+
+
+def test_pool_worker_logs_reach_parent_log_file(tmp_path, monkeypatch):
+    # 工作进程由 fork 创建，会继承这里替换后的 process_note
+    monkeypatch.setattr(batch, "process_note", _logging_process_note)
+    logger.setup_logger(str(tmp_path), retention_days=0)
+    try:
+        jobs = [(f"note{i}", "文案", f"note{i}") for i in range(4)]
+        results = list(batch.run_batch(jobs, {"log_level": "INFO"}, jobs=2))
+    finally:
+        logger._stop_listener()
+    assert all(r["error"] is None for r in results)
+    worker_pids = {r["pid"] for r in results} - {os.getpid()}
+    assert worker_pids
+    text = (tmp_path / logger.LOG_FILENAME).read_text(encoding="utf-8")
+    for i in range(4):
+        assert f"handled note{i}" in text
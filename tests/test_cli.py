@@ -0,0 +1,76 @@
+import io
+import json
+import os
+import zipfile
+
+import pytest
+from openpyxl import load_workbook
+
+from app import cli
+from app.core import logger
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NOTE = "标题：{title}\n\n一、早睡养肝\n尽量在晚上11点前入睡。\n\n二、少喝酒\n酒精伤肝。\n"
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    notes = tmp_path / "notes"
+    notes.mkdir()
+    for i in range(2):
+        (notes / f"note{i}.txt").write_text(NOTE.format(title=f"养肝笔记{i}"), encoding="utf-8")
+    with open(cli.DEFAULT_SETTINGS_PATH, encoding="utf-8") as f:
+        settings = json.load(f)
+    settings.update(log_dir=str(tmp_path / "logs"), trace_enabled=False, sensitive_filter_enabled=False,
+                    delete_excel_after_zip=True,
+                    template_excel_path=os.path.join(ROOT, "template", "稿定设计-数据上传无图模板.xlsx"))
+    yield tmp_path, notes, settings
+    logger._stop_listener()
+
+
+def _xlsx_rows(zip_path):
+    with zipfile.ZipFile(zip_path) as zf:
+        name = next(n for n in zf.namelist() if n.endswith(".xlsx"))
+        ws = load_workbook(io.BytesIO(zf.read(name))).active
+    return [[c.value for c in row][:4] for row in ws.iter_rows()]
+
+
+@pytest.mark.parametrize("engine", ["openpyxl", "xml"])
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_batch_writes_one_zip_per_note(workspace, engine, jobs):
+    tmp_path, notes, settings = workspace
+    settings_path = tmp_path / f"settings-{engine}.json"
+    settings_path.write_text(json.dumps(dict(settings, excel_writer_engine=engine), ensure_ascii=False),
+                             encoding="utf-8")
+    out = tmp_path / f"out-{engine}-{jobs}"
+    code = cli.main(["batch", str(notes), "--settings", str(settings_path), "--output", str(out),
+                     "--jobs", str(jobs)])
+    assert code == 0
+    zips = sorted(os.listdir(out))
+    assert len(zips) == 2
+    rows = _xlsx_rows(out / zips[0])
+    assert rows[-2][1:3] == ["一、早睡养肝", "尽量在晚上11点前入睡。"]
+    assert rows[-1][1:3] == ["二、少喝酒", "酒精伤肝。"]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_malformed_jsonl_lines_fail_individually(workspace, jobs):
+    tmp_path, _, settings = workspace
+    settings_path = tmp_path / "settings.json"
+    settings_path.write_text(json.dumps(settings, ensure_ascii=False), encoding="utf-8")
+    jsonl = tmp_path / "notes.jsonl"
+    jsonl.write_text("\n".join([
+        json.dumps({"content": NOTE.format(title="第一条")}, ensure_ascii=False),
+        "{不是 JSON",
+        json.dumps([1, 2]),
+        json.dumps({"content": NOTE.format(title="第四条")}, ensure_ascii=False),
+    ]), encoding="utf-8")
+    out = tmp_path / f"out-{jobs}"
+    code = cli.main(["batch", str(jsonl), "--settings", str(settings_path), "--output", str(out),
+                     "--jobs", str(jobs)])
+    assert code == 1
+    assert sorted(os.listdir(out)) == ["标题：第一条.zip", "标题：第四条.zip"]
+    logger._stop_listener()
+    log_text = (tmp_path / "logs" / logger.LOG_FILENAME).read_text(encoding="utf-8")
+    assert f"处理失败: {jsonl}:2 | ValueError: JSON 解析失败" in log_text
+    assert f"处理失败: {jsonl}:3 | ValueError: 不是 JSON 对象或字符串" in log_text
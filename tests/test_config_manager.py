@@ -0,0 +1,90 @@
+import json
+import os
+import time
+
+import pytest
+
+from app.core.config_manager import ConfigManager
+
+
+@pytest.fixture
+def settings_path(tmp_path):
+    path = tmp_path / "config" / "settings.json"
+    path.parent.mkdir()
+    path.write_text(json.dumps({"log_level": "INFO", "config_save_debounce": 0.2,
+                                "config_save_max_delay": 1.0}), encoding="utf-8")
+    return str(path)
+
+
+def _on_disk(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_save_is_debounced_and_flush_writes(settings_path):
+    cm = ConfigManager(settings_path)
+    cm.update({"log_level": "DEBUG"})
+    # 合并窗口内尚未写盘
+    assert _on_disk(settings_path)["log_level"] == "INFO"
+    assert cm.flush()
+    assert _on_disk(settings_path)["log_level"] == "DEBUG"
+    assert not [n for n in os.listdir(os.path.dirname(settings_path)) if n.endswith(".tmp")]
+
+
+def test_burst_of_saves_is_written_once_settled(settings_path):
+    cm = ConfigManager(settings_path)
+    for i in range(5):
+        cm.update({"counter": i})
+    deadline = time.monotonic() + 3
+    while _on_disk(settings_path).get("counter") != 4 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert _on_disk(settings_path)["counter"] == 4
+
+
+def test_flush_without_pending_changes_returns_immediately(settings_path):
+    cm = ConfigManager(settings_path)
+    assert cm.flush(timeout=0)
+
+
+def test_reload_keeps_unflushed_changes(settings_path):
+    cm = ConfigManager(settings_path)
+    cm.update({"log_level": "WARNING"})
+    assert cm.reload()["log_level"] == "WARNING"
+
+
+def test_subscribers_only_hear_about_watched_keys(settings_path):
+    cm = ConfigManager(settings_path)
+    calls = {"all": 0, "feishu": 0, "tail": 0}
+    cm.subscribe(lambda s: calls.__setitem__("all", calls["all"] + 1))
+    cm.subscribe(lambda s: calls.__setitem__("feishu", calls["feishu"] + 1), keys=["feishu_*"])
+    cm.subscribe(lambda s: calls.__setitem__("tail", calls["tail"] + 1), keys=["tail_keywords"])
+
+    cm.update({"feishu_page_size": 100})
+    assert calls == {"all": 1, "feishu": 1, "tail": 0}
+    # 值未变化时不通知任何订阅者
+    cm.update({"feishu_page_size": 100})
+    assert calls == {"all": 1, "feishu": 1, "tail": 0}
+    cm.update({"tail_keywords": ["关注"]})
+    assert calls == {"all": 2, "feishu": 1, "tail": 1}
+    # 就地修改共享列表同样能被识别
+    cm.settings["tail_keywords"].append("点赞")
+    cm.save()
+    assert calls == {"all": 3, "feishu": 1, "tail": 2}
+    cm.flush()
+
+
+def test_resubscribe_replaces_keys_and_unsubscribe_stops(settings_path):
+    cm = ConfigManager(settings_path)
+    seen = []
+
+    def cb(settings):
+        seen.append(settings["log_level"])
+
+    cm.subscribe(cb, keys=["feishu_*"])
+    cm.subscribe(cb, keys=["log_level"])
+    cm.update({"log_level": "DEBUG"})
+    assert seen == ["DEBUG"]
+    cm.unsubscribe(cb)
+    cm.update({"log_level": "ERROR"})
+    assert seen == ["DEBUG"]
+    cm.flush()
@@ -0,0 +1,160 @@
+import json
+
+import pytest
+import requests
+
+from app.core import feishu_client
+from app.core.feishu_client import AUTH_PATH, FeishuClient, clear_schema_cache, close_token_providers
+
+API_BASE = "https://stub.test/open-apis"
+FIELDS = [
+    {"field_name": "标题", "field_id": "fld1", "type": 1},
+    {"field_name": "笔记状态", "field_id": "fld2", "type": 3,
+     "property": {"options": [{"name": "已完成", "id": "opt1"}]}},
+]
+
+
+def _response(status=200, body=None, headers=None):
+    resp = requests.Response()
+    resp.status_code = status
+    resp.url = API_BASE
+    resp.headers.update(headers or {})
+    resp._content = json.dumps(body).encode("utf-8") if isinstance(body, dict) else (body or b"")
+    return resp
+
+
+class ScriptedSession:
+    """按顺序返回预设的响应（异常实例则抛出）；鉴权接口每次签发新 token。"""
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = []
+        self.tokens = 0
+
+    def request(self, method, url, timeout=None, **kwargs):
+        if url.endswith(AUTH_PATH):
+            self.tokens += 1
+            return _response(body={"code": 0, "tenant_access_token": f"t-{self.tokens}", "expire": 7200})
+        self.calls.append((method, url, (kwargs.get("headers") or {}).get("Authorization")))
+        item = self.script.pop(0) if len(self.script) > 1 else self.script[0]
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(feishu_client.time, "sleep", recorded.append)
+    yield recorded
+    clear_schema_cache()
+    close_token_providers()
+
+
+def _client(session, **extra):
+    settings = {"feishu_api_base": API_BASE, "feishu_app_id": "app", "feishu_app_secret": "secret",
+                "feishu_max_retries": 2, "feishu_backoff_base": 0.5, "feishu_backoff_max": 4}
+    settings.update(extra)
+    return FeishuClient(settings, session=session)
+
+
+OK = {"code": 0, "data": {}}
+
+
+@pytest.mark.parametrize("failure", [
+    _response(503, b"<html>busy</html>"),
+    _response(429, {"code": 99991400, "msg": "rate limited"}),
+    _response(200, {"code": 1254607, "msg": "data not ready"}),
+    requests.ConnectionError("reset"),
+    requests.Timeout("slow"),
+])
+def test_retryable_failures_are_retried_with_backoff(sleeps, failure):
+    session = ScriptedSession(failure, failure, _response(body=OK))
+    assert _client(session)._request("GET", API_BASE + "/x") == OK
+    assert len(session.calls) == 3
+    # 指数退避带抖动：第 n 次等待在 [base*2^n/2, base*2^n] 内
+    assert 0.25 <= sleeps[0] <= 0.5 and 0.5 <= sleeps[1] <= 1.0
+
+
+def test_retries_exhausted_return_last_json_or_raise(sleeps):
+    limited = _response(200, {"code": 1254290, "msg": "too many requests"})
+    session = ScriptedSession(limited)
+    assert _client(session)._request("GET", API_BASE + "/x")["code"] == 1254290
+    assert len(session.calls) == 3
+
+    with pytest.raises(requests.HTTPError):
+        _client(ScriptedSession(_response(502, b"bad gateway")))._request("GET", API_BASE + "/x")
+    with pytest.raises(requests.ConnectionError):
+        _client(ScriptedSession(requests.ConnectionError("down")))._request("GET", API_BASE + "/x")
+
+
+def test_non_retryable_errors_return_immediately(sleeps):
+    session = ScriptedSession(_response(400, {"code": 1254000, "msg": "WrongRequestJson"}))
+    assert _client(session)._request("GET", API_BASE + "/x")["code"] == 1254000
+    assert len(session.calls) == 1
+    assert sleeps == []
+
+
+def test_server_retry_hint_is_capped(sleeps):
+    session = ScriptedSession(_response(429, {"code": 99991400}, headers={"x-ogw-ratelimit-reset": "2"}),
+                              _response(429, {"code": 99991400}, headers={"Retry-After": "60"}),
+                              _response(body=OK))
+    _client(session)._request("GET", API_BASE + "/x")
+    assert sleeps == [2.0, 4.0]
+
+
+def test_invalid_token_is_refreshed_once(sleeps):
+    invalid = _response(200, {"code": 99991663, "msg": "invalid access token"})
+    session = ScriptedSession(invalid, _response(body=OK))
+    client = _client(session)
+    assert client._request("GET", API_BASE + "/x", headers=client._headers()) == OK
+    assert [auth for _, _, auth in session.calls] == ["Bearer t-1", "Bearer t-2"]
+    assert sleeps == []
+
+    # 新 token 仍被拒绝时不再循环重取
+    session = ScriptedSession(invalid)
+    client = _client(session, feishu_app_id="other")
+    assert client._request("GET", API_BASE + "/x", headers=client._headers())["code"] == 99991663
+    assert len(session.calls) == 2 and session.tokens == 2
+
+
+def _fields_response(fields=FIELDS):
+    return _response(body={"code": 0, "data": {"items": fields, "has_more": False}})
+
+
+def test_schema_cache_ttl_and_invalidation(sleeps):
+    session = ScriptedSession(_fields_response())
+    client = _client(session, feishu_schema_ttl=60)
+    schema = client.get_schema("app1", "tbl1")
+    assert schema.fields == {"标题": "fld1", "笔记状态": "fld2"}
+    assert client.get_option_id("app1", "tbl1", "笔记状态", "已完成") == "opt1"
+    # 缓存在客户端实例之间共享
+    assert _client(session, feishu_schema_ttl=60).get_schema("app1", "tbl1") is schema
+    assert len(session.calls) == 1
+
+    schema.fetched_at -= 61
+    expired = client.get_schema("app1", "tbl1")
+    assert expired is not schema and len(session.calls) == 2
+
+    assert client.get_schema("app1", "tbl1", refresh=True) is not expired
+    assert len(session.calls) == 3
+
+    clear_schema_cache("app1", "tbl1")
+    client.get_schema("app1", "tbl1")
+    assert len(session.calls) == 4
+    client.get_schema("app1", "tbl2")
+    clear_schema_cache()
+    client.get_schema("app1", "tbl1")
+    client.get_schema("app1", "tbl2")
+    assert len(session.calls) == 7
+
+
+def test_missing_field_refreshes_schema_once(sleeps):
+    renamed = FIELDS + [{"field_name": "去敏感词", "field_id": "fld3", "type": 1}]
+    session = ScriptedSession(_fields_response(), _fields_response(renamed))
+    client = _client(session)
+    client.get_schema("app1", "tbl1")
+    assert "去敏感词" in client._schema_with("app1", "tbl1", ["去敏感词"]).fields
+    assert len(session.calls) == 2
+    client._schema_with("app1", "tbl1", ["去敏感词"])
+    assert len(session.calls) == 2
@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from app.core.feishu_client import clear_schema_cache, close_token_providers  # noqa: E402
+from app.core.record_store import RecordStore  # noqa: E402
+from app.gui.feishu_dialog import FeishuDialog  # noqa: E402
+from benchmarks.feishu_stub_server import FeishuStubServer, StubBitable  # noqa: E402
+
+
+@pytest.fixture
+def server():
+    clear_schema_cache()
+    with FeishuStubServer(StubBitable(records=40, done_ratio=0.5)) as srv:
+        yield srv
+    clear_schema_cache()
+    close_token_providers()
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = RecordStore(str(tmp_path / "records.db"))
+    yield s
+    s.close()
+
+
+def _settings(server, tmp_path):
+    return {"feishu_api_base": server.base_url, "feishu_app_id": "test", "feishu_app_secret": "test",
+            "feishu_bitable_app_token": "appTest", "feishu_bitable_table_id": "tblTest", "feishu_page_size": 10,
+            "log_dir": str(tmp_path)}
+
+
+def _run(thread):
+    events = []
+    thread.page_ready.connect(lambda page: events.append(("page", len(page))))
+    thread.result_ready.connect(lambda items, state: events.append(("result", len(items))))
+    thread.error.connect(lambda err: events.append(("error", err)))
+    # 直接在当前线程执行 run()，信号同步投递
+    thread.run()
+    return events
+
+
+def test_fetch_thread_commits_current_result(server, store, tmp_path):
+    events = _run(FeishuDialog._FetchThread(_settings(server, tmp_path), store, lambda: True, full=True))
+    assert events[-1] == ("result", server.table.done_count)
+    assert store.count() == server.table.done_count and store.get_sync_state()
+
+
+def test_superseded_fetch_thread_drops_result(server, store, tmp_path):
+    assert server.table.done_count > 10
+    store.replace_items([{"record_id": "newer", "status": "已完成"}])
+    def is_current():
+        # 拉取第二页后被新的加载取代
+        return server.table.stats.get("search", 0) < 2
+
+    events = _run(FeishuDialog._FetchThread(_settings(server, tmp_path), store, is_current, full=True))
+    assert events == [("page", 10)]
+    assert [it["record_id"] for it in store.load_items()] == ["newer"]
+
+
+def test_result_superseded_before_commit_is_dropped(server, store, tmp_path):
+    store.replace_items([{"record_id": "newer", "status": "已完成"}])
+    calls = []
+
+    def is_current():
+        calls.append(1)
+        # 分页期间仍是当前加载，写入前被取代
+        return len(calls) <= 2
+
+    events = _run(FeishuDialog._FetchThread(_settings(server, tmp_path), store, is_current, full=True))
+    assert [e[0] for e in events] == ["page", "page"]
+    assert [it["record_id"] for it in store.load_items()] == ["newer"]
+
+
+def test_button_template_is_owned_by_view():
+    from PyQt5 import sip
+    from PyQt5.QtWidgets import QApplication, QTableView
+    from app.gui.feishu_dialog import _ButtonDelegate
+
+    app = QApplication.instance() or QApplication([])
+    view = QTableView()
+    delegate = _ButtonDelegate("去编辑", view)
+    template = delegate._template
+    assert template.parent() is view and template.isHidden()
+    assert template not in app.topLevelWidgets()
+    sip.delete(view)
+    assert sip.isdeleted(template)
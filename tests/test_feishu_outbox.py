@@ -0,0 +1,105 @@
+import pytest
+import requests
+
+from app.core import feishu_outbox
+from app.core.feishu_outbox import UsedStatusOutbox
+from app.core.record_store import RecordStore
+
+SETTINGS = {
+    "feishu_outbox_backoff_base": 0,
+    "feishu_outbox_backoff_max": 0,
+    "feishu_outbox_max_attempts": 3,
+}
+
+
+class StubClient:
+    """记录每次批量提交，并拒绝包含 bad 中任一 record_id 的请求。"""
+
+    BATCH_UPDATE_LIMIT = 4
+    bad = set()
+    error = RuntimeError("批量更新记录状态失败: RecordIdNotFound")
+    calls = []
+    updated = []
+
+    def __init__(self, settings):
+        pass
+
+    def mark_records_as_used(self, record_ids):
+        StubClient.calls.append(list(record_ids))
+        if StubClient.bad.intersection(record_ids):
+            raise StubClient.error
+        StubClient.updated.extend(record_ids)
+        return len(record_ids)
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = RecordStore(str(tmp_path / "records.db"))
+    yield s
+    s.close()
+
+
+@pytest.fixture(autouse=True)
+def stub_client(monkeypatch):
+    monkeypatch.setattr(feishu_outbox, "FeishuClient", StubClient)
+    StubClient.bad = set()
+    StubClient.error = RuntimeError("批量更新记录状态失败: RecordIdNotFound")
+    StubClient.calls = []
+    StubClient.updated = []
+    return StubClient
+
+
+def _attempts(store):
+    return dict(store.due_outbox(now=float("inf"), limit=10000))
+
+
+def test_flush_submits_in_batches(store):
+    outbox = UsedStatusOutbox(SETTINGS, store)
+    ids = [f"rec{i}" for i in range(10)]
+    store.enqueue_used(ids)
+    assert outbox.flush_now() == 10
+    assert [len(c) for c in StubClient.calls] == [4, 4, 2]
+    assert outbox.pending() == 0
+
+
+def test_bad_record_does_not_poison_batch(store):
+    outbox = UsedStatusOutbox(SETTINGS, store)
+    ids = [f"rec{i}" for i in range(8)]
+    StubClient.bad = {"rec5"}
+    store.enqueue_used(ids)
+    assert outbox.flush_now() == 7
+    assert sorted(StubClient.updated) == sorted(set(ids) - {"rec5"})
+    assert _attempts(store) == {"rec5": 1}
+
+
+def test_bad_record_dropped_after_max_attempts(store):
+    outbox = UsedStatusOutbox(SETTINGS, store)
+    StubClient.bad = {"rec1"}
+    store.enqueue_used(["rec0", "rec1", "rec2"])
+    outbox.flush_now()
+    assert _attempts(store) == {"rec1": 1}
+    outbox.flush_now()
+    assert _attempts(store) == {"rec1": 2}
+    outbox.flush_now()
+    assert outbox.pending() == 0
+    assert "rec1" not in StubClient.updated
+
+
+def test_network_error_backs_off_whole_queue_without_splitting(store):
+    outbox = UsedStatusOutbox(SETTINGS, store)
+    StubClient.bad = {f"rec{i}" for i in range(6)}
+    StubClient.error = requests.ConnectionError("down")
+    store.enqueue_used([f"rec{i}" for i in range(6)])
+    assert outbox.flush_now() == 0
+    assert len(StubClient.calls) == 1
+    assert _attempts(store) == {f"rec{i}": 1 for i in range(6)}
+
+
+def test_outage_stops_splitting_after_isolated_failures(store):
+    outbox = UsedStatusOutbox(SETTINGS, store)
+    ids = [f"rec{i}" for i in range(12)]
+    StubClient.bad = set(ids)
+    store.enqueue_used(ids)
+    assert outbox.flush_now() == 0
+    assert len(StubClient.calls) < len(ids)
+    assert _attempts(store) == {rid: 1 for rid in ids}
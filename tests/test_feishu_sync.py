@@ -0,0 +1,58 @@
+import pytest
+
+from app.core.feishu_client import FeishuClient, clear_schema_cache, close_token_providers
+from benchmarks.feishu_stub_server import FeishuStubServer, StubBitable
+
+
+@pytest.fixture
+def server():
+    clear_schema_cache()
+    with FeishuStubServer(StubBitable(records=60, done_ratio=0.8)) as srv:
+        yield srv
+    clear_schema_cache()
+    close_token_providers()
+
+
+def _settings(server, tmp_path, **extra):
+    settings = {
+        "feishu_api_base": server.base_url,
+        "feishu_app_id": "test",
+        "feishu_app_secret": "test",
+        "feishu_bitable_app_token": "appTest",
+        "feishu_bitable_table_id": "tblTest",
+        "feishu_page_size": 20,
+        "log_dir": str(tmp_path),
+    }
+    settings.update(extra)
+    return settings
+
+
+def _done_ids(table):
+    return {r["record_id"] for r in table._rows if r["fields"]["笔记状态"] == "已完成"}
+
+
+def test_incremental_sync_drops_deleted_records(server, tmp_path):
+    client = FeishuClient(_settings(server, tmp_path))
+    items, state = client.sync_done_records(None, None)
+    assert {it["record_id"] for it in items} == _done_ids(server.table)
+
+    deleted = items[0]["record_id"]
+    server.table.delete_records([deleted])
+    items, state = client.sync_done_records(items, state)
+    assert deleted not in {it["record_id"] for it in items}
+    assert {it["record_id"] for it in items} == _done_ids(server.table)
+    assert state["incremental_syncs"] == 0
+
+
+def test_incremental_sync_counts_towards_periodic_full_scan(server, tmp_path):
+    client = FeishuClient(_settings(server, tmp_path, feishu_full_sync_every=3))
+    items, state = client.sync_done_records(None, None)
+    searches = server.table.stats.get("search", 0)
+    items, state = client.sync_done_records(items, state)
+    items, state = client.sync_done_records(items, state)
+    assert state["incremental_syncs"] == 2
+    # 增量同步：一次变更查询 + 一次总数查询
+    assert server.table.stats["search"] - searches == 4
+    items, state = client.sync_done_records(items, state)
+    assert state["incremental_syncs"] == 0
+    assert {it["record_id"] for it in items} == _done_ids(server.table)
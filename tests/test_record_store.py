@@ -0,0 +1,116 @@
+import json
+import time
+
+import pytest
+
+from app.core import record_store
+from app.core.record_store import RecordStore, get_record_store
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = RecordStore(str(tmp_path / "records.db"))
+    yield s
+    s.close()
+
+
+def _item(rid, **extra):
+    return dict({"record_id": rid, "title": f"标题{rid}", "status": "已完成", "content": "文案",
+                 "updated_time": 1700000000000}, **extra)
+
+
+def test_replace_items_keeps_order_and_extra_fields(store):
+    store.replace_items([_item("c"), _item("a", tags=["养生"]), _item("b"), {"title": "没有 ID"}],
+                        sync_state={"cursor": 3})
+    assert [it["record_id"] for it in store.load_items()] == ["c", "a", "b"]
+    assert store.get("a")["tags"] == ["养生"]
+    assert store.count() == 3
+    assert store.get_sync_state() == {"cursor": 3}
+
+    # 整体替换：删除不在新列表中的记录，并按新顺序排列
+    store.replace_items([_item("b"), _item("d", status="待处理"), _item("c")])
+    assert [it["record_id"] for it in store.load_items()] == ["b", "d", "c"]
+    assert store.get("a") is None
+    assert [it["record_id"] for it in store.items_by_status("已完成")] == ["b", "c"]
+    # 未传 sync_state 时保留原同步状态
+    assert store.get_sync_state() == {"cursor": 3}
+
+
+def test_replace_items_precondition(store):
+    store.replace_items([_item("a")], sync_state={"cursor": 1})
+    assert store.replace_items([_item("b")], sync_state={"cursor": 2}, precondition=lambda: False) is False
+    assert [it["record_id"] for it in store.load_items()] == ["a"]
+    assert store.get_sync_state() == {"cursor": 1}
+    assert store.replace_items([_item("b")], precondition=lambda: True) is True
+    assert [it["record_id"] for it in store.load_items()] == ["b"]
+
+
+def test_used_flags(store):
+    assert not store.is_used("a")
+    store.mark_used("a")
+    store.mark_used("a")
+    store.mark_used(42)
+    assert store.is_used("a") and store.is_used("42")
+    assert store.used_ids() == {"a", "42"}
+
+
+def test_outbox_scheduling(store):
+    assert store.next_outbox_time() is None
+    store.enqueue_used(["r1", "", "r2"])
+    store.enqueue_used(["r3"])
+    assert store.outbox_count() == 3
+    assert store.due_outbox() == [("r1", 0), ("r2", 0), ("r3", 0)]
+    assert store.due_outbox(limit=2) == [("r1", 0), ("r2", 0)]
+
+    before = time.time()
+    store.outbox_retry([("r1", 60), ("r2", 5)], error="网络错误")
+    assert store.due_outbox() == [("r3", 0)]
+    assert store.next_outbox_time() == 0
+    store.outbox_done(["r3"])
+    assert before + 5 <= store.next_outbox_time() <= time.time() + 5
+    store.enqueue_used(["r3"])
+    assert [rid for rid, _ in store.due_outbox(now=time.time() + 10)] == ["r2", "r3"]
+    assert store.due_outbox(now=time.time() + 120) == [("r1", 1), ("r2", 1), ("r3", 0)]
+
+    # 重新入队的记录立即到期，保留已尝试次数
+    store.enqueue_used(["r1"])
+    assert store.due_outbox() == [("r1", 1), ("r3", 0)]
+
+    store.outbox_done(["r1", "r2", "r3"])
+    assert store.outbox_count() == 0
+    assert store.next_outbox_time() is None
+
+
+def test_migrate_from_settings_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(record_store, "_STORES", {})
+    settings_path = tmp_path / "settings.json"
+    settings = {
+        "feishu_app_id": "cli_x",
+        "feishu_cached_items": [_item("b"), _item("a"), "坏数据"],
+        "feishu_used_records": ["a"],
+        "feishu_sync_state": {"cursor": 1},
+    }
+    settings_path.write_text(json.dumps(settings, ensure_ascii=False), encoding="utf-8")
+
+    store = get_record_store(settings, str(settings_path))
+    try:
+        assert store.path == str(tmp_path / "feishu_records.db")
+        assert [it["record_id"] for it in store.load_items()] == ["b", "a"]
+        assert store.used_ids() == {"a"}
+        assert store.get_sync_state() == {"cursor": 1}
+        assert settings == {"feishu_app_id": "cli_x"}
+        assert json.loads(settings_path.read_text(encoding="utf-8")) == {"feishu_app_id": "cli_x"}
+        # 同一路径复用同一实例，不再迁移
+        assert get_record_store(settings, str(settings_path)) is store
+        assert store.migrate_from_settings({"feishu_app_id": "cli_x"}) is False
+    finally:
+        store.close()
+
+
+def test_migration_does_not_overwrite_existing_records(store):
+    store.replace_items([_item("x")])
+    settings = {"feishu_cached_items": [_item("old")], "feishu_used_records": ["old"]}
+    assert store.migrate_from_settings(settings) is True
+    assert [it["record_id"] for it in store.load_items()] == ["x"]
+    assert store.used_ids() == {"old"}
+    assert settings == {}
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from app.core import sensitive
+from app.core.sensitive import SensitiveFilter
+
+DICTIONARY = "# 注释\n排毒=排D\n刺激\t刺j\n排毒养颜\n治愈\n"
+
+
+@pytest.fixture
+def dict_path(tmp_path):
+    path = tmp_path / "words.txt"
+    path.write_text(DICTIONARY, encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def _reset_filter():
+    yield
+    sensitive.configure_sensitive_filter({})
+
+
+def test_parse_dictionary(dict_path):
+    assert SensitiveFilter.parse_dictionary(dict_path) == {
+        "排毒": "排D", "刺激": "刺j", "排毒养颜": None, "治愈": None}
+
+
+def test_longest_leftmost_match_wins(dict_path):
+    f = SensitiveFilter.load(dict_path)
+    text = "排毒养颜不刺激，排毒后可治愈"
+    assert f.find(text) == [(0, 4, "排毒养颜"), (5, 7, "刺激"), (8, 10, "排毒"), (12, 14, "治愈")]
+    assert f.apply(text) == "****不刺j，排D后可**"
+    assert f.apply(text, mode="flag") == "【排毒养颜】不【刺激】，【排毒】后可【治愈】"
+
+
+def test_compiled_dictionary_is_cached_until_file_changes(dict_path, tmp_path, monkeypatch):
+    cache = str(tmp_path / "words.cache")
+    first = SensitiveFilter.load(dict_path, cache)
+    parse = SensitiveFilter.parse_dictionary
+
+    def fail_parse(path):
+        raise AssertionError("cache miss")
+
+    monkeypatch.setattr(SensitiveFilter, "parse_dictionary", staticmethod(fail_parse))
+    cached = SensitiveFilter.load(dict_path, cache)
+    text = "排毒养颜不刺激，排毒后可治愈"
+    assert cached.find(text) == first.find(text)
+    assert cached.apply(text) == first.apply(text)
+
+    monkeypatch.setattr(SensitiveFilter, "parse_dictionary", staticmethod(parse))
+    with open(dict_path, "a", encoding="utf-8") as fh:
+        fh.write("养颜=养Y\n")
+    assert SensitiveFilter.load(dict_path, cache).apply("养颜") == "养Y"
+
+
+@pytest.mark.parametrize("content", [b"\x80\x04not json", b'{"signature": null}', None])
+def test_bad_cache_is_recompiled(dict_path, tmp_path, content):
+    cache = tmp_path / "words.cache"
+    SensitiveFilter.load(dict_path, str(cache))
+    if content is None:
+        # 签名一致但自动机被改动：转移指向越界状态
+        data = json.loads(cache.read_text(encoding="utf-8"))
+        data["automaton"]["goto"][0]["排"] = 10 ** 6
+        content = json.dumps(data).encode("utf-8")
+    cache.write_bytes(content)
+    assert SensitiveFilter.load(dict_path, str(cache)).apply("排毒") == "排D"
+    assert json.loads(cache.read_text(encoding="utf-8"))["signature"][0] == sensitive._CACHE_VERSION
+
+
+def test_flag_format_keeps_other_braces(dict_path):
+    f = SensitiveFilter.load(dict_path)
+    assert f.apply("治愈", mode="flag", flag_format="{{{word}}} {x}") == "{{治愈}} {x}"
+
+
+def test_desensitize_follows_settings(dict_path):
+    assert sensitive.desensitize("排毒") == "排毒"
+    sensitive.configure_sensitive_filter({"sensitive_filter_enabled": True, "sensitive_dict_path": dict_path,
+                                          "sensitive_mode": "flag", "sensitive_flag_format": "[{word}]"})
+    assert sensitive.desensitize("排毒") == "[排毒]"
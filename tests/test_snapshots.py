@@ -0,0 +1,20 @@
+import os
+
+from app.core import snapshots
+
+LARGE = {"snapshot_max_records": 10, "snapshot_sample_rate": 0}
+
+
+def test_force_applies_only_to_its_own_write(tmp_path):
+    settings = dict(LARGE, snapshot_dir=str(tmp_path))
+    assert snapshots.write_snapshot(settings, "other", [], 100) is None
+    forced = snapshots.write_snapshot(settings, "full", [], 100, force=True)
+    assert forced is not None
+    # 强制写入不影响其他并发写入的抽样结果
+    assert snapshots.write_snapshot(settings, "other", [], 100) is None
+    assert snapshots.get_snapshot_writer(settings).flush(5)
+    assert [p.name for p in tmp_path.iterdir()] == [os.path.basename(forced)]
+
+
+def test_off_mode_ignores_force():
+    assert not snapshots.should_snapshot(dict(LARGE, snapshot_mode="off"), 100, force=True)
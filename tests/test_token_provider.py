@@ -0,0 +1,77 @@
+from app.core import feishu_client
+from app.core.feishu_client import TenantTokenProvider, token_provider
+
+
+class AuthStub:
+    """模拟鉴权接口：按顺序返回 ok / fail。"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls = 0
+
+    def __call__(self, method, url, **kwargs):
+        self.calls += 1
+        if self.fail:
+            return {"code": 10014, "msg": "app secret invalid"}
+        return {"code": 0, "tenant_access_token": f"t-{self.calls}", "expire": 7200}
+
+
+def test_provider_without_background_refresh_arms_no_timer():
+    provider = TenantTokenProvider("app", "secret", background_refresh=False)
+    assert provider.token(AuthStub()) == "t-1"
+    assert provider._timer is None
+
+
+def test_close_cancels_timer_and_blocks_rescheduling():
+    request = AuthStub()
+    provider = TenantTokenProvider("app", "secret")
+    provider.token(request)
+    timer = provider._timer
+    assert timer is not None and timer.is_alive()
+    provider.close()
+    timer.join(1)
+    assert not timer.is_alive()
+    provider.refresh(request)
+    assert provider._timer is None
+
+
+def test_unused_provider_stops_refreshing():
+    request = AuthStub()
+    provider = TenantTokenProvider("app", "secret")
+    provider.token(request)
+    provider._background_refresh(request)
+    assert request.calls == 2
+    # 自上次刷新后没有调用方使用 token：不再续期
+    provider._timer.cancel()
+    provider._timer = None
+    provider._background_refresh(request)
+    assert request.calls == 2
+    assert provider._timer is None
+
+
+def test_background_refresh_stops_after_repeated_failures():
+    request = AuthStub()
+    provider = TenantTokenProvider("app", "secret")
+    provider.token(request)
+    request.fail = True
+    for _ in range(feishu_client.TOKEN_REFRESH_MAX_FAILURES):
+        provider._timer.cancel()
+        provider._background_refresh(request)
+    assert provider._failures == feishu_client.TOKEN_REFRESH_MAX_FAILURES
+    # 最后一次失败后没有再安排新的定时器
+    provider._timer.join(1)
+    assert not provider._timer.is_alive()
+    # 已获取的 token 在有效期内仍可使用
+    assert provider.token(request) == "t-1"
+    provider.close()
+
+
+def test_unregistered_lookup_reuses_shared_provider():
+    shared = token_provider("app-shared", "secret", "http://stub")
+    try:
+        assert token_provider("app-shared", "secret", "http://stub", register=False) is shared
+        temp = token_provider("app-new", "secret", "http://stub", register=False)
+        assert temp is not token_provider("app-new", "secret", "http://stub", register=False)
+        assert temp.background_refresh is False
+    finally:
+        feishu_client.close_token_providers()
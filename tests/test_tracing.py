@@ -0,0 +1,96 @@
+import json
+import os
+import threading
+
+import pytest
+
+from app.core import tracing
+from app.core.tracing import span, traced
+
+
+@pytest.fixture
+def trace_on(tmp_path):
+    tracing.reset()
+    tracing.configure_tracing({"trace_enabled": True, "trace_dir": str(tmp_path)})
+    yield tmp_path
+    tracing.configure_tracing({})
+    tracing.reset()
+
+
+@traced()
+def _leaf():
+    with span("leaf.io", cat="io", bytes=3):
+        pass
+
+
+@traced("outer.call")
+def _outer():
+    _leaf()
+
+
+def test_disabled_tracing_records_nothing_but_fills_timings():
+    tracing.reset()
+    timings = {}
+    assert span("noop") is tracing._NULL_SPAN
+    with span("parse", timings=timings):
+        pass
+    assert set(timings) == {"parse"} and tracing.events() == []
+
+
+def test_nested_spans_export_chrome_trace(trace_on):
+    timings = {}
+    with span("batch", timings=timings, notes=1):
+        _outer()
+        with pytest.raises(ValueError):
+            with span("fail"):
+                raise ValueError("x")
+
+    path = tracing.export_chrome_trace()
+    assert os.path.dirname(path) == str(trace_on)
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["displayTimeUnit"] == "ms" and data["otherData"] == {"dropped_events": 0}
+
+    meta = [ev for ev in data["traceEvents"] if ev["ph"] == "M"]
+    assert meta == [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": threading.get_ident(),
+                     "args": {"name": threading.current_thread().name}}]
+    spans = {ev["name"]: ev for ev in data["traceEvents"] if ev["ph"] == "X"}
+    assert set(spans) == {"batch", "outer.call", "_leaf", "leaf.io", "fail"}
+    # 子 span 先结束先记录
+    assert [ev["name"] for ev in data["traceEvents"] if ev["ph"] == "X"] == [
+        "leaf.io", "_leaf", "outer.call", "fail", "batch"]
+    for ev in spans.values():
+        assert ev["pid"] == os.getpid() and ev["tid"] == threading.get_ident()
+        assert ev["dur"] >= 0
+
+    # 时间轴上逐层包含：父 span 的 [ts, ts+dur] 覆盖子 span
+    def contains(parent, child):
+        p, c = spans[parent], spans[child]
+        return p["ts"] <= c["ts"] and c["ts"] + c["dur"] <= p["ts"] + p["dur"] + 0.001
+
+    assert contains("batch", "outer.call") and contains("outer.call", "_leaf")
+    assert contains("_leaf", "leaf.io") and contains("batch", "fail")
+    assert spans["outer.call"]["ts"] + spans["outer.call"]["dur"] <= spans["fail"]["ts"] + 0.001
+
+    assert spans["batch"]["args"] == {"notes": 1} and spans["batch"]["cat"] == "app"
+    assert spans["leaf.io"]["args"] == {"bytes": 3} and spans["leaf.io"]["cat"] == "io"
+    assert spans["fail"]["args"] == {"error": "ValueError"}
+    assert "args" not in spans["_leaf"]
+    assert timings["batch"] == pytest.approx(spans["batch"]["dur"] / 1e6, abs=1e-3)
+
+
+def test_drain_merge_and_event_limit(trace_on):
+    with span("worker"):
+        pass
+    drained = tracing.drain()
+    assert [ev["ph"] for ev in drained] == ["M", "X"] and tracing.events() == []
+    tracing.merge(drained)
+    assert tracing.summary()["worker"]["count"] == 1
+
+    tracing.configure_tracing({"trace_enabled": True, "trace_dir": str(trace_on), "trace_max_events": 3})
+    for _ in range(3):
+        with span("extra"):
+            pass
+    assert tracing.summary()["extra"]["count"] == 1
+    with open(tracing.export_chrome_trace(str(trace_on / "t.json")), encoding="utf-8") as f:
+        assert json.load(f)["otherData"] == {"dropped_events": 2}
@@ -0,0 +1,110 @@
+import glob
+import io
+import os
+import shutil
+import zipfile
+
+import pytest
+from openpyxl import load_workbook
+
+from app.core import excel_writer, xlsx_patch_writer
+from app.core.pipeline import build_column_map
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATES = sorted(glob.glob(os.path.join(ROOT, "template", "*.xlsx")))
+
+POINTS = [
+    ("标题一", "内容 一\n第二行"),
+    ("=SUM(1)", " 前后空格 "),
+    ("a&b<c>", ""),
+]
+IMAGES = ["imgs/image001.png", None, "imgs/image003.jpg"]
+
+
+def _values(data: bytes):
+    ws = load_workbook(io.BytesIO(data)).active
+    rows = [[c.value for c in row] for row in ws.iter_rows()]
+    heights = {r: (d.height, d.s) for r, d in ws.row_dimensions.items()}
+    return rows, heights
+
+
+def _no_fallback(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("xml 引擎回退到了 openpyxl")
+    monkeypatch.setattr(xlsx_patch_writer.excel_writer, "render_template", fail)
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    excel_writer.clear_template_cache()
+    xlsx_patch_writer.clear_template_cache()
+    yield
+    excel_writer.clear_template_cache()
+    xlsx_patch_writer.clear_template_cache()
+
+
+@pytest.mark.parametrize("template", TEMPLATES, ids=os.path.basename)
+def test_engines_produce_same_cells(template, monkeypatch):
+    column_map = build_column_map({})
+    expected = excel_writer.render_template(template, POINTS, column_map, IMAGES)
+    # 内置模板应走直接修补路径，而不是回退
+    _no_fallback(monkeypatch)
+    patched = xlsx_patch_writer.render_template(template, POINTS, column_map, IMAGES)
+    assert _values(patched) == _values(expected)
+
+
+@pytest.mark.parametrize("template", TEMPLATES, ids=os.path.basename)
+def test_engines_match_past_preformatted_rows(template, monkeypatch):
+    # 内置模板预设了到第 1000 行的行高与样式，写入行数跨过该范围
+    points = [(f"标题{i}", f"内容{i}") for i in range(1005)]
+    column_map = build_column_map({})
+    expected = excel_writer.render_template(template, points, column_map)
+    _no_fallback(monkeypatch)
+    patched = xlsx_patch_writer.render_template(template, points, column_map)
+    assert _values(patched) == _values(expected)
+
+
+def test_sheet_with_encoding_declaration_is_patched():
+    template = TEMPLATES[0]
+    tpl = xlsx_patch_writer._get_template(template)
+    assert tpl.sheet_xml.lstrip().startswith(b"<?xml")
+    assert b"encoding=" in tpl.sheet_xml[:100]
+
+
+def test_unsupported_template_falls_back_and_is_cached(tmp_path, monkeypatch):
+    template = str(tmp_path / "tpl.xlsx")
+    shutil.copy(TEMPLATES[0], template)
+    calls = []
+
+    def broken_init(self, key, data):
+        calls.append(key)
+        raise TypeError("writer bug")
+
+    monkeypatch.setattr(xlsx_patch_writer._PatchTemplate, "__init__", broken_init)
+    column_map = build_column_map({})
+    expected = _values(excel_writer.render_template(template, POINTS, column_map))
+    for _ in range(3):
+        got = xlsx_patch_writer.render_template(template, POINTS, column_map)
+        assert _values(got) == expected
+    assert len(calls) == 1
+
+
+def _parts(data: bytes):
+    # docProps 中含保存时间，不参与比较
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        return {n: zf.read(n) for n in zf.namelist() if not n.startswith("docProps/")}
+
+
+@pytest.mark.parametrize("template", TEMPLATES, ids=os.path.basename)
+def test_cached_workbook_is_restored_between_renders(template):
+    column_map = build_column_map({})
+    long_points = [(f"标题{i}", f"内容{i}") for i in range(30)]
+    fresh = {}
+    for name, points, images in (("short", POINTS, IMAGES), ("long", long_points, None)):
+        excel_writer.clear_template_cache()
+        fresh[name] = _parts(excel_writer.render_template(template, points, column_map, images))
+    excel_writer.clear_template_cache()
+    # 同一缓存工作簿上交替写入长短不同的内容，每次输出都应与全新解析的结果一致
+    for name, points, images in (("short", POINTS, IMAGES), ("long", long_points, None),
+                                 ("short", POINTS, IMAGES)):
+        assert _parts(excel_writer.render_template(template, points, column_map, images)) == fresh[name]
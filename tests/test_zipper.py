@@ -0,0 +1,84 @@
+import os
+import zipfile
+
+import pytest
+
+from app.core import zipper
+from app.core.pipeline import export_zip
+from app.core.zipper import compression_for, make_zip
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE = os.path.join(ROOT, "template", "稿定设计-数据上传无图模板.xlsx")
+TEXT = "早睡养肝，少喝酒。".encode("utf-8") * 2000
+
+
+def test_byte_entropy_bounds():
+    assert zipper._byte_entropy(b"") == 0.0
+    assert zipper._byte_entropy(b"a" * 100) == 0.0
+    assert zipper._byte_entropy(bytes(range(256)) * 4) == pytest.approx(8.0)
+
+
+@pytest.mark.parametrize("arcname,expected", [
+    ("a.PNG", zipfile.ZIP_STORED),
+    ("a.jpg", zipfile.ZIP_STORED),
+    ("a.xlsx", zipfile.ZIP_DEFLATED),
+    ("a.txt", zipfile.ZIP_DEFLATED),
+])
+def test_compression_by_extension(arcname, expected):
+    # 已知扩展名不受探测影响
+    assert compression_for(arcname, os.urandom(1024), probe=True) == expected
+    assert compression_for(arcname, TEXT, probe=True) == expected
+
+
+def test_entropy_probe_for_unknown_types(tmp_path):
+    random_file = tmp_path / "blob.bin"
+    random_file.write_bytes(os.urandom(4096))
+    assert compression_for("blob.bin", str(random_file), probe=True) == zipfile.ZIP_STORED
+    assert compression_for("blob.bin", os.urandom(4096), probe=True) == zipfile.ZIP_STORED
+    assert compression_for("blob.bin", TEXT, probe=True) == zipfile.ZIP_DEFLATED
+    # 未开启探测、无来源或来源不可读时一律压缩
+    assert compression_for("blob.bin", os.urandom(4096)) == zipfile.ZIP_DEFLATED
+    assert compression_for("blob.bin", None, probe=True) == zipfile.ZIP_DEFLATED
+    assert compression_for("blob.bin", str(tmp_path / "missing.bin"), probe=True) == zipfile.ZIP_DEFLATED
+
+
+def test_make_zip_members_and_duplicate_arcnames(tmp_path):
+    image = tmp_path / "cover.png"
+    image.write_bytes(b"\x89PNG" + os.urandom(512))
+    other = tmp_path / "other" / "cover.png"
+    other.parent.mkdir()
+    other.write_bytes(b"second")
+    members = [(TEXT, "笔记.xlsx"), (str(image), "cover.png"), (str(other), "cover.png"), (b"dup", "笔记.xlsx")]
+
+    zip_path = make_zip(None, str(tmp_path / "out"), members=members, zip_name_suffix="配图版")
+    assert os.path.basename(zip_path) == "笔记-配图版.zip"
+    assert os.listdir(tmp_path / "out") == ["笔记-配图版.zip"]
+    with zipfile.ZipFile(zip_path) as zf:
+        assert zf.namelist() == ["笔记.xlsx", "cover.png"]
+        assert zf.read("笔记.xlsx") == TEXT
+        assert zf.read("cover.png") == image.read_bytes()
+        assert zf.getinfo("笔记.xlsx").compress_type == zipfile.ZIP_DEFLATED
+        assert zf.getinfo("cover.png").compress_type == zipfile.ZIP_STORED
+
+
+def test_make_zip_requires_content(tmp_path):
+    with pytest.raises(ValueError):
+        make_zip(None, str(tmp_path))
+
+
+def test_export_zip_streams_excel_and_images(tmp_path):
+    # Excel 只存在于内存中，图片从原路径直接写入压缩包根目录
+    image = tmp_path / "cache" / "p1.jpg"
+    image.parent.mkdir()
+    image.write_bytes(os.urandom(256))
+    out = tmp_path / "out"
+    settings = {"template_excel_path": TEMPLATE, "delete_excel_after_zip": True}
+    zip_path = export_zip(settings, "养肝", [("一、早睡", "11点前入睡")], output_dir=str(out),
+                          images=[str(image), None, str(tmp_path / "missing.jpg")], zip_name_suffix="配图版")
+    assert os.listdir(out) == [os.path.basename(zip_path)]
+    with zipfile.ZipFile(zip_path) as zf:
+        names = zf.namelist()
+        assert names[0].endswith(".xlsx") and names[1:] == ["p1.jpg"]
+        assert zf.read("p1.jpg") == image.read_bytes()
+        assert zf.read(names[0])[:2] == b"PK"
+    assert os.listdir(image.parent) == ["p1.jpg"]